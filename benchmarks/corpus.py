@@ -0,0 +1,224 @@
+"""
+Synthetic Benchmark Corpora
+Reproducible hash corpora generated from HashPatterns.PATTERNS and the
+hashcat modes database, plus realistic dump mixes and adversarial near-misses
+"""
+
+import json
+import os
+import random
+import re
+import string
+from typing import Dict, List, Optional, Tuple
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants
+    import sre_parse
+
+from lib.hash_patterns import HashPatterns
+
+
+# Repeat count used for unbounded quantifiers (*, +, {n,})
+UNBOUNDED_REPEAT = 16
+
+# Printable characters '.' may produce
+ANY_CHARS = string.ascii_letters + string.digits + './+'
+
+HEX = '0123456789abcdef'
+B64 = string.ascii_letters + string.digits + './'
+
+# A sample is (value, expected hash type or None for "anything goes")
+Sample = Tuple[str, Optional[str]]
+
+
+def _category_chars(category) -> str:
+    """Characters for a regex category such as \\d"""
+    if category is sre_constants.CATEGORY_DIGIT:
+        return string.digits
+    if category is sre_constants.CATEGORY_WORD:
+        return string.ascii_letters + string.digits + '_'
+    return string.ascii_letters
+
+
+def _set_chars(items) -> str:
+    """Characters accepted by a [...] set"""
+    chars = []
+    for op, arg in items:
+        if op is sre_constants.LITERAL:
+            chars.append(chr(arg))
+        elif op is sre_constants.RANGE:
+            chars.extend(chr(c) for c in range(arg[0], arg[1] + 1))
+        elif op is sre_constants.CATEGORY:
+            chars.extend(_category_chars(arg))
+    return ''.join(chars)
+
+
+def _generate(items, rng: random.Random, out: List[str]):
+    """Append a random string matching the parsed items to out"""
+    for op, arg in items:
+        if op is sre_constants.LITERAL:
+            out.append(chr(arg))
+        elif op is sre_constants.IN:
+            out.append(rng.choice(_set_chars(arg)))
+        elif op is sre_constants.ANY:
+            out.append(rng.choice(ANY_CHARS))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, sub = arg
+            if high >= sre_constants.MAXREPEAT:
+                high = max(low, UNBOUNDED_REPEAT)
+            for _ in range(rng.randint(low, high)):
+                _generate(sub, rng, out)
+        elif op is sre_constants.SUBPATTERN:
+            _generate(arg[3], rng, out)
+        elif op is sre_constants.BRANCH:
+            _generate(rng.choice(arg[1]), rng, out)
+        elif op is sre_constants.AT:
+            continue
+        else:
+            raise ValueError(f"Unsupported regex construct: {op}")
+
+
+def sample_from_pattern(pattern: str, rng: random.Random) -> str:
+    """Generate a random string matched by pattern"""
+    for _ in range(100):
+        out = []
+        _generate(list(sre_parse.parse(pattern)), rng, out)
+        value = ''.join(out)
+        if re.match(pattern, value):
+            return value
+    raise ValueError(f"Could not generate a sample for {pattern!r}")
+
+
+def family_samples(rng: random.Random, per_family: int = 1) -> List[Sample]:
+    """Samples for every hash type in PATTERNS"""
+    samples = []
+    for hash_type, info in HashPatterns.PATTERNS.items():
+        for _ in range(per_family):
+            samples.append((sample_from_pattern(info['pattern'], rng), hash_type))
+    return samples
+
+
+def database_examples(db_path: str) -> List[Sample]:
+    """The example hash of every mode in the database"""
+    with open(db_path) as f:
+        modes = json.load(f).get('hash_modes', [])
+    return [(m['example'], None) for m in modes if m.get('example')]
+
+
+def _hex(rng: random.Random, length: int) -> str:
+    return ''.join(rng.choice(HEX) for _ in range(length))
+
+
+def _b64(rng: random.Random, length: int) -> str:
+    return ''.join(rng.choice(B64) for _ in range(length))
+
+
+def ntds_like(rng: random.Random, count: int) -> List[Sample]:
+    """Hashes extracted from an NTDS/pwdump: NT hashes, blank LM, some LM:NT pairs"""
+    blank_lm = 'aad3b435b51404eeaad3b435b51404ee'
+    samples = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.85:
+            samples.append((_hex(rng, 32), 'NTLM'))
+        elif roll < 0.95:
+            samples.append((blank_lm, 'LM'))
+        else:
+            samples.append((f"{_hex(rng, 32)}:{_hex(rng, 32)}", 'LM'))
+    return samples
+
+
+def shadow_like(rng: random.Random, count: int) -> List[Sample]:
+    """Hash fields of a Linux/BSD shadow file"""
+    samples = []
+    for _ in range(count):
+        roll = rng.random()
+        salt = _b64(rng, rng.randint(1, 8))
+        if roll < 0.45:
+            samples.append((f"$6${salt}${_b64(rng, 86)}", 'sha512crypt'))
+        elif roll < 0.6:
+            samples.append((f"$5${salt}${_b64(rng, 43)}", 'sha256crypt'))
+        elif roll < 0.75:
+            samples.append((f"$1${salt}${_b64(rng, 22)}", 'md5crypt'))
+        elif roll < 0.9:
+            samples.append((f"$2b${rng.randint(4, 14):02d}${_b64(rng, 53)}", 'bcrypt'))
+        else:
+            samples.append((_b64(rng, 13), 'descrypt'))
+    return samples
+
+
+def webapp_like(rng: random.Random, count: int) -> List[Sample]:
+    """A web application user table: CMS, framework and raw digests"""
+    samples = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.2:
+            samples.append((_hex(rng, 32), 'MD5'))
+        elif roll < 0.35:
+            samples.append((_hex(rng, 40), 'SHA1'))
+        elif roll < 0.5:
+            samples.append((f"$P${_b64(rng, 31)}", 'phpass'))
+        elif roll < 0.6:
+            samples.append((f"{_hex(rng, 32)}:{_b64(rng, 16).replace('.', 'a').replace('/', 'b')}", 'Joomla'))
+        elif roll < 0.75:
+            samples.append((f"pbkdf2_sha256$260000${_b64(rng, 12)}${_b64(rng, 44)}", 'Django-PBKDF2'))
+        elif roll < 0.85:
+            samples.append((f"$2y$10${_b64(rng, 53)}", 'bcrypt'))
+        elif roll < 0.95:
+            samples.append(('*' + _hex(rng, 40).upper(), 'MySQL4.1/MySQL5'))
+        else:
+            samples.append((f"$argon2id$v=19$m=65536,t=3,p=4${_b64(rng, 22)}${_b64(rng, 43)}", 'Argon2id'))
+    return samples
+
+
+def near_misses(rng: random.Random, samples: List[Sample]) -> List[Sample]:
+    """Adversarial mutations of valid samples that mostly should not match"""
+    mutated = []
+    for value, _ in samples:
+        choice = rng.randrange(6)
+        if choice == 0:
+            mutated.append(value[:-1])
+        elif choice == 1:
+            mutated.append(value + rng.choice(HEX))
+        elif choice == 2:
+            mutated.append(value.upper())
+        elif choice == 3:
+            position = rng.randrange(len(value))
+            mutated.append(value[:position] + rng.choice('!#%& g') + value[position + 1:])
+        elif choice == 4:
+            mutated.append(value[1:])
+        else:
+            mutated.append(value.replace('$', '#', 1))
+    return [(value, None) for value in mutated if value.strip()]
+
+
+def build_corpora(db_path: str, size: int = 10000, seed: int = 1337) -> Dict[str, List[Sample]]:
+    """
+    Build every benchmark corpus
+
+    Args:
+        db_path: Hashcat modes database (for its example hashes)
+        size: Lines per mix corpus
+        seed: Random seed; equal seeds give identical corpora
+
+    Returns:
+        Dictionary of corpus name to samples
+    """
+    rng = random.Random(seed)
+    families = family_samples(rng, per_family=max(1, size // len(HashPatterns.PATTERNS)))
+    corpora = {
+        'families': families,
+        'db_examples': database_examples(db_path),
+        'ntds': ntds_like(rng, size),
+        'shadow': shadow_like(rng, size),
+        'webapp': webapp_like(rng, size),
+    }
+    corpora['near_misses'] = near_misses(rng, families)
+    return corpora
+
+
+def default_db_path() -> str:
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'database', 'hashcat_modes.json')
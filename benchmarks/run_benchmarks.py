@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+"""
+HxMod Benchmark Suite
+Measures lines/sec of pattern matching, identification, batch processing and
+every output formatter over the synthetic corpora, checking correctness on
+the same runs, plus the memory held by batch results, and saves the numbers
+as JSON so runs can be compared
+
+Usage:
+    python benchmarks/run_benchmarks.py --size 20000 --save results.json
+    python benchmarks/run_benchmarks.py --compare results.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from corpus import build_corpora, default_db_path
+from lib.formatter import get_formatter
+from lib.hash_analyzer import HashAnalyzer
+from lib.hash_patterns import HashPatterns
+from lib.pattern_index import ENGINES
+
+
+# Every format get_formatter knows about
+FORMATS = ('standard', 'table', 'detailed', 'json', 'json_compact',
+           'ndjson', 'csv', 'compact', 'hashcat', 'brief')
+
+# Formats whose output is checked to load back into the result
+JSON_FORMATS = ('json', 'json_compact', 'ndjson')
+
+# Slowdown against a compared run that gets flagged
+REGRESSION_THRESHOLD = 0.9
+
+
+def measure(func: Callable, values: List, repeat: int) -> Dict:
+    """Best-of-repeat throughput of func over values"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(values)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        'lines': len(values),
+        'seconds': round(best, 6),
+        'lines_per_sec': round(len(values) / best, 1) if best else None,
+    }
+
+
+def measure_memory(func: Callable, values: List) -> Dict:
+    """Memory still allocated by the results of func(values)"""
+    func(values[:100])  # shared match lists are not part of the cost per result
+    gc.collect()
+    tracemalloc.start()
+    results = func(values)
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    per_result = allocated / len(values)
+    return {
+        'lines': len(values),
+        'bytes_per_result': round(per_result, 1),
+        'mb_per_million': round(per_result * 1e6 / 2 ** 20, 1),
+    }
+
+
+def check_expected(samples) -> int:
+    """Count generated samples whose source family was not identified"""
+    return sum(1 for value, expected in samples
+               if expected and expected not in HashPatterns.detect_hash_type(value))
+
+
+def run(size: int, seed: int, repeat: int, workers: int, db_path: str) -> Dict:
+    corpora = build_corpora(db_path, size=size, seed=seed)
+    results = []
+    memory = []
+    failures = []
+
+    def record(corpus_name, target, variant, stats, errors=0):
+        stats.update({'corpus': corpus_name, 'target': target, 'variant': variant, 'errors': errors})
+        results.append(stats)
+        if errors:
+            failures.append(f"{target}[{variant}] on {corpus_name}: {errors} mismatches")
+
+    for name, samples in corpora.items():
+        values = [value for value, _ in samples]
+        print(f"[*] {name}: {len(values)} lines", file=sys.stderr)
+
+        missing = check_expected(samples)
+        if missing:
+            failures.append(f"{name}: {missing} samples not identified as their source family")
+
+        # Pattern matching, each engine checked against the linear scan
+        reference = [HashPatterns.identify_by_pattern(v, 'linear') for v in values]
+        for engine in ENGINES:
+            stats = measure(lambda vs: [HashPatterns.identify_by_pattern(v, engine) for v in vs],
+                            values, repeat)
+            errors = sum(1 for v, ref in zip(values, reference)
+                         if HashPatterns.identify_by_pattern(v, engine) != ref)
+            record(name, 'identify_by_pattern', engine, stats, errors)
+
+        # Full identification: cold cache per repeat, and uncached
+        uncached = HashAnalyzer(db_path, cache_size=0)
+        expected = [uncached.identify_hash(v) for v in values]
+        analyzer = HashAnalyzer(db_path)
+
+        def identify_cold(vs):
+            analyzer.configure_cache(analyzer.result_cache.maxsize)
+            return [analyzer.identify_hash(v) for v in vs]
+
+        stats = measure(identify_cold, values, repeat)
+        stats['cache'] = analyzer.cache_info()
+        errors = sum(1 for v, exp in zip(values, expected) if analyzer.identify_hash(v) != exp)
+        record(name, 'identify_hash', 'cached', stats, errors)
+        record(name, 'identify_hash', 'uncached',
+               measure(lambda vs: [uncached.identify_hash(v) for v in vs], values, repeat))
+
+        # Batch identification
+        for jobs in sorted({1, workers}):
+            # Corpora under PARALLEL_MIN_HASHES run serially, as they would from the CLI
+            batch = HashAnalyzer(db_path)
+            stats = measure(lambda vs: batch.identify_multiple(vs, workers=jobs), values, repeat)
+            errors = sum(1 for got, exp in zip(batch.identify_multiple(values, workers=jobs), expected)
+                         if got != exp)
+            record(name, 'identify_multiple', f"jobs={jobs}", stats, errors)
+
+        # Memory held by a batch of results: dictionaries vs HashResult records
+        batch = HashAnalyzer(db_path)
+        for variant, records in (('dict', False), ('records', True)):
+            stats = measure_memory(lambda vs: batch.identify_multiple(vs, records=records), values)
+            stats.update({'corpus': name, 'variant': variant})
+            memory.append(stats)
+        errors = sum(1 for got, exp in zip(batch.identify_multiple(values, records=True), expected)
+                     if got.to_dict() != exp)
+        if errors:
+            failures.append(f"identify_multiple[records] on {name}: {errors} mismatches")
+
+        # Formatters over the identified results; JSON formats must give the results back
+        for output_format in FORMATS:
+            formatter = get_formatter(output_format)
+            stats = measure(lambda rs: [formatter(r) for r in rs], expected, repeat)
+            errors = 0
+            if output_format in JSON_FORMATS:
+                errors = sum(1 for r in expected if json.loads(formatter(r)) != r)
+            record(name, 'formatter', output_format, stats, errors)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'size': size,
+            'seed': seed,
+            'repeat': repeat,
+            'workers': workers,
+            'patterns': HashPatterns.fingerprint(),
+        },
+        'results': results,
+        'memory': memory,
+        'failures': failures,
+    }
+
+
+def result_key(result: Dict):
+    return (result['corpus'], result['target'], result['variant'])
+
+
+def print_report(report: Dict, baseline: Dict = None):
+    """Print a throughput table, with ratios against a baseline run"""
+    previous = {result_key(r): r for r in (baseline or {}).get('results', [])}
+    print(f"\n{'Corpus':<12} {'Target':<20} {'Variant':<13} {'Lines/sec':>12} {'Errors':>7}"
+          + (f" {'vs base':>8}" if baseline else ''))
+    print('-' * (67 + (9 if baseline else 0)))
+
+    regressions = 0
+    for result in report['results']:
+        line = (f"{result['corpus']:<12} {result['target']:<20} {result['variant']:<13} "
+                f"{result['lines_per_sec'] or 0:>12,.0f} {result['errors']:>7}")
+        base = previous.get(result_key(result))
+        if base and base.get('lines_per_sec') and result['lines_per_sec']:
+            ratio = result['lines_per_sec'] / base['lines_per_sec']
+            line += f" {ratio:>7.2f}x"
+            if ratio < REGRESSION_THRESHOLD:
+                line += ' !'
+                regressions += 1
+        print(line)
+
+    if report.get('memory'):
+        print(f"\n{'Corpus':<12} {'Results':<10} {'Bytes/result':>13} {'MB/million':>11}")
+        print('-' * 49)
+        for result in report['memory']:
+            print(f"{result['corpus']:<12} {result['variant']:<10} "
+                  f"{result['bytes_per_result']:>13,.1f} {result['mb_per_million']:>11,.1f}")
+
+    if baseline:
+        print(f"\n{regressions} result(s) more than {1 - REGRESSION_THRESHOLD:.0%} slower than baseline")
+    if report['failures']:
+        print("\n[FAILED] correctness checks:")
+        for failure in report['failures']:
+            print(f"  - {failure}")
+    else:
+        print("\n[PASSED] all correctness checks")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HxMod benchmark suite')
+    parser.add_argument('--size', type=int, default=10000, help='Lines per corpus (default: 10000)')
+    parser.add_argument('--seed', type=int, default=1337, help='Corpus random seed (default: 1337)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions, best is kept (default: 3)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for the parallel identify_multiple run')
+    parser.add_argument('--db', default=default_db_path(), help='Hashcat modes database')
+    parser.add_argument('--save', metavar='FILE', help='Write results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='Compare against a saved JSON run')
+    args = parser.parse_args()
+
+    report = run(args.size, args.seed, args.repeat, args.workers, args.db)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[+] Results saved to {args.save}")
+
+    return 1 if report['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Shared Test Setup
+Makes the package importable and provides the paths and sample hashes the
+test modules share; the modules import from here when run directly too
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+from lib.reader import iter_lines
+
+DB_PATH = os.path.join(ROOT, 'database', 'hashcat_modes.json')
+SAMPLES = os.path.join(ROOT, 'examples', 'sample_hashes.txt')
+CLI = os.path.join(ROOT, 'hash_identifier.py')
+
+
+def load_samples():
+    """Hashes of examples/sample_hashes.txt, read the way the CLI reads a file"""
+    return [line.decode() for line in iter_lines(SAMPLES)]
+
+
+@pytest.fixture
+def samples():
+    """A fresh list of the sample hashes for each test"""
+    return load_samples()
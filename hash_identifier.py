@@ -5,17 +5,48 @@ Identifies hash types and returns corresponding hashcat modes
 Created by: MD.SHORIF MIA
 """
 
-import argparse
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import itertools
 import sys
 import os
-from pathlib import Path
 
 # Add lib directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
+# Formatters, the banner and argparse are imported where they are used so
+# that scripted single-hash calls only pay for what they need
 from lib.hash_analyzer import HashAnalyzer
-from lib.formatter import OutputFormatter, BatchResultFormatter, get_formatter
-from lib.banner import show_banner
+from lib.hash_patterns import HashPatterns
+from lib.pattern_index import ENGINES, DEFAULT_ENGINE
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
+# Lines identified (and output flushed) at a time when streaming stdin
+STREAM_FLUSH_LINES = 1024
+
+# Exit status after the reader of stdout went away, as if killed by SIGPIPE
+BROKEN_PIPE_EXIT = 141
+
+
+def stdin_is_piped() -> bool:
+    """Check whether stdin is a pipe or a file rather than a terminal"""
+    try:
+        return not sys.stdin.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def banner_enabled(argv) -> bool:
+    """Check whether the banner should be shown (--no-banner / HXMOD_NO_BANNER)"""
+    if '--no-banner' in argv:
+        return False
+    # Streamed output holds nothing but results
+    if stdin_is_piped() or any(arg in ('-', '-f-', '--file=-') for arg in argv):
+        return False
+    return os.environ.get('HXMOD_NO_BANNER', '').lower() in ('', '0', 'false', 'no')
 
 
 class HashIdentifierCLI:
@@ -25,12 +56,24 @@ class HashIdentifierCLI:
     VERSION = "v1.0"
     AUTHOR = "MD.SHORIF MIA"
     
-    def __init__(self):
-        self.analyzer = HashAnalyzer()
-        self.parser = self._create_parser()
+    def __init__(self, analyzer=None):
+        # A RemoteAnalyzer (lib.daemon_client) makes the CLI a thin daemon client
+        self.analyzer = analyzer or HashAnalyzer()
+        # IdentifyMetrics when --metrics-file or --metrics-port is given
+        self.metrics = None
+        self._parser = None
+    
+    @property
+    def parser(self):
+        """Argument parser, created on first use"""
+        if self._parser is None:
+            self._parser = self._create_parser()
+        return self._parser
     
-    def _create_parser(self) -> argparse.ArgumentParser:
+    def _create_parser(self):
         """Create argument parser"""
+        import argparse
+        
         parser = argparse.ArgumentParser(
             prog='HxMod',
             description='HxMod v1.0 - Identify hash types and find hashcat modes (Offline)',
@@ -46,6 +89,18 @@ Examples:
   # Output as JSON
   python hash_identifier.py -f hashes.txt -o json
   
+  # One JSON object per line, with selected keys only
+  python hash_identifier.py -f hashes.txt -o ndjson --fields hash,top_mode,confidence
+  
+  # One file per hashcat mode, ready for hashcat -m N
+  python hash_identifier.py -f hashes.txt --split-dir by_mode
+  
+  # Count hashes per type and mode only
+  python hash_identifier.py -f hashes.txt --aggregate
+  
+  # Only the most likely mode of each hash
+  python hash_identifier.py -f hashes.txt --best
+  
   # Search hashcat modes
   python hash_identifier.py --search "bcrypt"
   
@@ -68,16 +123,23 @@ Created by: MD.SHORIF MIA | Version: v1.0
         # Input options
         input_group = parser.add_mutually_exclusive_group()
         input_group.add_argument('hash', nargs='?', help='Hash string to identify')
-        input_group.add_argument('-f', '--file', help='Read hashes from file (one per line)')
-        input_group.add_argument('--search', help='Search hashcat modes by name')
+        input_group.add_argument('-f', '--file',
+                                 help="Read hashes from file (one per line); '-' streams stdin, "
+                                      "which is also read when it is piped and no other input is given")
+        input_group.add_argument('--search',
+                                 help='Search hashcat modes by name, variant, description or mode number (ranked)')
         input_group.add_argument('--mode', type=int, help='Get details for specific hashcat mode number')
         input_group.add_argument('--categories', action='store_true', help='List all hash categories')
         input_group.add_argument('--info', action='store_true', help='Show database information')
         input_group.add_argument('--list', help='List modes in a category')
+        input_group.add_argument('--rebuild-cache', action='store_true',
+                                help='Rebuild the precompiled database snapshot')
+        input_group.add_argument('--serve', metavar='SOCKET',
+                                help='Run as a daemon answering JSON-lines requests on a Unix socket')
         
         # Output format options
         parser.add_argument('-o', '--output', 
-                          choices=['standard', 'table', 'detailed', 'json', 'json_compact', 'csv', 'compact', 'hashcat', 'brief'],
+                          choices=['standard', 'table', 'detailed', 'json', 'json_compact', 'ndjson', 'csv', 'compact', 'hashcat', 'brief'],
                           default='standard',
                           help='Output format (default: standard)')
         
@@ -85,31 +147,143 @@ Created by: MD.SHORIF MIA | Version: v1.0
         parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output with extra details')
         parser.add_argument('--features', action='store_true', help='Show hash feature analysis')
         parser.add_argument('--save', help='Save results to file')
+        parser.add_argument('--fields', type=self._fields_arg,
+                          help='Comma-separated keys to keep in json/ndjson output: '
+                               'hash, length, confidence, match_count, top_type, top_mode, '
+                               'top_category, modes, matches')
+        parser.add_argument('--aggregate', action='store_true',
+                          help='With -f, print only counts per hash type, mode, category and length '
+                               '(table, or json/csv with -o)')
+        parser.add_argument('--split-dir', metavar='DIR',
+                          help='With -f, write each hash to DIR/mode_<N>.txt for its top match '
+                               '(unmatched.txt otherwise) plus a manifest.json')
+        parser.add_argument('--top', type=int, metavar='K',
+                          help='Show only the K most likely matches of each hash; patterns that '
+                               'could not make the top K are not evaluated')
+        parser.add_argument('--best', dest='top', action='store_const', const=1,
+                          help='Show only the most likely match (same as --top 1)')
+        parser.add_argument('--split-all', action='store_true',
+                          help='With --split-dir, write each hash to the file of every candidate mode')
+        parser.add_argument('--checkpoint', metavar='FILE',
+                          help='With -f, save the position reached and the output state to FILE '
+                               'every few seconds')
+        parser.add_argument('--resume', action='store_true',
+                          help='Continue an interrupted --checkpoint run where it stopped')
+        parser.add_argument('--flush-every', type=int, default=STREAM_FLUSH_LINES, metavar='N',
+                          help='When streaming stdin, write out results after at most N lines, '
+                               f'as soon as they are read (default: {STREAM_FLUSH_LINES}; 1 for line by line)')
+        parser.add_argument('-j', '--jobs', type=int, default=1,
+                          help='Worker processes for file processing (default: 1)')
+        parser.add_argument('--chunk-size', type=int, default=None,
+                          help='Hashes per worker task when --jobs > 1 (default: 1000)')
+        parser.add_argument('--no-cache', action='store_true',
+                          help='Disable the identification result cache')
+        parser.add_argument('--engine', choices=list(ENGINES), default=DEFAULT_ENGINE,
+                          help='Pattern matching engine; all return identical results (default: indexed)')
+        parser.add_argument('--no-banner', action='store_true',
+                          help='Do not print the banner (or set HXMOD_NO_BANNER=1)')
+        parser.add_argument('--timing', action='store_true',
+                          help='Report how long each startup phase took (on stderr)')
+        parser.add_argument('--profile', action='store_true',
+                          help='Report attempts, hits and time per pattern and per identification '
+                               'stage (on stderr)')
+        parser.add_argument('--profile-save', metavar='FILE',
+                          help='Write the --profile report to FILE as JSON instead')
+        parser.add_argument('--metrics-file', metavar='FILE',
+                          help='Write Prometheus metrics to FILE while running and at exit '
+                               '(for the node exporter textfile collector; use a .prom name)')
+        parser.add_argument('--metrics-interval', type=float, metavar='SECONDS',
+                          help='Seconds between --metrics-file rewrites (default: 15)')
+        parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                          help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running')
         
         return parser
     
-    def run(self):
-        """Main entry point"""
-        args = self.parser.parse_args()
+    @staticmethod
+    def _reads_stdin(args) -> bool:
+        """Check whether the parsed arguments process hashes streamed from stdin"""
+        if args.file:
+            return args.file == '-'
+        other_commands = (args.hash, args.search, args.categories, args.info, args.mode is not None,
+                          args.list, args.rebuild_cache, args.serve)
+        return not any(other_commands) and stdin_is_piped()
+    
+    @staticmethod
+    def _fields_arg(value: str):
+        """argparse type for --fields"""
+        import argparse
+        from lib.formatter import parse_fields
         
         try:
-            if args.categories:
-                self._show_categories()
-            elif args.info:
-                self._show_info()
-            elif args.search:
-                self._search_modes(args.search)
-            elif args.mode is not None:
-                self._show_mode_details(args.mode)
-            elif args.list:
-                self._list_category_modes(args.list)
-            elif args.file:
-                self._process_file(args.file, args.output, args.save)
-            elif args.hash:
-                self._process_single_hash(args.hash, args.output, args.features, args.save)
-            else:
-                self.parser.print_help()
+            return parse_fields(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    
+    def run(self, argv=None):
+        """Main entry point"""
+        argv = sys.argv[1:] if argv is None else argv
+        
+        # Fast path: a lone hash argument needs no argument parser
+        if len(argv) == 1 and argv[0] and not argv[0].startswith('-'):
+            self._execute(lambda: self._process_single_hash(argv[0], 'standard'))
+            return
         
+        parse_start = time.perf_counter()
+        args = self.parser.parse_args(argv)
+        if (args.checkpoint or args.resume) and not args.file:
+            self.parser.error("--checkpoint and --resume need -f FILE")
+        if args.resume and not args.checkpoint:
+            self.parser.error("--resume needs --checkpoint FILE")
+        if args.checkpoint and args.file == '-':
+            self.parser.error("--checkpoint needs a file; stdin can't be resumed")
+        if args.flush_every < 1:
+            self.parser.error("--flush-every must be at least 1")
+        if args.jobs > 1 and not (args.aggregate or args.split_dir) and self._reads_stdin(args):
+            self.parser.error("-j/--jobs does not apply to streamed stdin, whose results are written "
+                              "every --flush-every lines; use -f FILE, --aggregate or --split-dir")
+        if args.metrics_interval is not None and args.metrics_interval <= 0:
+            self.parser.error("--metrics-interval must be positive")
+        if args.top is not None:
+            if args.top < 1:
+                self.parser.error("--top must be at least 1")
+            if args.aggregate or args.split_dir:
+                self.parser.error("--best and --top only apply to identification output, "
+                                  "not --aggregate or --split-dir")
+        parse_seconds = time.perf_counter() - parse_start
+        
+        profiler = None
+        if args.profile or args.profile_save:
+            profiler = self._start_profiling(args)
+        exporters = []
+        if args.metrics_file or args.metrics_port is not None:
+            exporters = self._start_metrics(args)
+        
+        self.analyzer.engine = args.engine
+        if args.no_cache:
+            self.analyzer.configure_cache(0)
+        
+        command_start = time.perf_counter()
+        try:
+            self._execute(lambda: self._dispatch(args))
+        finally:
+            if args.timing:
+                self._report_timing(parse_seconds, time.perf_counter() - command_start)
+            if profiler is not None:
+                self._report_profile(profiler, args.profile_save)
+            for exporter in exporters:
+                exporter.stop()
+    
+    def _execute(self, command):
+        """Run a command with the CLI's interrupt and error handling"""
+        try:
+            command()
+        except BrokenPipeError:
+            # The reader went away (`| head`): stop quietly, like other filters
+            try:
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            except (OSError, ValueError):
+                pass
+            sys.exit(BROKEN_PIPE_EXIT)
         except KeyboardInterrupt:
             print("\n\nInterrupted by user")
             sys.exit(0)
@@ -117,6 +291,109 @@ Created by: MD.SHORIF MIA | Version: v1.0
             print(f"Error: {e}", file=sys.stderr)
             sys.exit(1)
     
+    def _dispatch(self, args):
+        """Run the command selected by the parsed arguments"""
+        if args.categories:
+            self._show_categories()
+        elif args.info:
+            self._show_info(args.verbose)
+        elif args.search:
+            self._search_modes(args.search)
+        elif args.mode is not None:
+            self._show_mode_details(args.mode)
+        elif args.list:
+            self._list_category_modes(args.list)
+        elif args.rebuild_cache:
+            self._rebuild_cache()
+        elif args.serve:
+            self._serve(args.serve, 0 if args.no_cache else None)
+        elif args.file and args.checkpoint:
+            self._process_checkpointed(args.file, args.checkpoint, args.resume, args.output,
+                                       args.save, args.jobs, args.chunk_size, args.aggregate,
+                                       args.fields, args.split_dir, args.split_all, args.top)
+        elif args.file or self._reads_stdin(args):
+            self._process_file(args.file or '-', args.output, args.save, args.jobs, args.chunk_size,
+                               args.verbose, args.aggregate, args.fields,
+                               args.split_dir, args.split_all, args.flush_every, args.top)
+        elif args.hash:
+            self._process_single_hash(args.hash, args.output, args.features, args.save, args.fields,
+                                      args.top)
+        else:
+            self.parser.print_help()
+    
+    def _report_timing(self, parse_seconds: float, command_seconds: float):
+        """Print the duration of each startup phase to stderr"""
+        database_seconds = self.analyzer.timings.get('database', 0.0)
+        pattern_seconds = HashPatterns.index_load_seconds
+        phases = [
+            ('imports', _IMPORT_SECONDS),
+            ('arguments', parse_seconds),
+            ('database', database_seconds),
+            ('patterns', pattern_seconds),
+            ('command', command_seconds - database_seconds - pattern_seconds),
+        ]
+        
+        print("\nStartup timing:", file=sys.stderr)
+        for name, seconds in phases:
+            print(f"  {name:<10} {seconds * 1000:8.2f} ms", file=sys.stderr)
+        total = sum(seconds for _, seconds in phases)
+        print(f"  {'total':<10} {total * 1000:8.2f} ms", file=sys.stderr)
+        
+        if self.analyzer.is_database_loaded():
+            source = 'snapshot' if self.analyzer.hashcat_mgr.loaded_from_snapshot else 'json'
+            print(f"  (database loaded from {source})", file=sys.stderr)
+    
+    def _start_profiling(self, args):
+        """Enable profiling on a local, single-process analyzer"""
+        if not isinstance(self.analyzer, HashAnalyzer):
+            print("Note: profiling runs locally, not in the daemon", file=sys.stderr)
+            self.analyzer = HashAnalyzer(engine=args.engine)
+        if args.jobs > 1:
+            print("Note: profiling runs in a single process (-j ignored)", file=sys.stderr)
+            args.jobs = 1
+        return self.analyzer.enable_profiling()
+    
+    def _start_metrics(self, args) -> list:
+        """Collect metrics in this process and start the requested exporters"""
+        from lib.metrics import DEFAULT_EXPORT_INTERVAL, IdentifyMetrics, MetricsFileWriter, MetricsServer
+        
+        if not isinstance(self.analyzer, HashAnalyzer):
+            print("Note: metrics are collected locally, not in the daemon", file=sys.stderr)
+            self.analyzer = HashAnalyzer(engine=args.engine)
+        self.metrics = IdentifyMetrics()
+        if not args.serve:
+            # A daemon enables them on the analyzers it loads
+            self.analyzer.enable_metrics(self.metrics)
+        
+        exporters = []
+        try:
+            if args.metrics_file:
+                interval = args.metrics_interval or DEFAULT_EXPORT_INTERVAL
+                exporters.append(MetricsFileWriter(self.metrics.registry, args.metrics_file,
+                                                   interval).start())
+            if args.metrics_port is not None:
+                server = MetricsServer(self.metrics.registry, args.metrics_port).start()
+                print(f"Serving metrics on http://{server.host}:{server.port}/metrics", file=sys.stderr)
+                exporters.append(server)
+        except OSError as e:
+            for exporter in exporters:
+                exporter.stop()
+            self.parser.error(f"cannot export metrics: {e}")
+        return exporters
+    
+    def _report_profile(self, profiler, save_path: str = None):
+        """Print the profile to stderr, or save it as JSON"""
+        from lib.profiler import format_profile
+        
+        report = profiler.report(HashPatterns.get_index())
+        if save_path:
+            import json
+            with open(save_path, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Profile saved to {save_path}", file=sys.stderr)
+        else:
+            print("\n" + format_profile(report), file=sys.stderr)
+    
     def interactive_mode(self):
         """Interactive mode - HASH: prompt"""
         print("=" * 70)
@@ -156,6 +433,7 @@ Examples:
                 
                 elif user_input.lower() == 'clear':
                     os.system('cls' if os.name == 'nt' else 'clear')
+                    from lib.banner import show_banner
                     show_banner(style='hacker', use_color=True)
                     print()
                 
@@ -182,14 +460,23 @@ Examples:
             except Exception as e:
                 print(f"Error: {e}")
     
-    def _process_single_hash(self, hash_input: str, output_format: str, show_features: bool = False, save_path: str = None):
+    def _process_single_hash(self, hash_input: str, output_format: str, show_features: bool = False,
+                             save_path: str = None, fields: list = None, top: int = None):
         """Process and display single hash identification"""
-        result = self.analyzer.identify_hash(hash_input)
+        from lib.formatter import get_formatter, select_fields
+        
+        if top is None:
+            result = self.analyzer.identify_hash(hash_input)
+        else:
+            result = self.analyzer.identify_best(hash_input, top)
         
         # Add features if requested
         if show_features:
             result['features'] = self.analyzer.analyze_hash_features(hash_input)
         
+        if fields and output_format in ('json', 'json_compact', 'ndjson'):
+            result = select_fields(result, fields)
+        
         formatter = get_formatter(output_format)
         formatted_output = formatter(result)
         
@@ -200,39 +487,221 @@ Examples:
                 f.write(formatted_output)
             print(f"\nResults saved to {save_path}")
     
-    def _process_file(self, file_path: str, output_format: str, save_path: str = None):
-        """Process multiple hashes from file"""
-        try:
-            with open(file_path, 'r') as f:
-                hashes = [line.strip() for line in f if line.strip()]
-        except FileNotFoundError:
+    def _process_file(self, file_path: str, output_format: str, save_path: str = None,
+                      jobs: int = 1, chunk_size: int = None, verbose: bool = False,
+                      aggregate: bool = False, fields: list = None,
+                      split_dir: str = None, split_all: bool = False,
+                      flush_every: int = STREAM_FLUSH_LINES, top: int = None):
+        """
+        Process multiple hashes from file, streaming results as they are identified
+        
+        A file_path of '-' reads stdin: results are written out after every
+        batch of at most flush_every lines, as soon as the batch has been
+        read, and nothing else is written to stdout. With top, only the top
+        matches of each hash are identified and shown.
+        """
+        import contextlib
+        from lib.formatter import BatchResultFormatter
+        from lib.pipeline import write_chunks, FLUSH_INTERVAL, WRITE_BUFFER_SIZE
+        from lib.reader import iter_lines
+        
+        from_stdin = file_path == '-'
+        if from_stdin:
+            handle = contextlib.nullcontext(sys.stdin.buffer)
+        else:
+            try:
+                handle = open(file_path, 'rb')
+            except FileNotFoundError:
+                print(f"Error: File '{file_path}' not found", file=sys.stderr)
+                sys.exit(1)
+        
+        # NDJSON stdout carries nothing but result lines, and neither does a pipe
+        notices = sys.stderr if output_format == 'ndjson' or from_stdin else sys.stdout
+        
+        with handle as source:
+            # Lines stay bytes; only the reported input_hash gets decoded
+            hashes = iter_lines(source)
+            if not from_stdin:
+                first = next(hashes, None)
+                if first is None:
+                    print("No hashes found in file", file=sys.stderr)
+                    sys.exit(1)
+                print(f"Processing hashes from '{file_path}'...\n", file=notices)
+                hashes = itertools.chain([first], hashes)
+            
+            if split_dir:
+                self._split_file(hashes, split_dir, split_all, jobs, chunk_size)
+                return
+            
+            streams = [sys.stdout]
+            buffer_size = WRITE_BUFFER_SIZE
+            if aggregate:
+                # Only the counters are kept, so memory does not grow with the file
+                from lib.aggregate import format_aggregate
+                counts = self.analyzer.aggregate(hashes, workers=jobs, chunk_size=chunk_size)
+                chunks = [format_aggregate(counts, output_format)]
+            else:
+                if from_stdin:
+                    results = self._iter_stream_batches(source, flush_every, streams, top)
+                    # Chunks go straight to the streams, which are flushed per batch
+                    buffer_size = 0
+                else:
+                    results = self.analyzer.iter_identify(hashes, workers=jobs, chunk_size=chunk_size,
+                                                          top=top)
+                chunks = BatchResultFormatter.iter_batch(results, output_format, fields=fields)
+            
+            save_file = open(save_path, 'w') if save_path else None
+            if save_file:
+                streams.append(save_file)
+            try:
+                write_chunks(chunks, streams, buffer_size, flush_interval=FLUSH_INTERVAL)
+            finally:
+                if save_file:
+                    save_file.close()
+        
+        if from_stdin:
+            sys.stdout.flush()
+        else:
+            print(file=notices)
+        if save_path:
+            print(f"\nResults saved to {save_path}", file=notices)
+        
+        if verbose and jobs <= 1:
+            info = self.analyzer.cache_info()
+            print(f"Cache: {info['hits']} hits, {info['misses']} misses, "
+                  f"{info['evictions']} evictions ({info['hit_rate']:.1%} hit rate)", file=sys.stderr)
+    
+    def _iter_stream_batches(self, source, flush_every: int, streams: list, top: int = None):
+        """
+        Identify a stream batch by batch, flushing the output streams after
+        each batch and before waiting for the next one
+        """
+        from lib.reader import iter_line_batches
+        
+        for batch in iter_line_batches(source, flush_every):
+            yield from self.analyzer.iter_identify(batch, top=top)
+            for stream in streams:
+                stream.flush()
+    
+    def _split_file(self, hashes, split_dir: str, split_all: bool, jobs: int, chunk_size: int):
+        """Write every input line to the file of its hashcat mode(s)"""
+        from lib.splitter import ModeSplitter
+        
+        # The full lines are written out, so pair each with its result
+        lines, to_identify = itertools.tee(hashes)
+        results = self.analyzer.iter_identify(to_identify, workers=jobs, chunk_size=chunk_size,
+                                              records=True)
+        with ModeSplitter(split_dir, split_all) as splitter:
+            splitter.add_all(zip(lines, results))
+        self._print_split(splitter, split_dir)
+    
+    def _print_split(self, splitter, split_dir: str):
+        """Print the files a split wrote, with their line counts"""
+        manifest = splitter.manifest()
+        print(f"{'File':<24} {'Mode':<8} {'Hash Type':<30} {'Lines':<10}")
+        print("-" * 75)
+        for entry in manifest['files']:
+            print(f"{entry['file']:<24} {entry['hashcat_mode']:<8} {entry['hash_type']:<30} {entry['lines']:<10}")
+        if splitter.unmatched:
+            print(f"{'unmatched.txt':<24} {'-':<8} {'No match':<30} {splitter.unmatched:<10}")
+        print("-" * 75)
+        print(f"\nSplit {splitter.total} hashes into {len(manifest['files'])} mode files in '{split_dir}' "
+              f"(manifest.json lists the counts)")
+    
+    def _process_checkpointed(self, file_path: str, checkpoint_path: str, resume: bool,
+                              output_format: str, save_path: str = None, jobs: int = 1,
+                              chunk_size: int = None, aggregate: bool = False, fields: list = None,
+                              split_dir: str = None, split_all: bool = False, top: int = None):
+        """Process a file like _process_file, saving checkpoints to resume from"""
+        from lib.checkpoint import Checkpoint, restore_stream, stream_position
+        from lib.reader import iter_lines_at
+        
+        if not os.path.isfile(file_path):
             print(f"Error: File '{file_path}' not found", file=sys.stderr)
             sys.exit(1)
         
-        if not hashes:
+        # Anything the output depends on must match when resuming
+        options = {
+            'output': output_format,
+            'fields': fields,
+            'aggregate': aggregate,
+            'split_dir': split_dir and os.path.abspath(split_dir),
+            'split_all': split_all,
+            'save': save_path and os.path.abspath(save_path),
+            'top': top,
+        }
+        checkpoint = Checkpoint(checkpoint_path, file_path, options)
+        state = checkpoint.load() if resume else {}
+        done = checkpoint.line
+        
+        pairs = iter_lines_at(file_path, checkpoint.offset)
+        first = next(pairs, None)
+        if first is None and not resume:
             print("No hashes found in file", file=sys.stderr)
             sys.exit(1)
         
-        print(f"Processing {len(hashes)} hashes...\n")
-        
-        results = self.analyzer.identify_multiple(hashes)
+        # Notices stay off stdout, whose file position is checkpointed
+        if resume:
+            print(f"Resuming '{file_path}' after line {done} (byte {checkpoint.offset})...", file=sys.stderr)
+        else:
+            print(f"Processing hashes from '{file_path}'...", file=sys.stderr)
+        
+        # Results come back in input order, so each is paired with its line and offset
+        meta, lines = itertools.tee(itertools.chain([first] if first else [], pairs))
+        results = self.analyzer.iter_identify((line for line, _ in lines), workers=jobs,
+                                              chunk_size=chunk_size, records=True, top=top)
+        tracked = checkpoint.track(zip(meta, results))
+        
+        if split_dir:
+            from lib.splitter import ModeSplitter
+            with ModeSplitter(split_dir, split_all, state=state.get('split')) as splitter:
+                for line, result in tracked:
+                    splitter.add(line, result)
+                    if checkpoint.due():
+                        checkpoint.save({'split': splitter.to_state()})
+            self._print_split(splitter, split_dir)
+            checkpoint.remove()
+            return
         
-        if output_format in ['json', 'json_compact']:
-            formatter = get_formatter(output_format)
-            output = formatter(results)
-        elif output_format == 'csv':
-            output = BatchResultFormatter.format_csv_batch(results)
+        if aggregate:
+            from lib.aggregate import HashAggregate, format_aggregate
+            counts = HashAggregate.from_state(state['aggregate']) if 'aggregate' in state else HashAggregate()
+            for _, result in tracked:
+                counts.update(result)
+                if checkpoint.due():
+                    checkpoint.save({'aggregate': counts.to_state()})
+            chunks = [format_aggregate(counts, output_format)]
+            summary = None
         else:
-            # Show summary and detailed results
-            output = BatchResultFormatter.format_summary(results)
-            output += "\n" + BatchResultFormatter.format_detailed_batch(results)
+            from lib.formatter import BatchResultFormatter, BatchSummary
+            summary = BatchSummary.from_state(state['summary']) if 'summary' in state else BatchSummary()
+            chunks = BatchResultFormatter.iter_batch((result for _, result in tracked), output_format,
+                                                     summary, fields, resume_from=done)
         
-        print(output)
+        from lib.pipeline import write_chunks, FLUSH_INTERVAL
+        streams = [sys.stdout]
+        if save_path:
+            # Streamed output continues the interrupted file; a histogram is written whole
+            streams.append(open(save_path, 'a' if resume and not aggregate else 'w'))
+        try:
+            for stream, position in zip(streams, state.get('outputs', [])):
+                restore_stream(stream, position)
+            
+            def save_outputs():
+                # A checkpoint before the first result would repeat the header on resume
+                if summary is not None and checkpoint.line and checkpoint.due():
+                    checkpoint.save({'summary': summary.to_state(),
+                                     'outputs': [stream_position(stream) for stream in streams]})
+            
+            write_chunks(chunks, streams, flush_interval=FLUSH_INTERVAL, on_flush=save_outputs)
+            print()
+        finally:
+            for stream in streams[1:]:
+                stream.close()
+        checkpoint.remove()
         
         if save_path:
-            with open(save_path, 'w') as f:
-                f.write(output)
-            print(f"\nResults saved to {save_path}")
+            print(f"Results saved to {save_path}", file=sys.stderr)
     
     def _search_modes(self, query: str):
         """Search hashcat modes"""
@@ -289,7 +758,7 @@ Examples:
         print(f"\nTotal Categories: {len(categories)}")
         print("Use: python hash_identifier.py --list '<category_name>' to see modes")
     
-    def _show_info(self):
+    def _show_info(self, verbose: bool = False):
         """Show database information"""
         info = self.analyzer.get_database_info()
         
@@ -304,8 +773,62 @@ Examples:
         print(f"Last Updated: {info.get('last_updated', '2026-02-02')}")
         print(f"Total Hash Modes: {info.get('total_modes', '450')}")
         print(f"Total Categories: {info['total_categories']}")
+        
+        join = info.get('pattern_join')
+        if join:
+            print(f"Patterns: {join['patterns']} ({len(join['aliased'])} resolved through aliases)")
+            print(f"Patterns Without a Mode: {len(join['patterns_without_mode'])}")
+            print(f"Modes Without a Pattern: {len(join['modes_without_pattern'])}")
+            problems = len(join['name_collisions']) + len(join['stale_aliases'])
+            if problems:
+                print(f"Alias/Name Problems: {problems} (use -v)")
+            if verbose:
+                self._show_pattern_join(join)
         print("=" * 70 + "\n")
     
+    def _show_pattern_join(self, join: dict):
+        """List how patterns resolve to database modes"""
+        print("-" * 70)
+        for pattern, names in join['aliased'].items():
+            print(f"  alias     {pattern} -> {', '.join(names)}")
+        for pattern in join['patterns_without_mode']:
+            print(f"  no mode   {pattern}")
+        for mode, name in join['modes_without_pattern']:
+            print(f"  no match  {mode} {name}")
+        for name, modes in join['name_collisions'].items():
+            print(f"  shared    '{name}' by modes {', '.join(map(str, modes))}")
+        for pattern, names in join['stale_aliases'].items():
+            print(f"  stale     {pattern} -> {', '.join(names)}")
+    
+    def _rebuild_cache(self):
+        """Rebuild the compiled database snapshot"""
+        path = self.analyzer.hashcat_mgr.rebuild_snapshot()
+        
+        if not path:
+            print("Error: Could not write database snapshot", file=sys.stderr)
+            sys.exit(1)
+        
+        total_modes = len(self.analyzer.hashcat_mgr.modes_data.get("hash_modes", []))
+        print(f"Snapshot rebuilt: {path} ({total_modes} modes)")
+    
+    def _serve(self, socket_path: str, cache_size: int = None):
+        """Run the identification daemon until interrupted"""
+        import signal
+        from lib.daemon import HashDaemon
+        from lib.result_cache import DEFAULT_CACHE_SIZE
+        
+        daemon = HashDaemon(socket_path, self.analyzer.hashcat_db_path, self.analyzer.engine,
+                            DEFAULT_CACHE_SIZE if cache_size is None else cache_size,
+                            metrics=self.metrics)
+        daemon.start()
+        
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+        signal.signal(signal.SIGTERM, stop)
+        
+        print(f"Serving on {socket_path} (Ctrl+C to stop)", file=sys.stderr)
+        daemon.serve_forever()
+    
     def _list_category_modes(self, category: str):
         """List modes in a specific category"""
         modes = self.analyzer.get_category_modes(category)
@@ -328,15 +851,23 @@ Examples:
 
 def main():
     """Main entry point"""
-    # Display banner when tool starts
-    show_banner(style='hacker', use_color=True)
-    print()  # Add spacing after banner
+    # Display banner when tool starts, unless disabled
+    if banner_enabled(sys.argv[1:]):
+        from lib.banner import show_banner
+        show_banner(style='hacker', use_color=True)
+        print()  # Add spacing after banner
+    
+    # HXMOD_SOCKET points the CLI at a running `--serve` daemon
+    remote = None
+    if os.environ.get('HXMOD_SOCKET') and '--serve' not in sys.argv:
+        from lib.daemon_client import connect_from_env
+        remote = connect_from_env()
     
-    cli = HashIdentifierCLI()
+    cli = HashIdentifierCLI(remote)
     
     # Check if arguments provided
-    if len(sys.argv) > 1:
-        # CLI mode - process arguments
+    if len(sys.argv) > 1 or stdin_is_piped():
+        # CLI mode - process arguments, or stream piped stdin
         cli.run()
     else:
         # Interactive mode - show prompt
@@ -0,0 +1,203 @@
+"""
+Aggregate Module
+Streaming histograms for `--aggregate` batch runs: how many lines had each
+top match, hashcat mode, category and length, without keeping any results.
+Memory grows with the number of distinct types, not with the input.
+"""
+
+import csv
+import io
+import json
+from typing import Dict, Iterable, List, Tuple
+
+
+class HashAggregate:
+    """Mergeable counters over a stream of identification results"""
+
+    def __init__(self):
+        self.total = 0
+        self.unmatched = 0
+        # (hash_type, mode) -> lines whose top match it is
+        self.top_matches = {}
+        # (mode, hash_type) -> lines listing it among their candidates
+        self.modes = {}
+        # Category of the top match -> lines
+        self.categories = {}
+        # Hash length -> lines
+        self.lengths = {}
+
+    @property
+    def identified(self) -> int:
+        return self.total - self.unmatched
+
+    def update(self, result: Dict):
+        """Count one identification result"""
+        self.total += 1
+        length = result['hash_length']
+        self.lengths[length] = self.lengths.get(length, 0) + 1
+
+        matches = result['matches']
+        if not matches:
+            self.unmatched += 1
+            return
+
+        top = matches[0]
+        key = (top['hash_type'], top['hashcat_mode'])
+        self.top_matches[key] = self.top_matches.get(key, 0) + 1
+        self.categories[top['category']] = self.categories.get(top['category'], 0) + 1
+        for match in matches:
+            key = (match['hashcat_mode'], match['hash_type'])
+            self.modes[key] = self.modes.get(key, 0) + 1
+
+    def update_all(self, results: Iterable[Dict]) -> 'HashAggregate':
+        """Count every result of an iterable, consuming it lazily"""
+        for result in results:
+            self.update(result)
+        return self
+
+    def merge(self, other: 'HashAggregate') -> 'HashAggregate':
+        """Add another aggregate's counts (e.g. a worker's) to this one"""
+        self.total += other.total
+        self.unmatched += other.unmatched
+        for mine, theirs in ((self.top_matches, other.top_matches), (self.modes, other.modes),
+                             (self.categories, other.categories), (self.lengths, other.lengths)):
+            for key, count in theirs.items():
+                mine[key] = mine.get(key, 0) + count
+        return self
+
+    def to_state(self) -> Dict:
+        """Counters as JSON-ready data, for checkpoints"""
+        return {
+            'total': self.total,
+            'unmatched': self.unmatched,
+            'top_matches': [[hash_type, mode, count] for (hash_type, mode), count in self.top_matches.items()],
+            'modes': [[mode, hash_type, count] for (mode, hash_type), count in self.modes.items()],
+            'categories': [[category, count] for category, count in self.categories.items()],
+            'lengths': [[length, count] for length, count in self.lengths.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'HashAggregate':
+        """Rebuild counters saved with to_state()"""
+        aggregate = cls()
+        aggregate.total = state['total']
+        aggregate.unmatched = state['unmatched']
+        aggregate.top_matches = {(hash_type, mode): count for hash_type, mode, count in state['top_matches']}
+        aggregate.modes = {(mode, hash_type): count for mode, hash_type, count in state['modes']}
+        aggregate.categories = {category: count for category, count in state['categories']}
+        aggregate.lengths = {length: count for length, count in state['lengths']}
+        return aggregate
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, HashAggregate):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> Dict:
+        """Histograms as JSON-ready data, most frequent first"""
+        return {
+            'total': self.total,
+            'identified': self.identified,
+            'no_match': self.unmatched,
+            'top_matches': [
+                {'hash_type': hash_type, 'hashcat_mode': mode, 'count': count}
+                for (hash_type, mode), count in _ranked(self.top_matches)
+            ],
+            'modes': [
+                {'hashcat_mode': mode, 'hash_type': hash_type, 'count': count}
+                for (mode, hash_type), count in _ranked(self.modes)
+            ],
+            'categories': [
+                {'category': category, 'count': count}
+                for category, count in _ranked(self.categories)
+            ],
+            'lengths': [
+                {'length': length, 'count': count}
+                for length, count in sorted(self.lengths.items())
+            ],
+        }
+
+
+def _ranked(counts: Dict) -> List[Tuple]:
+    """Counter items by descending count, then by key for a stable order"""
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def format_aggregate_table(aggregate: HashAggregate, top: int = 20) -> str:
+    """Format the histograms as text tables, showing the top entries of each"""
+    def section(title: str, header: str, rows: List[str]) -> List[str]:
+        lines = ["-" * 80, title, header]
+        lines.extend(rows[:top])
+        if len(rows) > top:
+            lines.append(f"... and {len(rows) - top} more")
+        return lines
+
+    output = []
+    output.append("\n" + "=" * 80)
+    output.append("HASH TYPE HISTOGRAM")
+    output.append("=" * 80)
+    output.append(f"Total Hashes Analyzed: {aggregate.total}")
+    output.append(f"Identified: {aggregate.identified}")
+    output.append(f"No Match: {aggregate.unmatched}")
+
+    rows = [f"{hash_type:<40} {mode:<8} {count:<10}"
+            for (hash_type, mode), count in _ranked(aggregate.top_matches)]
+    output += section("Top Matches", f"{'Hash Type':<40} {'Mode':<8} {'Count':<10}", rows)
+
+    rows = [f"{mode:<8} {hash_type:<40} {count:<10}"
+            for (mode, hash_type), count in _ranked(aggregate.modes)]
+    output += section("Candidate Modes", f"{'Mode':<8} {'Hash Type':<40} {'Count':<10}", rows)
+
+    rows = [f"{category:<49} {count:<10}" for category, count in _ranked(aggregate.categories)]
+    output += section("Categories", f"{'Category':<49} {'Count':<10}", rows)
+
+    rows = [f"{length:<49} {count:<10}" for length, count in _ranked(aggregate.lengths)]
+    output += section("Lengths", f"{'Length':<49} {'Count':<10}", rows)
+
+    output.append("=" * 80)
+    return "\n".join(output)
+
+
+def format_aggregate_json(aggregate: HashAggregate, compact: bool = False) -> str:
+    """Format the histograms as JSON"""
+    if compact:
+        return json.dumps(aggregate.to_dict(), separators=(',', ':'))
+    return json.dumps(aggregate.to_dict(), indent=2)
+
+
+def format_aggregate_csv(aggregate: HashAggregate) -> str:
+    """
+    Format the histograms as one CSV table
+
+    Each row is histogram,key,hashcat_mode,count; the totals come first
+    under the 'summary' histogram.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(['histogram', 'key', 'hashcat_mode', 'count'])
+    writer.writerow(['summary', 'total', '', aggregate.total])
+    writer.writerow(['summary', 'identified', '', aggregate.identified])
+    writer.writerow(['summary', 'no_match', '', aggregate.unmatched])
+    for (hash_type, mode), count in _ranked(aggregate.top_matches):
+        writer.writerow(['top_match', hash_type, mode, count])
+    for (mode, hash_type), count in _ranked(aggregate.modes):
+        writer.writerow(['mode', hash_type, mode, count])
+    for category, count in _ranked(aggregate.categories):
+        writer.writerow(['category', category, '', count])
+    for length, count in sorted(aggregate.lengths.items()):
+        writer.writerow(['length', length, '', count])
+    return buffer.getvalue().rstrip("\n")
+
+
+def format_aggregate(aggregate: HashAggregate, output_format: str) -> str:
+    """
+    Format the histograms for an output format accepted by get_formatter()
+
+    json gives indented JSON, json_compact and ndjson give it on a single
+    line, csv gives CSV, and every other format gives the text tables.
+    """
+    if output_format in ('json', 'json_compact', 'ndjson'):
+        return format_aggregate_json(aggregate, compact=output_format != 'json')
+    if output_format == 'csv':
+        return format_aggregate_csv(aggregate)
+    return format_aggregate_table(aggregate)
@@ -0,0 +1,325 @@
+"""
+Async Analyzer Module
+asyncio front end for HashAnalyzer: concurrent callers are micro-batched and
+the CPU work runs in an executor, so identification never blocks the loop
+"""
+
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional
+
+from lib.hash_analyzer import HashAnalyzer
+from lib.parallel import identify_chunk, init_worker, iter_chunks
+
+
+# Most hashes identified per executor call
+DEFAULT_MAX_BATCH_SIZE = 256
+
+# Seconds a partial batch waits for more callers before it is dispatched
+DEFAULT_MAX_DELAY = 0.001
+
+# Batches handed to the executor at once
+DEFAULT_MAX_CONCURRENCY = 2
+
+# Pending hashes before identify() callers (and stream readers) wait
+DEFAULT_MAX_QUEUE = 10000
+
+
+class AsyncHashAnalyzer:
+    """
+    Non-blocking wrapper around a HashAnalyzer
+
+    Usage:
+        async with AsyncHashAnalyzer() as analyzer:
+            result = await analyzer.identify(value)
+            results = await analyzer.identify_many(values)
+            async for result in analyzer.iter_identify(lines):
+                ...
+
+    Work is offloaded to a single background thread by default:
+    identification is CPU-bound and holds the GIL, and the analyzer's caches
+    are not thread-safe, so more threads would only queue on its lock.
+    max_concurrency batches are handed to the executor at once so the next
+    one is ready as soon as the last finishes. Pass processes=N to identify
+    batches in parallel in worker processes that each hold their own
+    analyzer (see lib.parallel), or executor= to share an existing thread
+    pool, whose threads then take turns on the analyzer.
+    """
+
+    def __init__(self, analyzer: Optional[HashAnalyzer] = None,
+                 executor: Optional[Executor] = None, processes: int = 0,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_queue: int = DEFAULT_MAX_QUEUE):
+        if max_batch_size < 1 or max_concurrency < 1 or max_queue < 1:
+            raise ValueError("max_batch_size, max_concurrency and max_queue must be positive")
+        self.analyzer = analyzer or HashAnalyzer()
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+
+        self._owns_executor = executor is None
+        if executor is None and processes > 0:
+            executor = ProcessPoolExecutor(
+                max_workers=processes, initializer=init_worker,
+                initargs=(self.analyzer.hashcat_db_path, self.analyzer.engine,
+                          self.analyzer.result_cache.maxsize))
+            self._run_batch = identify_chunk
+        else:
+            executor = executor or ThreadPoolExecutor(max_workers=1,
+                                                      thread_name_prefix='hxmod-async')
+            self._run_batch = self._identify_locked
+        self._executor = executor
+
+        # HashAnalyzer's caches are not thread-safe; only a shared executor
+        # can run batches on more than one thread
+        self._analyzer_lock = threading.Lock()
+        # Created on first use, inside the running loop
+        self._queue = None
+        self._slots = None
+        self._dispatcher = None
+        self._closed = False
+
+        self.batches = 0
+        self.hashes = 0
+        self.largest_batch = 0
+
+    def _identify_locked(self, hashes: List[str]) -> List[Dict]:
+        with self._analyzer_lock:
+            return [self.analyzer.identify_hash(h) for h in hashes]
+
+    def _start(self):
+        """Create the queue, concurrency slots and dispatcher for this loop"""
+        if self._closed:
+            raise RuntimeError("AsyncHashAnalyzer is closed")
+        if self._dispatcher is None:
+            loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue(self.max_queue)
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _execute(self, hashes: List[str]) -> List[Dict]:
+        """Identify one batch in the executor (caller holds a concurrency slot)"""
+        self.batches += 1
+        self.hashes += len(hashes)
+        self.largest_batch = max(self.largest_batch, len(hashes))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run_batch, hashes)
+
+    async def _run(self, hashes: List[str]) -> List[Dict]:
+        """Identify one batch once a concurrency slot is free"""
+        async with self._slots:
+            return await self._execute(hashes)
+
+    async def _collect(self, batch: List):
+        """Wait for one queued request, then gather more into batch for up to max_delay"""
+        batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _dispatch(self):
+        """Turn queued identify() calls into executor batches"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                await self._collect(batch)
+                # Waiting for a free slot here lets the queue fill up, which in
+                # turn makes identify() callers wait: that is the backpressure
+                await self._slots.acquire()
+            except asyncio.CancelledError:
+                self._fail(batch)
+                raise
+            loop.create_task(self._complete(batch))
+
+    @staticmethod
+    def _fail(batch: List):
+        """Fail the callers of requests that will never be dispatched"""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("AsyncHashAnalyzer is closed"))
+
+    def _fail_queued(self):
+        """Fail every request still waiting in the queue"""
+        batch = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        self._fail(batch)
+
+    async def _complete(self, batch: List):
+        """Run a batch and hand each caller its result, then free its slot"""
+        try:
+            results = await self._execute([value for value, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def identify(self, hash_input: str) -> Dict:
+        """
+        Identify a single hash without blocking the event loop
+
+        Concurrent calls are grouped into batches of up to max_batch_size.
+
+        Args:
+            hash_input: The hash string to identify
+
+        Returns:
+            Same dictionary as HashAnalyzer.identify_hash()
+        
+        Raises:
+            RuntimeError: If the analyzer is closed before the hash is dispatched
+        """
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((hash_input, future))
+        if self._closed:
+            # Closed while this caller waited for room in the queue
+            self._fail_queued()
+        return await future
+
+    async def identify_many(self, hashes: Iterable[str]) -> List[Dict]:
+        """
+        Identify many hashes, in input order
+
+        Args:
+            hashes: Iterable of hash strings
+
+        Returns:
+            List of identification results
+        """
+        results = []
+        async for result in self._iter_batches(self._chunks(hashes)):
+            results.extend(result)
+        return results
+
+    async def iter_identify(self, lines: AsyncIterable[str]) -> AsyncIterator[Dict]:
+        """
+        Identify an async stream of lines, yielding results in input order
+
+        Blank lines are skipped. At most max_queue lines are read ahead.
+
+        Args:
+            lines: Async iterable of hash strings (e.g. a StreamReader wrapper)
+
+        Returns:
+            Async iterator of identification results
+        """
+        self._start()
+        buffer = asyncio.Queue(self.max_queue)
+        done = object()
+        errors = []
+
+        async def read():
+            try:
+                async for line in lines:
+                    line = line.strip()
+                    if line:
+                        await buffer.put(line)
+            except Exception as e:
+                # Re-raised by the consumer once the lines before it are done
+                errors.append(e)
+            await buffer.put(done)
+
+        async def chunks():
+            while True:
+                # Whatever has been read while the last batch ran forms the next one
+                chunk = [await buffer.get()]
+                while len(chunk) < self.max_batch_size and not buffer.empty():
+                    chunk.append(buffer.get_nowait())
+                finished = chunk[-1] is done
+                if finished:
+                    chunk.pop()
+                if chunk:
+                    yield chunk
+                if finished:
+                    return
+
+        reader = asyncio.get_running_loop().create_task(read())
+        try:
+            async for results in self._iter_batches(chunks()):
+                for result in results:
+                    yield result
+            await reader
+            if errors:
+                raise errors[0]
+        finally:
+            reader.cancel()
+
+    async def _chunks(self, hashes: Iterable[str]) -> AsyncIterator[List[str]]:
+        """Split an iterable into lists of at most max_batch_size items"""
+        for chunk in iter_chunks(hashes, self.max_batch_size):
+            yield chunk
+
+    async def _iter_batches(self, chunks) -> AsyncIterator[List[Dict]]:
+        """Run chunks with up to max_concurrency in flight, yielding results in order"""
+        self._start()
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        try:
+            async for chunk in chunks:
+                pending.append(loop.create_task(self._run(chunk)))
+                if len(pending) >= self.max_concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def info(self) -> Dict:
+        """Get batching statistics"""
+        return {
+            'batches': self.batches,
+            'hashes': self.hashes,
+            'largest_batch': self.largest_batch,
+            'average_batch': round(self.hashes / self.batches, 2) if self.batches else 0.0,
+            'queued': self._queue.qsize() if self._queue else 0,
+        }
+
+    async def aclose(self):
+        """
+        Stop the dispatcher and shut down an executor created by this object
+
+        Batches already running still complete; identify() calls that were
+        not dispatched yet raise RuntimeError.
+        """
+        self._closed = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+            self._fail_queued()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
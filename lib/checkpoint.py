@@ -0,0 +1,184 @@
+"""
+Checkpoint Module
+Resumable batch runs (`--checkpoint FILE` / `--resume`). Every few seconds
+the byte offset and line number reached in the input are saved atomically,
+together with the run's counters and the size of every output file. A
+resumed run cuts its outputs back to those sizes and continues reading
+right after the last saved line, so no output line is lost or repeated.
+"""
+
+import json
+import os
+import stat
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+CHECKPOINT_VERSION = 1
+
+# Seconds between checkpoints
+CHECKPOINT_INTERVAL = 5.0
+
+
+class CheckpointError(Exception):
+    """A checkpoint is missing, invalid, or does not fit the current run"""
+
+
+class Checkpoint:
+    """
+    Position and state of one batch run over one input file
+
+    Args:
+        path: Checkpoint file
+        input_path: The input being processed
+        options: Settings the output depends on; a resumed run must use
+            the same ones
+        interval: Seconds between saves (see due()); default CHECKPOINT_INTERVAL
+    """
+
+    def __init__(self, path: str, input_path: str, options: Dict,
+                 interval: Optional[float] = None):
+        self.path = path
+        self.input_path = input_path
+        self.options = options
+        self.interval = CHECKPOINT_INTERVAL if interval is None else interval
+        # Byte offset just past the last line handed on, and lines so far
+        self.offset = 0
+        self.line = 0
+        self._last_save = time.monotonic()
+
+    def _input_identity(self) -> Dict:
+        st = os.stat(self.input_path)
+        return {'path': os.path.abspath(self.input_path), 'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns}
+
+    def load(self) -> Dict:
+        """
+        Read the checkpoint of an interrupted run and continue from it
+
+        Returns:
+            The state saved with it
+
+        Raises:
+            CheckpointError: If there is no usable checkpoint, the input
+                changed, or the options differ
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            raise CheckpointError(f"No checkpoint at '{self.path}'")
+        except ValueError:
+            raise CheckpointError(f"Checkpoint '{self.path}' is not valid JSON")
+
+        if not isinstance(data, dict) or data.get('version') != CHECKPOINT_VERSION:
+            raise CheckpointError(f"Checkpoint '{self.path}' has an unsupported format")
+        if data['input'] != self._input_identity():
+            raise CheckpointError(f"'{self.input_path}' is not the input checkpointed in '{self.path}' "
+                                  f"or it changed since")
+        if data['options'] != self.options:
+            changed = sorted(key for key in set(data['options']) | set(self.options)
+                             if data['options'].get(key) != self.options.get(key))
+            raise CheckpointError(f"Checkpoint was written with different options: {', '.join(changed)}")
+
+        self.offset = data['offset']
+        self.line = data['line']
+        return data['state']
+
+    def track(self, pairs: Iterable[Tuple[Tuple[bytes, int], Dict]]) -> Iterator[Tuple[bytes, Dict]]:
+        """
+        Follow ((line, offset), result) pairs as they are handed on
+
+        Returns:
+            Iterator of (line, result); the position is updated before
+            each pair is yielded
+        """
+        for (line, offset), result in pairs:
+            self.offset = offset
+            self.line += 1
+            yield line, result
+
+    def due(self) -> bool:
+        """Check whether the save interval has passed"""
+        return time.monotonic() - self._last_save >= self.interval
+
+    def save(self, state: Dict):
+        """
+        Atomically write the current position with the given state
+
+        The state must describe exactly the lines handed on so far
+        (and outputs flushed up to them).
+        """
+        data = {
+            'version': CHECKPOINT_VERSION,
+            'input': self._input_identity(),
+            'options': self.options,
+            'offset': self.offset,
+            'line': self.line,
+            'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'state': state,
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def remove(self):
+        """Delete the checkpoint once the run has finished"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def stream_position(stream) -> Optional[List[int]]:
+    """
+    Flush a stream and get [device, inode, offset] if it writes to a regular file
+
+    Returns:
+        None for terminals, pipes and in-memory streams
+    """
+    stream.flush()
+    try:
+        fd = stream.fileno()
+        st = os.fstat(fd)
+    except (OSError, AttributeError, ValueError):
+        return None
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return [st.st_dev, st.st_ino, os.lseek(fd, 0, os.SEEK_CUR)]
+
+
+def restore_stream(stream, position: Optional[List[int]]) -> bool:
+    """
+    Cut a stream's file back to a position from stream_position()
+
+    Nothing is cut when the stream now writes somewhere else (e.g. stdout
+    was a file and is now a pipe).
+
+    Returns:
+        True if the file was cut back
+
+    Raises:
+        CheckpointError: If the file is now shorter than the position
+    """
+    if position is None:
+        return False
+    device, inode, offset = position
+    try:
+        fd = stream.fileno()
+        st = os.fstat(fd)
+    except (OSError, AttributeError, ValueError):
+        return False
+    if (st.st_dev, st.st_ino) != (device, inode):
+        return False
+    if st.st_size < offset:
+        raise CheckpointError("An output file is shorter than when it was checkpointed "
+                              "(append to it with >> or --save when resuming)")
+    stream.flush()
+    os.ftruncate(fd, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return True
@@ -0,0 +1,344 @@
+"""
+Daemon Module
+Keeps one warm HashAnalyzer resident and answers a JSON-lines protocol on a
+Unix domain socket, so scripted callers skip per-process startup
+
+Protocol: one JSON object per line in each direction.
+
+    {"id": 1, "op": "identify", "hash": "8846f7eaee8fb117ad06bdd810b7e332"}
+    {"id": 2, "op": "batch", "hashes": ["...", "..."]}
+    {"id": 3, "op": "search", "query": "bcrypt"}
+    {"id": 4, "op": "mode", "mode": 3200}
+    {"id": 5, "op": "info"}
+
+Every response echoes the request id:
+
+    {"id": 1, "ok": true, "result": {...}}
+    {"id": 9, "ok": false, "error": "Unknown op 'nope'"}
+
+"identify" and "batch" take an optional "top": only the first top matches
+of each hash are then evaluated and returned (HashAnalyzer.identify_best).
+
+"ping" and "reload" are also accepted.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from lib.hash_analyzer import HashAnalyzer
+from lib.pattern_index import DEFAULT_ENGINE
+from lib.result_cache import DEFAULT_CACHE_SIZE
+
+
+# Seconds between checks of the database file for changes
+DEFAULT_RELOAD_INTERVAL = 1.0
+
+# Longest accepted request line
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+# Hashes identified per lock hold, so big batches don't stall other clients
+BATCH_LOCK_CHUNK = 256
+
+OPS = ('identify', 'batch', 'search', 'mode', 'info', 'ping', 'reload')
+
+
+class DaemonRequestError(Exception):
+    """A request that can't be answered; reported back to the client"""
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serve JSON-lines requests on one client connection until it closes"""
+
+    def handle(self):
+        daemon = self.server.daemon
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST_BYTES:
+                self._send({'id': None, 'ok': False, 'error': 'Request too large'})
+                return
+            if not line.strip():
+                continue
+            self._send(daemon.handle_line(line))
+
+    def _send(self, response: Dict):
+        try:
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+        allow_reuse_address = True
+else:  # pragma: no cover - platforms without AF_UNIX
+    _Server = None
+
+
+class HashDaemon:
+    """
+    Unix socket server around a shared HashAnalyzer
+
+    Each client connection gets its own thread. Analyzer calls are
+    serialized by a lock (identification is CPU-bound under the GIL
+    anyway), and batches release it every BATCH_LOCK_CHUNK hashes.
+    When hashcat_modes.json changes, a fresh analyzer is built in the
+    background and swapped in; open connections are not interrupted.
+    With metrics (lib.metrics.IdentifyMetrics), requests are counted and
+    timed per op, and every analyzer reports its results and stages.
+    """
+
+    def __init__(self, socket_path: str, db_path: str = "database/hashcat_modes.json",
+                 engine: str = DEFAULT_ENGINE, cache_size: int = DEFAULT_CACHE_SIZE,
+                 reload_interval: float = DEFAULT_RELOAD_INTERVAL, metrics=None):
+        if _Server is None:
+            raise RuntimeError("Unix domain sockets are not supported on this platform")
+        self.socket_path = socket_path
+        self.db_path = db_path
+        self.engine = engine
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self.reloads = 0
+        self.metrics = metrics
+        # Connection threads share the metrics, so their updates are serialized
+        self._metrics_lock = threading.Lock()
+        if metrics is not None:
+            registry = metrics.registry
+            self._requests = registry.counter('hxmod_requests_total', 'Daemon requests answered',
+                                              ('op', 'ok'))
+            self._request_seconds = registry.histogram('hxmod_request_duration_seconds',
+                                                       'Time to answer a daemon request', ('op',))
+            self._in_flight = registry.gauge('hxmod_requests_in_flight', 'Daemon requests being answered')
+        self._state = self._load()
+        self._stamp = self._db_stamp()
+        self._reload_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._server = None
+
+    def _load(self) -> Tuple[HashAnalyzer, threading.Lock]:
+        """Build a warm analyzer: database loaded and pattern tables compiled"""
+        analyzer = HashAnalyzer(self.db_path, engine=self.engine, cache_size=self.cache_size)
+        # One throwaway identification loads the database and compiles the patterns
+        analyzer.identify_hash('0' * 32)
+        analyzer.configure_cache(self.cache_size)
+        if self.metrics is not None:
+            analyzer.enable_metrics(self.metrics)
+        return analyzer, threading.Lock()
+
+    def _db_stamp(self):
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    @property
+    def analyzer(self) -> HashAnalyzer:
+        """The analyzer currently answering requests"""
+        return self._state[0]
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Swap in a fresh analyzer if the database file changed
+
+        Args:
+            force: Reload even if the file looks unchanged
+
+        Returns:
+            True if a new analyzer was installed
+        """
+        with self._reload_lock:
+            stamp = self._db_stamp()
+            if not force and stamp == self._stamp:
+                return False
+            # Requests keep using the old analyzer until the new one is ready
+            self._state = self._load()
+            self._stamp = stamp
+            self.reloads += 1
+            return True
+
+    def _watch(self):
+        """Poll the database file and reload it when it changes"""
+        while not self._stopped.wait(self.reload_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Warning: Database reload failed: {e}", file=sys.stderr)
+
+    def handle_line(self, line: bytes) -> Dict:
+        """Answer one protocol line"""
+        if self.metrics is None:
+            return self._answer(line)[1]
+
+        start = time.perf_counter()
+        with self._metrics_lock:
+            self._in_flight.inc()
+        op, response = self._answer(line)
+        seconds = time.perf_counter() - start
+        with self._metrics_lock:
+            self._in_flight.dec()
+            # Unknown ops are counted together, so clients can't grow the label set
+            op = op if isinstance(op, str) and op in OPS else 'invalid'
+            self._requests.inc(1, (op, 'true' if response['ok'] else 'false'))
+            self._request_seconds.observe(seconds, (op,))
+        return response
+
+    def _answer(self, line: bytes) -> Tuple[Optional[str], Dict]:
+        """The op of one protocol line (if it has one) and its response"""
+        request_id = op = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise DaemonRequestError('Invalid JSON')
+            if not isinstance(request, dict):
+                raise DaemonRequestError('Request must be a JSON object')
+            request_id = request.get('id')
+            op = request.get('op')
+            return op, {'id': request_id, 'ok': True, 'result': self.handle(request)}
+        except DaemonRequestError as e:
+            return op, {'id': request_id, 'ok': False, 'error': str(e)}
+        except Exception as e:
+            return op, {'id': request_id, 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+    def handle(self, request: Dict):
+        """
+        Answer one decoded request
+
+        Args:
+            request: Request object with an 'op' and its parameters
+
+        Returns:
+            JSON-serializable result
+        """
+        op = request.get('op')
+        analyzer, lock = self._state
+
+        if op == 'identify':
+            value = self._param(request, 'hash', str)
+            identify = self._identifier(analyzer, request)
+            with lock:
+                result = identify(value)
+            self._count_results([result])
+            return result
+
+        if op == 'batch':
+            hashes = self._param(request, 'hashes', list)
+            if not all(isinstance(h, str) for h in hashes):
+                raise DaemonRequestError("'hashes' must be a list of strings")
+            identify = self._identifier(analyzer, request)
+            results = []
+            for start in range(0, len(hashes), BATCH_LOCK_CHUNK):
+                with lock:
+                    results.extend(identify(h) for h in hashes[start:start + BATCH_LOCK_CHUNK])
+            self._count_results(results)
+            return results
+
+        if op == 'search':
+            query = self._param(request, 'query', str)
+            with lock:
+                return analyzer.search_by_name(query)
+
+        if op == 'mode':
+            mode = self._param(request, 'mode', int)
+            with lock:
+                return analyzer.get_mode_details(mode)
+
+        if op == 'info':
+            with lock:
+                return analyzer.get_database_info()
+
+        if op == 'ping':
+            return {'pid': os.getpid(), 'engine': self.engine, 'reloads': self.reloads}
+
+        if op == 'reload':
+            return {'reloaded': self.reload(force=bool(request.get('force')))}
+
+        raise DaemonRequestError(f"Unknown op '{op}' (choose from {', '.join(OPS)})")
+
+    def _count_results(self, results):
+        """Count identified hashes into the metrics, if enabled"""
+        if self.metrics is None:
+            return
+        with self._metrics_lock:
+            self.metrics.lines_read.inc(len(results))
+            for result in results:
+                self.metrics.observe(result)
+
+    def _identifier(self, analyzer: HashAnalyzer, request: Dict):
+        """The identify method for a request, honouring its optional 'top'"""
+        if request.get('top') is None:
+            return analyzer.identify_hash
+        top = self._param(request, 'top', int)
+        if top < 1:
+            raise DaemonRequestError("'top' must be at least 1")
+        return lambda hash_input: analyzer.identify_best(hash_input, top)
+
+    @staticmethod
+    def _param(request: Dict, name: str, expected_type):
+        value = request.get(name)
+        if not isinstance(value, expected_type) or isinstance(value, bool):
+            raise DaemonRequestError(f"'{name}' must be of type {expected_type.__name__}")
+        return value
+
+    def _remove_stale_socket(self):
+        """Remove a socket file left behind by a daemon that is no longer running"""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.remove(self.socket_path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        finally:
+            probe.close()
+
+    def start(self):
+        """Bind the socket and start the reload watcher"""
+        self._remove_stale_socket()
+        old_umask = os.umask(0o077)
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon = self
+
+        if self.reload_interval:
+            threading.Thread(target=self._watch, name='hxmod-reload', daemon=True).start()
+
+    def serve_forever(self):
+        """Serve requests until shutdown() is called"""
+        if self._server is None:
+            self.start()
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """Stop serve_forever() (call from another thread)"""
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+
+    def close(self):
+        """Release the socket and remove its file"""
+        self._stopped.set()
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
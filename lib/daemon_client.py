@@ -0,0 +1,186 @@
+"""
+Daemon Client Module
+Talks to a running `hxmod --serve` daemon (see lib.daemon), and lets the
+CLI forward its work there when HXMOD_SOCKET is set
+"""
+
+import itertools
+import json
+import os
+import socket
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+# Environment variable naming the daemon socket the CLI should use
+SOCKET_ENV = 'HXMOD_SOCKET'
+
+# Hashes sent per batch request
+CLIENT_BATCH_SIZE = 1000
+
+
+class DaemonError(Exception):
+    """The daemon rejected a request"""
+
+
+class DaemonClient:
+    """Blocking JSON-lines client for one daemon connection"""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        self.socket_path = socket_path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(socket_path)
+        except OSError:
+            self._sock.close()
+            raise
+        self._reader = self._sock.makefile('rb')
+        self._next_id = 0
+
+    def request(self, op: str, **params):
+        """
+        Send one request and wait for its result
+
+        Raises:
+            DaemonError: If the daemon answered with an error
+            ConnectionError: If the daemon closed the connection
+        """
+        self._next_id += 1
+        params.update(op=op, id=self._next_id)
+        self._sock.sendall(json.dumps(params).encode('utf-8') + b'\n')
+
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError(f"Daemon at {self.socket_path} closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Unknown daemon error'))
+        return response['result']
+
+    def identify(self, hash_value: str, top: Optional[int] = None) -> Dict:
+        if top is None:
+            return self.request('identify', hash=hash_value)
+        return self.request('identify', hash=hash_value, top=top)
+
+    def batch(self, hashes: List[str], top: Optional[int] = None) -> List[Dict]:
+        if top is None:
+            return self.request('batch', hashes=list(hashes))
+        return self.request('batch', hashes=list(hashes), top=top)
+
+    def search(self, query: str) -> List[Dict]:
+        return self.request('search', query=query)
+
+    def mode(self, mode_number: int) -> Optional[Dict]:
+        return self.request('mode', mode=mode_number)
+
+    def info(self) -> Dict:
+        return self.request('info')
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RemoteAnalyzer:
+    """
+    Stand-in for HashAnalyzer that answers from a daemon
+
+    Identification, search, mode and info lookups go over the socket;
+    anything else is delegated to a local HashAnalyzer created on first
+    use, so every CLI command keeps working unchanged.
+    """
+
+    def __init__(self, client: DaemonClient):
+        self.client = client
+        self.engine = None
+        self._local = None
+
+    @property
+    def local(self):
+        """Local analyzer for the commands the daemon does not serve"""
+        if self._local is None:
+            from lib.hash_analyzer import HashAnalyzer
+            kwargs = {'engine': self.engine} if self.engine else {}
+            self._local = HashAnalyzer(**kwargs)
+        return self._local
+
+    def __getattr__(self, name):
+        return getattr(self.local, name)
+
+    def identify_hash(self, hash_input) -> Dict:
+        if isinstance(hash_input, bytes):
+            hash_input = hash_input.decode('utf-8', 'replace')
+        return self.client.identify(hash_input)
+
+    def identify_best(self, hash_input, top: int = 1) -> Dict:
+        """identify_hash() with only the top matches, evaluated as such by the daemon"""
+        if isinstance(hash_input, bytes):
+            hash_input = hash_input.decode('utf-8', 'replace')
+        return self.client.identify(hash_input, top)
+
+    def identify_multiple(self, hashes: List[str], workers: int = 1,
+                          chunk_size: Optional[int] = None, records: bool = False,
+                          top: Optional[int] = None) -> List[Dict]:
+        return list(self.iter_identify(hashes, workers, chunk_size, top=top))
+
+    def iter_identify(self, hashes: Iterable[str], workers: int = 1,
+                      chunk_size: Optional[int] = None, records: bool = False,
+                      top: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Identify hashes in batch requests of chunk_size
+
+        workers is ignored, and results are always dictionaries (they read
+        the same as the HashResult records asked for with records). With
+        top, the daemon only evaluates and sends the top matches.
+        """
+        hashes = iter(hashes)
+        size = chunk_size or CLIENT_BATCH_SIZE
+        while True:
+            chunk = list(itertools.islice(hashes, size))
+            if not chunk:
+                return
+            # JSON carries text, so bytes lines from the block reader are decoded here
+            chunk = [h.decode('utf-8', 'replace') if isinstance(h, bytes) else h for h in chunk]
+            yield from self.client.batch(chunk, top)
+
+    def aggregate(self, hashes: Iterable[str], workers: int = 1,
+                  chunk_size: Optional[int] = None):
+        """Count daemon results into a HashAggregate (workers is ignored)"""
+        from lib.aggregate import HashAggregate
+        return HashAggregate().update_all(self.iter_identify(hashes, workers, chunk_size))
+    
+    def search_by_name(self, name: str) -> List[Dict]:
+        return self.client.search(name)
+
+    def get_mode_details(self, mode_number: int) -> Optional[Dict]:
+        return self.client.mode(mode_number)
+
+    def search_by_mode_number(self, mode_num: int) -> Optional[Dict]:
+        return self.client.mode(mode_num)
+
+    def get_database_info(self) -> Dict:
+        return self.client.info()
+
+
+def connect_from_env(environ=None) -> Optional[RemoteAnalyzer]:
+    """
+    Connect to the daemon named by HXMOD_SOCKET
+
+    Returns:
+        RemoteAnalyzer, or None if the variable is unset or nothing is
+        listening (callers then fall back to a local analyzer)
+    """
+    environ = os.environ if environ is None else environ
+    socket_path = environ.get(SOCKET_ENV)
+    if not socket_path:
+        return None
+    try:
+        return RemoteAnalyzer(DaemonClient(socket_path))
+    except OSError:
+        return None
@@ -4,9 +4,54 @@ Formats hash identification results for CLI display
 """
 
 import json
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 from datetime import datetime
 
+from lib.records import as_dict
+
+
+def _shorten(text: str, width: int = 50) -> str:
+    """Cut text to width characters for display, marking the cut"""
+    return text[:width] + ('...' if len(text) > width else '')
+
+
+def _top(result: Dict, key: str):
+    return result['matches'][0][key] if result['matches'] else None
+
+
+# Keys selectable with --fields, and how each is read from a result
+RESULT_FIELDS = {
+    'hash': lambda r: r['input_hash'],
+    'length': lambda r: r['hash_length'],
+    'confidence': lambda r: r['confidence'],
+    'match_count': lambda r: len(r['matches']),
+    'top_type': lambda r: _top(r, 'hash_type'),
+    'top_mode': lambda r: _top(r, 'hashcat_mode'),
+    'top_category': lambda r: _top(r, 'category'),
+    'modes': lambda r: [m['hashcat_mode'] for m in r['matches']],
+    'matches': lambda r: r['matches'],
+}
+
+
+def parse_fields(spec: str) -> List[str]:
+    """
+    Parse a comma-separated --fields list
+    
+    Raises:
+        ValueError: If a name is not in RESULT_FIELDS
+    """
+    fields = [name.strip() for name in spec.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in RESULT_FIELDS]
+    if unknown or not fields:
+        raise ValueError(f"Unknown field(s) '{', '.join(unknown)}' "
+                         f"(choose from {', '.join(RESULT_FIELDS)})")
+    return fields
+
+
+def select_fields(result: Dict, fields: List[str]) -> Dict:
+    """Reduce a result to the given RESULT_FIELDS, in that order"""
+    return {name: RESULT_FIELDS[name](result) for name in fields}
+
 
 class OutputFormatter:
     """Formats output in various styles"""
@@ -66,7 +111,7 @@ class OutputFormatter:
         output.append("\n" + "=" * 80)
         output.append("DETAILED HASH IDENTIFICATION RESULTS")
         output.append("=" * 80)
-        output.append(f"\nInput Hash (first 100 chars): {result['input_hash']}")
+        output.append(f"\nInput Hash (first 50 chars): {_shorten(result['input_hash'])}")
         output.append(f"Hash Length: {result['hash_length']} characters")
         output.append(f"Overall Confidence: {result['confidence']}%")
         output.append(f"Matches Found: {len(result['matches'])}")
@@ -95,12 +140,17 @@ class OutputFormatter:
     @staticmethod
     def format_json(result: Dict) -> str:
         """Format result as JSON"""
-        return json.dumps(result, indent=2)
+        return json.dumps(as_dict(result), indent=2)
     
     @staticmethod
     def format_json_compact(result: Dict) -> str:
         """Format result as compact JSON"""
-        return json.dumps(result, separators=(',', ':'))
+        return json.dumps(as_dict(result), separators=(',', ':'))
+    
+    @staticmethod
+    def format_ndjson(result: Dict) -> str:
+        """Format result as one line of newline-delimited JSON"""
+        return json.dumps(as_dict(result), separators=(',', ':'))
     
     @staticmethod
     def format_csv(result: Dict) -> str:
@@ -162,6 +212,51 @@ class OutputFormatter:
         return f"{top_match['hash_type']} (Mode: {top_match['hashcat_mode']}, Confidence: {top_match['confidence']}%)"
 
 
+class BatchSummary:
+    """Running counters for a batch, so a summary needs no retained results"""
+    
+    def __init__(self):
+        self.total = 0
+        self.identified = 0
+        self.top_matches = {}
+    
+    @property
+    def unmatched(self) -> int:
+        return self.total - self.identified
+    
+    def update(self, result: Dict):
+        """Count one identification result"""
+        self.total += 1
+        if result['matches']:
+            self.identified += 1
+            top = result['matches'][0]
+            key = (top['hash_type'], top['hashcat_mode'])
+            self.top_matches[key] = self.top_matches.get(key, 0) + 1
+    
+    def track(self, results: Iterable[Dict]) -> Iterator[Dict]:
+        """Pass results through unchanged while counting them"""
+        for result in results:
+            self.update(result)
+            yield result
+    
+    def to_state(self) -> Dict:
+        """Counters as JSON-ready data, for checkpoints"""
+        return {
+            'total': self.total,
+            'identified': self.identified,
+            'top_matches': [[hash_type, mode, count] for (hash_type, mode), count in self.top_matches.items()],
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict) -> 'BatchSummary':
+        """Rebuild counters saved with to_state()"""
+        summary = cls()
+        summary.total = state['total']
+        summary.identified = state['identified']
+        summary.top_matches = {(hash_type, mode): count for hash_type, mode, count in state['top_matches']}
+        return summary
+
+
 class BatchResultFormatter:
     """Format results from multiple hashes"""
     
@@ -189,15 +284,48 @@ class BatchResultFormatter:
         output.append("\n" + "=" * 80)
         return "\n".join(output)
     
+    @staticmethod
+    def format_running_summary(summary: BatchSummary, top: int = 10) -> str:
+        """Format a batch summary from running counters"""
+        output = []
+        output.append("\n" + "=" * 80)
+        output.append("BATCH HASH IDENTIFICATION SUMMARY")
+        output.append("=" * 80)
+        output.append(f"Total Hashes Analyzed: {summary.total}")
+        output.append(f"Identified: {summary.identified}")
+        output.append(f"No Match: {summary.unmatched}")
+        output.append(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        if summary.top_matches:
+            output.append("-" * 80)
+            output.append(f"{'Top Match':<40} {'Mode':<8} {'Count':<10}")
+            ranked = sorted(summary.top_matches.items(), key=lambda x: x[1], reverse=True)
+            for (hash_type, mode), count in ranked[:top]:
+                output.append(f"{hash_type:<40} {mode:<8} {count:<10}")
+            if len(ranked) > top:
+                output.append(f"... and {len(ranked) - top} more types")
+        
+        output.append("=" * 80)
+        return "\n".join(output)
+    
     @staticmethod
     def format_detailed_batch(results: List[Dict]) -> str:
         """Format detailed results for multiple hashes"""
-        output = []
-        output.append("\n" + "=" * 100)
-        output.append("DETAILED BATCH RESULTS")
-        output.append("=" * 100)
+        return "".join(BatchResultFormatter.iter_detailed_batch(results))
+    
+    @staticmethod
+    def iter_detailed_batch(results: Iterable[Dict], resume_from: int = 0) -> Iterator[str]:
+        """
+        Stream detailed results for multiple hashes, one chunk per hash
         
-        for idx, result in enumerate(results, 1):
+        With resume_from, the header is left out and numbering continues
+        after that many hashes already written.
+        """
+        if not resume_from:
+            yield "\n" + "=" * 100 + "\nDETAILED BATCH RESULTS\n" + "=" * 100
+        
+        for idx, result in enumerate(results, resume_from + 1):
+            output = [""]
             output.append(f"\n--- Hash #{idx} ---")
             output.append(f"Length: {result['hash_length']}")
             
@@ -209,29 +337,107 @@ class BatchResultFormatter:
                     output.append(f"  ... and {len(result['matches']) - 3} more")
             else:
                 output.append("No matches found")
+            yield "\n".join(output)
         
-        output.append("\n" + "=" * 100)
-        return "\n".join(output)
+        yield "\n\n" + "=" * 100
     
     @staticmethod
     def format_json_batch(results: List[Dict]) -> str:
         """Format batch results as JSON"""
         return json.dumps(results, indent=2)
     
+    @staticmethod
+    def iter_json_batch(results: Iterable[Dict], compact: bool = False,
+                        resume_from: int = 0) -> Iterator[str]:
+        """
+        Stream batch results as a JSON array
+        
+        The concatenated chunks equal json.dumps(results) with indent=2,
+        or with compact separators when compact is set. With resume_from,
+        the array continues after that many items already written.
+        """
+        empty = not resume_from
+        for result in results:
+            if compact:
+                item = json.dumps(result, separators=(',', ':'))
+                yield ("[" if empty else ",") + item
+            else:
+                item = json.dumps(result, indent=2).replace("\n", "\n  ")
+                yield ("[\n  " if empty else ",\n  ") + item
+            empty = False
+        
+        if empty:
+            yield "[]"
+        else:
+            yield "]" if compact else "\n]"
+    
+    @staticmethod
+    def iter_ndjson_batch(results: Iterable[Dict]) -> Iterator[str]:
+        """Stream batch results as newline-delimited JSON, one line per hash"""
+        for result in results:
+            yield json.dumps(result, separators=(',', ':')) + "\n"
+    
     @staticmethod
     def format_csv_batch(results: List[Dict]) -> str:
         """Format batch results as CSV"""
-        lines = ["hash_number,hash_length,top_match,mode,confidence,total_matches"]
+        return "".join(BatchResultFormatter.iter_csv_batch(results))
+    
+    @staticmethod
+    def iter_csv_batch(results: Iterable[Dict], resume_from: int = 0) -> Iterator[str]:
+        """
+        Stream batch results as CSV, one chunk per hash
         
-        for idx, result in enumerate(results, 1):
+        With resume_from, the header is left out and numbering continues
+        after that many rows already written.
+        """
+        if not resume_from:
+            yield "hash_number,hash_length,top_match,mode,confidence,total_matches"
+        
+        for idx, result in enumerate(results, resume_from + 1):
             if result['matches']:
                 top = result['matches'][0]
                 line = f"{idx},{result['hash_length']},\"{top['hash_type']}\",{top['hashcat_mode']},{top['confidence']},{len(result['matches'])}"
             else:
                 line = f"{idx},{result['hash_length']},No match,N/A,0,0"
-            lines.append(line)
+            yield "\n" + line
+    
+    @staticmethod
+    def iter_batch(results: Iterable[Dict], output_format: str, summary: BatchSummary = None,
+                   fields: List[str] = None, resume_from: int = 0) -> Iterator[str]:
+        """
+        Stream a whole batch in the given output format
         
-        return "\n".join(lines)
+        Args:
+            results: Iterable of identification results (consumed lazily)
+            output_format: Any format accepted by get_formatter()
+            summary: Counters to update; the text formats end with a
+                summary built from them
+            fields: RESULT_FIELDS to keep in the JSON formats (default: all)
+            resume_from: Results already written by an interrupted run;
+                the output continues that run's output exactly
+            
+        Returns:
+            Iterator of output chunks
+        """
+        summary = summary if summary is not None else BatchSummary()
+        results = summary.track(results)
+        if output_format in ['json', 'json_compact', 'ndjson']:
+            # HashResult records (lib.records) are serialized as dictionaries
+            results = (as_dict(result) for result in results)
+            if fields:
+                results = (select_fields(result, fields) for result in results)
+        
+        if output_format == 'ndjson':
+            yield from BatchResultFormatter.iter_ndjson_batch(results)
+        elif output_format in ['json', 'json_compact']:
+            yield from BatchResultFormatter.iter_json_batch(results, output_format == 'json_compact',
+                                                            resume_from)
+        elif output_format == 'csv':
+            yield from BatchResultFormatter.iter_csv_batch(results, resume_from)
+        else:
+            # Detailed results as they arrive, summary once the counts are final
+            yield from BatchResultFormatter.iter_detailed_batch(results, resume_from)
+            yield "\n" + BatchResultFormatter.format_running_summary(summary)
 
 
 def get_formatter(format_type: str):
@@ -242,6 +448,7 @@ def get_formatter(format_type: str):
         'detailed': OutputFormatter.format_detailed,
         'json': OutputFormatter.format_json,
         'json_compact': OutputFormatter.format_json_compact,
+        'ndjson': OutputFormatter.format_ndjson,
         'csv': OutputFormatter.format_csv,
         'compact': OutputFormatter.format_compact,
         'hashcat': OutputFormatter.format_unix_hashcat,
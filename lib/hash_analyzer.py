@@ -4,23 +4,63 @@ Core logic for hash identification and analysis
 Integrates pattern matching with hashcat modes database
 """
 
-import json
+import itertools
 import os
 import re
-from typing import Dict, List, Optional
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
 from lib.hash_patterns import HashPatterns
+from lib.mode_search import ModeSearchIndex
+from lib.pattern_join import build_pattern_join
+from lib.profiler import PatternProfiler, StageTee
+from lib.pattern_index import ENGINES, DEFAULT_ENGINE
+from lib.records import HashResult, MatchRecord, ModeRecord
+from lib.result_cache import ResultCache, DEFAULT_CACHE_SIZE
+from lib.snapshot import load_snapshot, save_snapshot
+
+
+_numpy_installed = None
+
+
+def numpy_installed() -> bool:
+    """Check for NumPy without importing it"""
+    global _numpy_installed
+    if _numpy_installed is None:
+        import importlib.util
+        _numpy_installed = importlib.util.find_spec('numpy') is not None
+    return _numpy_installed
 
 
 class HashcatModeManager:
     """Manages hashcat modes database and lookups"""
     
-    def __init__(self, db_path: str = "database/hashcat_modes.json"):
+    def __init__(self, db_path: str = "database/hashcat_modes.json", use_snapshot: bool = True):
         self.db_path = db_path
-        self.modes_data = self._load_database()
-        self._build_indexes()
+        self.loaded_from_snapshot = False
+        # Shared ModeRecords by id() of their mode dict, built on first use
+        self._records = {}
+        
+        # A valid snapshot replaces JSON parsing, index building and pattern compiling
+        snapshot = load_snapshot(db_path) if use_snapshot else None
+        if snapshot:
+            self.modes_data = snapshot['modes_data']
+            self._set_indexes(snapshot['indexes'])
+            if not HashPatterns.is_index_loaded():
+                # Unpickling compiles the regexes, so defer it until a hash is matched
+                HashPatterns.set_index_loader(snapshot['pattern_index'])
+            self.loaded_from_snapshot = True
+        else:
+            # Snapshots are only written on request (save_snapshot, rebuild_snapshot)
+            self.modes_data = self._load_database()
+            self._build_indexes()
+        
+        self._build_pattern_join()
     
     def _load_database(self) -> Dict:
         """Load hashcat modes database"""
+        # Only needed when there is no valid snapshot
+        import json
+        
         try:
             with open(self.db_path, 'r') as f:
                 return json.load(f)
@@ -41,14 +81,55 @@ class HashcatModeManager:
             # Index by mode number
             self.mode_by_number[mode["mode"]] = mode
             
-            # Index by name (case-insensitive)
-            self.modes_by_name[mode["name"].lower()] = mode
+            # Index by name (case-insensitive); the first of colliding names wins
+            self.modes_by_name.setdefault(mode["name"].lower(), mode)
             
             # Index by category
             cat = mode.get("category", "Unknown")
             if cat not in self.modes_by_category:
                 self.modes_by_category[cat] = []
             self.modes_by_category[cat].append(mode)
+        
+        self.search_index = ModeSearchIndex(self.modes_data.get("hash_modes", []))
+    
+    def _build_pattern_join(self):
+        """
+        Resolve every pattern to its modes once, so matching never looks
+        names up (see lib.pattern_join); join_report lists what does not
+        line up between the patterns and the database
+        """
+        self.pattern_modes, self.join_report = build_pattern_join(
+            HashPatterns.PATTERNS, self.modes_data.get("hash_modes", []))
+        self._pattern_records = None
+    
+    def _get_indexes(self) -> Dict:
+        """Get the lookup indexes, for snapshotting"""
+        return {
+            'mode_by_number': self.mode_by_number,
+            'modes_by_category': self.modes_by_category,
+            'modes_by_name': self.modes_by_name,
+            'search_index': self.search_index,
+        }
+    
+    def _set_indexes(self, indexes: Dict):
+        """Install lookup indexes loaded from a snapshot"""
+        self.mode_by_number = indexes['mode_by_number']
+        self.modes_by_category = indexes['modes_by_category']
+        self.modes_by_name = indexes['modes_by_name']
+        self.search_index = indexes['search_index']
+    
+    def save_snapshot(self) -> Optional[str]:
+        """Write the compiled snapshot next to the JSON database"""
+        return save_snapshot(self.db_path, self.modes_data, self._get_indexes())
+    
+    def rebuild_snapshot(self) -> Optional[str]:
+        """Reload the JSON database and rewrite its snapshot"""
+        self.modes_data = self._load_database()
+        self._build_indexes()
+        self._build_pattern_join()
+        self._records = {}
+        self.loaded_from_snapshot = False
+        return self.save_snapshot()
     
     def get_mode_by_number(self, mode_num: int) -> Optional[Dict]:
         """Get hash mode by hashcat mode number"""
@@ -58,21 +139,35 @@ class HashcatModeManager:
         """Get hash mode by name"""
         return self.modes_by_name.get(name.lower())
     
+    def _record(self, mode: Dict) -> ModeRecord:
+        """Get the shared record of a mode dict"""
+        record = self._records.get(id(mode))
+        if record is None:
+            record = self._records[id(mode)] = ModeRecord(mode)
+        return record
+    
+    def get_pattern_records(self, pattern: str) -> tuple:
+        """Get the shared records of the modes a pattern resolves to"""
+        if self._pattern_records is None:
+            self._pattern_records = {
+                key: tuple(self._record(mode) for mode in modes)
+                for key, modes in self.pattern_modes.items()
+            }
+        return self._pattern_records.get(pattern, ())
+    
     def get_modes_by_category(self, category: str) -> List[Dict]:
         """Get all modes in a category"""
         return self.modes_by_category.get(category, [])
     
-    def search_modes(self, query: str) -> List[Dict]:
-        """Search modes by name or description"""
-        results = []
-        query_lower = query.lower()
-        
-        for mode in self.modes_data.get("hash_modes", []):
-            if (query_lower in mode["name"].lower() or 
-                query_lower in mode.get("description", "").lower()):
-                results.append(mode)
+    def search_modes(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Search modes by name, variant, description or mode number
         
-        return results
+        Results are ranked (exact name first, then prefixes, then words
+        of names, variants and descriptions) and tolerate small typos;
+        see ModeSearchIndex.
+        """
+        return self.search_index.search(query, limit)
     
     def get_all_categories(self) -> List[str]:
         """Get all available categories"""
@@ -86,77 +181,543 @@ class HashcatModeManager:
 class HashAnalyzer:
     """Main hash analyzer class"""
     
-    def __init__(self, hashcat_db_path: str = "database/hashcat_modes.json"):
-        self.hashcat_mgr = HashcatModeManager(hashcat_db_path)
+    # Batches smaller than this are identified serially even if workers are
+    # requested: below it, starting the pool costs more than it saves
+    PARALLEL_MIN_HASHES = 10000
+    
+    # Batches at least this long are bucketed by hex shape with NumPy, if installed
+    VECTOR_MIN_BATCH = 64
+    
+    # Hashes per vectorized chunk when streaming
+    VECTOR_CHUNK_SIZE = 4096
+    
+    def __init__(self, hashcat_db_path: str = "database/hashcat_modes.json",
+                 engine: str = DEFAULT_ENGINE, cache_size: int = DEFAULT_CACHE_SIZE,
+                 use_snapshot: bool = True, vectorize: bool = True):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown pattern engine '{engine}' (choose from {', '.join(ENGINES)})")
+        self.engine = engine
+        self.hashcat_db_path = hashcat_db_path
+        self.use_snapshot = use_snapshot
+        # The database is loaded on first use, so commands that never look
+        # up a mode never pay for it
+        self._hashcat_mgr = None
+        self.timings = {}
         self.patterns = HashPatterns()
+        # Finished match lists keyed by the set of matching pattern classes
+        self._matches_by_class_key = {}
+        # Match records of single patterns, for best-match lookups
+        self._matches_by_pattern = {}
+        # Finished match lists of raw hex, keyed by hash shape
+        self.result_cache = ResultCache(cache_size)
+        # Use the NumPy shape classifier for batches (see lib.vectorized)
+        self.vectorize = vectorize
+        # PatternProfiler while profiling is enabled (see enable_profiling)
+        self.profiler = None
+        # IdentifyMetrics while metrics are enabled (see enable_metrics)
+        self.metrics = None
+    
+    @property
+    def hashcat_mgr(self) -> HashcatModeManager:
+        """Hashcat modes database, loaded on first access"""
+        if self._hashcat_mgr is None:
+            start = time.perf_counter()
+            self._hashcat_mgr = HashcatModeManager(self.hashcat_db_path, self.use_snapshot)
+            self.timings['database'] = time.perf_counter() - start
+        return self._hashcat_mgr
+    
+    def is_database_loaded(self) -> bool:
+        """Check whether the hashcat modes database has been loaded"""
+        return self._hashcat_mgr is not None
     
     def identify_hash(self, hash_input: str) -> Dict:
         """
         Identify hash and return comprehensive analysis
         
         Args:
-            hash_input: The hash string to identify
+            hash_input: The hash string to identify; ASCII bytes are
+                matched without being decoded
             
         Returns:
             Dictionary containing identification results
         """
-        hash_input = hash_input.strip()
+        hash_input, matches = self._lookup(hash_input)
+        return {
+            'input_hash': self._reported(hash_input),
+            'hash_length': len(hash_input),
+            'matches': [match.to_dict() for match in matches],
+            'confidence': matches[0].confidence if matches else 'Unknown'
+        }
+    
+    def identify_record(self, hash_input: str) -> HashResult:
+        """
+        Identify hash and return a compact HashResult (see lib.records)
+        
+        The result only references shared match records; it reads like
+        the identify_hash() dictionary and to_dict() converts it.
+        """
+        hash_input, matches = self._lookup(hash_input)
+        return HashResult(self._reported(hash_input), len(hash_input), matches)
+    
+    def _prepare(self, hash_input):
+        """Strip an input; ASCII bytes are stripped without being decoded"""
+        if isinstance(hash_input, bytes):
+            return self.patterns.prepare(hash_input)
+        return hash_input.strip()
+    
+    def _class_matches(self, class_key: tuple) -> tuple:
+        """Hashcat modes for a set of matching patterns, resolved once and reused"""
+        matches = self._matches_by_class_key.get(class_key)
+        if matches is None:
+            matches = self._resolve_matches(class_key)
+            self._matches_by_class_key[class_key] = matches
+        return matches
+    
+    def _lookup(self, hash_input) -> tuple:
+        """Normalize an input and find its shared tuple of MatchRecords"""
+        hash_input = self._prepare(hash_input)
+        
+        cache = self.result_cache
+        # Raw hex only depends on its shape; other inputs go straight to the
+        # class-key memo, which a cache keyed by value would only repeat
+        cache_key = self.patterns.shape_key(hash_input) if cache.maxsize else None
+        matches = cache.get(cache_key) if cache_key else None
+        
+        if matches is None:
+            # Step 1: Match against regex patterns (each distinct regex runs once)
+            class_key = self.patterns.match_classes(hash_input, self.engine)
+            
+            # Step 2: Hashcat modes for this set of patterns
+            matches = self._class_matches(class_key)
+            
+            if cache_key:
+                cache.put(cache_key, matches)
+        
+        return hash_input, matches
+    
+    def identify_best(self, hash_input: str, top: int = 1) -> Dict:
+        """
+        Identify a hash, keeping only its top matches
         
-        # Step 1: Match against regex patterns
-        pattern_matches = self.patterns.identify_by_pattern(hash_input)
+        The result equals identify_hash() with the matches cut to the first
+        top, but patterns are evaluated best first and only until no other
+        pattern could still outrank them: a bcrypt or Argon2 hash is decided
+        by its own pattern alone.
         
-        # Step 2: Try to find corresponding hashcat modes
-        results = {
-            'input_hash': hash_input[:50] + ('...' if len(hash_input) > 50 else ''),
+        Args:
+            hash_input: The hash string (or ASCII bytes) to identify
+            top: Number of matches to keep
+        
+        Returns:
+            Dictionary containing identification results
+        """
+        hash_input, matches = self._lookup_best(hash_input, top)
+        return {
+            'input_hash': self._reported(hash_input),
             'hash_length': len(hash_input),
-            'matches': [],
-            'confidence': 'Unknown'
+            'matches': [match.to_dict() for match in matches],
+            'confidence': matches[0].confidence if matches else 'Unknown'
         }
+    
+    def identify_best_record(self, hash_input: str, top: int = 1) -> HashResult:
+        """identify_best() returning a compact HashResult (see identify_record)"""
+        hash_input, matches = self._lookup_best(hash_input, top)
+        return HashResult(self._reported(hash_input), len(hash_input), matches)
+    
+    def _lookup_best(self, hash_input, top: int) -> tuple:
+        """Normalize an input and find its first top MatchRecords"""
+        hash_input = self._prepare(hash_input)
         
-        seen_modes = set()
+        # Raw hex recurs by shape, so its full matches come from the cache
+        # after the first lookup; a timed call (see _timed) measures the
+        # full lookup too
+        if (self.result_cache.maxsize and self.patterns.shape_key(hash_input)) or '_lookup' in self.__dict__:
+            hash_input, matches = self._lookup(hash_input)
+            return hash_input, matches[:top]
+        
+        ranked = self.patterns.match_hot(hash_input)
+        if ranked is None:
+            # None of the usual winners matched: rank everything, as identify_hash() does
+            class_key = self.patterns.match_classes(hash_input, self.engine)
+            self.patterns.count_win(class_key)
+            return hash_input, self._class_matches(class_key)[:top]
+        
+        matches = []
+        seen_modes = None
+        for hash_type, confidence in ranked:
+            pattern_matches = self._matches_by_pattern.get(hash_type)
+            if pattern_matches is None:
+                pattern_matches = tuple(self._join_modes([(hash_type, confidence)]))
+                self._matches_by_pattern[hash_type] = pattern_matches
+            if not matches:
+                # The modes of one pattern are already distinct
+                matches = list(pattern_matches)
+            else:
+                # Same de-duplication as _join_modes(), so the order is identical
+                if seen_modes is None:
+                    seen_modes = {(match.mode.mode, match.mode.name) for match in matches}
+                for match in pattern_matches:
+                    mode_key = (match.mode.mode, match.mode.name)
+                    if mode_key not in seen_modes:
+                        matches.append(match)
+                        seen_modes.add(mode_key)
+            if len(matches) >= top:
+                break
+        return hash_input, tuple(matches[:top])
+    
+    @staticmethod
+    def _reported(hash_input) -> str:
+        """Reported input: the whole stripped input, decoded if needed"""
+        return hash_input.decode('ascii') if isinstance(hash_input, bytes) else hash_input
+    
+    def configure_cache(self, cache_size: int):
+        """Replace the result cache; a size of 0 disables it"""
+        self.result_cache = ResultCache(cache_size)
+    
+    def cache_info(self) -> Dict:
+        """Get result cache hit/miss/eviction statistics"""
+        return self.result_cache.info()
+    
+    def _resolve_matches(self, class_key: tuple) -> tuple:
+        """
+        Build the sorted match records for a set of matching pattern classes
         
-        for hash_type, description, confidence in pattern_matches:
-            # Search for matching hashcat mode
-            mode_info = self.hashcat_mgr.get_mode_by_name(hash_type)
+        Args:
+            class_key: Tuple returned by HashPatterns.match_classes()
             
-            if mode_info:
-                match_entry = {
-                    'hash_type': mode_info['name'],
-                    'hashcat_mode': mode_info['mode'],
-                    'category': mode_info['category'],
-                    'description': mode_info['description'],
-                    'confidence': confidence,
-                    'salt_type': mode_info.get('salt_type', 'unknown'),
-                    'example': mode_info.get('example', 'N/A'),
-                    'variants': mode_info.get('variants', [])
-                }
-                
+        Returns:
+            Tuple of MatchRecords, highest confidence first
+        """
+        matches = self._join_modes(self.patterns.ranked_matches(class_key))
+        
+        # Sort matches by confidence (highest first)
+        matches.sort(key=lambda x: x.confidence, reverse=True)
+        return tuple(matches)
+    
+    def _join_modes(self, ranked: List) -> List[MatchRecord]:
+        """MatchRecords for ranked (hash_type, confidence) pairs, one per mode"""
+        matches = []
+        seen_modes = set()
+        
+        for hash_type, confidence in ranked:
+            # Hashcat modes of the pattern, resolved when the database loaded
+            for mode in self.hashcat_mgr.get_pattern_records(hash_type):
                 # Avoid duplicates
-                mode_key = (mode_info['mode'], mode_info['name'])
+                mode_key = (mode.mode, mode.name)
                 if mode_key not in seen_modes:
-                    results['matches'].append(match_entry)
+                    matches.append(MatchRecord(mode, confidence))
                     seen_modes.add(mode_key)
+        return matches
+    
+    def enable_profiling(self, profiler: Optional[PatternProfiler] = None) -> PatternProfiler:
+        """
+        Record per-pattern and per-stage timings of every identification
         
-        # Sort matches by confidence (highest first)
-        results['matches'].sort(key=lambda x: x['confidence'], reverse=True)
+        The profiled variants are installed as instance attributes, so the
+        plain methods carry no checks while profiling is off. Only this
+        process is profiled: use a single worker. Shape bucketing is turned
+        off so that every input goes through the measured stages.
         
-        # Set overall confidence
-        if results['matches']:
-            results['confidence'] = results['matches'][0]['confidence']
+        Returns:
+            The PatternProfiler being filled in (see lib.profiler)
+        """
+        # Loading the database and its shared records is startup, not identification
+        self.hashcat_mgr.get_pattern_records('')
+        self.profiler = profiler or PatternProfiler()
+        self.patterns.set_profiler(self.profiler)
+        self._vectorize_before_profiling = self.vectorize
+        self.vectorize = False
+        self._instrument()
+        return self.profiler
+    
+    def disable_profiling(self):
+        """Stop profiling and go back to the uninstrumented methods"""
+        if self.profiler is None:
+            return
+        self.patterns.set_profiler(None)
+        self.vectorize = self._vectorize_before_profiling
+        self.profiler = None
+        self._instrument()
+    
+    def enable_metrics(self, metrics, sample_every: int = None):
+        """
+        Report stage latencies, result counts and cache hits to an IdentifyMetrics
         
-        return results
+        Stage timing is sampled (one lookup in sample_every) so that long
+        runs keep their speed; iter_identify() and aggregate() count every
+        line and result. Like profiling, this only instruments the current
+        process: worker processes report queue depth and busy workers, but
+        not their stages.
+        
+        Args:
+            metrics: lib.metrics.IdentifyMetrics to fill in
+            sample_every: Lookups per timed lookup (default DEFAULT_SAMPLE_EVERY)
+        """
+        from lib.metrics import DEFAULT_SAMPLE_EVERY
+        self.hashcat_mgr.get_pattern_records('')
+        self.metrics = metrics
+        self._metrics_sample_every = max(1, sample_every or DEFAULT_SAMPLE_EVERY)
+        metrics.watch_cache(lambda: self.result_cache)
+        self._instrument()
+    
+    def disable_metrics(self):
+        """Stop reporting metrics"""
+        self.metrics = None
+        self._instrument()
+    
+    def _instrument(self):
+        """Install the timed methods the enabled profiler and metrics need, or remove them"""
+        identify_methods = ('identify_hash', 'identify_record', 'identify_best', 'identify_best_record')
+        for name in ('_lookup',) + identify_methods:
+            self.__dict__.pop(name, None)
+        sinks = [sink for sink in (self.profiler, self.metrics) if sink is not None]
+        if not sinks:
+            return
+        self._stage_sink = sinks[0] if len(sinks) == 1 else StageTee(*sinks)
+        # The profiler needs every identification; metrics only sample
+        every = 1 if self.profiler is not None else self._metrics_sample_every
+        for name in identify_methods:
+            setattr(self, name, self._timed(getattr(HashAnalyzer, name), every))
     
-    def identify_multiple(self, hashes: List[str]) -> List[Dict]:
+    def _timed(self, identify, every: int):
+        """
+        Wrap an identify method to time its stages, for one call in every
+        
+        Timed calls go through _lookup_timed, top-K calls included (see
+        _lookup_best); result building is what remains of the call after
+        the lookup.
+        """
+        sink = self._stage_sink
+        clock = time.perf_counter_ns
+        
+        def identify_timed(hash_input, *args):
+            start = clock()
+            result = identify(self, hash_input, *args)
+            sink.add_stage('build', clock() - start - self._last_lookup_ns)
+            return result
+        
+        if every == 1:
+            self._lookup = self._lookup_timed
+            return identify_timed
+        
+        countdown = every
+        
+        def identify_sampled(hash_input, *args):
+            nonlocal countdown
+            countdown -= 1
+            if countdown:
+                return identify(self, hash_input, *args)
+            countdown = every
+            self._lookup = self._lookup_timed
+            try:
+                return identify_timed(hash_input, *args)
+            finally:
+                del self._lookup
+        return identify_sampled
+    
+    def _lookup_timed(self, hash_input) -> tuple:
+        """_lookup, timing each stage into the profiler and/or metrics"""
+        sink = self._stage_sink
+        clock = time.perf_counter_ns
+        start = clock()
+        
+        hash_input = self._prepare(hash_input)
+        prepared = clock()
+        sink.add_stage('prepare', prepared - start)
+        
+        cache = self.result_cache
+        cache_key = self.patterns.shape_key(hash_input) if cache.maxsize else None
+        matches = cache.get(cache_key) if cache_key else None
+        looked_up = clock()
+        # Cache get and put count as one stage
+        cache_ns = looked_up - prepared
+        
+        if matches is None:
+            class_key = self.patterns.match_classes(hash_input, self.engine)
+            matched = clock()
+            sink.add_stage('match', matched - looked_up)
+            
+            matches = self._matches_by_class_key.get(class_key)
+            if matches is None:
+                # Only a new set of matching patterns is ranked, joined and sorted
+                ranked = self.patterns.ranked_matches(class_key)
+                ranked_at = clock()
+                joined = self._join_modes(ranked)
+                joined_at = clock()
+                joined.sort(key=lambda x: x.confidence, reverse=True)
+                matches = tuple(joined)
+                self._matches_by_class_key[class_key] = matches
+                sorted_at = clock()
+                sink.add_stage('modes', joined_at - ranked_at)
+                sink.add_stage('sort', (ranked_at - matched) + (sorted_at - joined_at))
+            else:
+                sink.add_stage('modes', clock() - matched)
+            
+            if cache_key:
+                stored = clock()
+                cache.put(cache_key, matches)
+                cache_ns += clock() - stored
+        
+        sink.add_stage('cache', cache_ns)
+        sink.count_input()
+        self._last_lookup_ns = clock() - start
+        return hash_input, matches
+    
+    def identify_multiple(self, hashes: List[str], workers: int = 1,
+                          chunk_size: Optional[int] = None, records: bool = False,
+                          top: Optional[int] = None) -> List[Dict]:
         """
         Identify multiple hashes at once
         
         Args:
             hashes: List of hash strings
+            workers: Worker processes to use; inputs smaller than
+                PARALLEL_MIN_HASHES always run serially
+            chunk_size: Hashes per worker task
+            records: Return compact HashResults instead of dictionaries
+            top: Keep only the first top matches of each result (see identify_best)
             
         Returns:
             List of identification results
         """
-        return [self.identify_hash(h) for h in hashes]
+        if workers > 1 and len(hashes) >= self.PARALLEL_MIN_HASHES:
+            return list(self._iter_parallel(hashes, workers, chunk_size, records, top))
+        return self._identify_batch(hashes, records, top)
+    
+    def _identifier(self, records: bool, top: Optional[int]):
+        """The identify method a batch uses for each of its inputs"""
+        if top is None:
+            return self.identify_record if records else self.identify_hash
+        identify_best = self.identify_best_record if records else self.identify_best
+        return lambda hash_input: identify_best(hash_input, top)
+    
+    def _identify_batch(self, hashes: List, records: bool = False, top: Optional[int] = None) -> List:
+        """
+        Identify a list of hashes, with one lookup per hex shape when possible
+        
+        Pure-hex rows are bucketed by shape in one vectorized pass, and every
+        row of a bucket shares the matches of its first row; only the other
+        rows go through identify_record() one by one. Falls back to the plain
+        loop without NumPy, for short batches, or when the patterns do not
+        allow shape keys.
+        """
+        identify = self._identifier(records, top)
+        if not self.vectorize or len(hashes) < self.VECTOR_MIN_BATCH or not self.patterns.hex_shape_safe():
+            return [identify(h) for h in hashes]
+        
+        # NumPy is only imported once a batch is big enough to use it
+        from lib.vectorized import bucket_by_shape
+        grouped = bucket_by_shape(hashes)
+        if grouped is None:
+            return [identify(h) for h in hashes]
+        
+        buckets, leftovers = grouped
+        results = [None] * len(hashes)
+        # Rows share the match records of their bucket, but dictionaries are built per row
+        identify_record = self._identifier(True, top)
+        for rows in buckets.values():
+            first = identify_record(hashes[rows[0]])
+            results[rows[0]] = first if records else first.to_dict()
+            for row in rows[1:]:
+                value = hashes[row]
+                result = HashResult(self._reported(value), len(value), first.matches)
+                results[row] = result if records else result.to_dict()
+        for row in leftovers:
+            results[row] = identify(hashes[row])
+        return results
+    
+    def iter_identify(self, hashes: Iterable[str], workers: int = 1,
+                      chunk_size: Optional[int] = None, records: bool = False,
+                      top: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Lazily identify hashes, one result per input
+        
+        Args:
+            hashes: Iterable of hash strings (e.g. a file being read)
+            workers: Worker processes to use; the pool is only started once
+                more than PARALLEL_MIN_HASHES inputs have been seen
+            chunk_size: Hashes per worker task
+            records: Yield compact HashResults instead of dictionaries
+            top: Keep only the first top matches of each result (see identify_best)
+            
+        Returns:
+            Iterator of identification results in input order
+        """
+        if self.metrics is not None:
+            hashes = self.metrics.count_lines(hashes)
+            return self.metrics.track(self._iter_identify(hashes, workers, chunk_size, records, top))
+        return self._iter_identify(hashes, workers, chunk_size, records, top)
+    
+    def _iter_identify(self, hashes: Iterable, workers: int, chunk_size: Optional[int],
+                       records: bool, top: Optional[int] = None) -> Iterator:
+        """iter_identify() without metrics"""
+        hashes = iter(hashes)
+        
+        if workers > 1:
+            # Pool startup would dominate small inputs, so look ahead first
+            head = list(itertools.islice(hashes, self.PARALLEL_MIN_HASHES))
+            if len(head) == self.PARALLEL_MIN_HASHES:
+                yield from self._iter_parallel(itertools.chain(head, hashes), workers, chunk_size,
+                                               records, top)
+                return
+            hashes = iter(head)
+        
+        if not (self.vectorize and numpy_installed()):
+            identify = self._identifier(records, top)
+            for h in hashes:
+                yield identify(h)
+            return
+        
+        # Chunks keep memory bounded while letting _identify_batch bucket rows
+        while True:
+            chunk = list(itertools.islice(hashes, self.VECTOR_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield from self._identify_batch(chunk, records, top)
+    
+    def aggregate(self, hashes: Iterable[str], workers: int = 1,
+                  chunk_size: Optional[int] = None):
+        """
+        Count hashes per top match, mode, category and length without keeping results
+        
+        Args:
+            hashes: Iterable of hash strings (consumed lazily)
+            workers: Worker processes to use; each counts its own chunks and
+                the partial counts are merged
+            chunk_size: Hashes per worker task
+            
+        Returns:
+            HashAggregate (see lib.aggregate)
+        """
+        from lib.aggregate import HashAggregate
+        hashes = iter(hashes)
+        
+        if workers > 1:
+            head = list(itertools.islice(hashes, self.PARALLEL_MIN_HASHES))
+            if len(head) == self.PARALLEL_MIN_HASHES:
+                from lib.parallel import parallel_aggregate, DEFAULT_CHUNK_SIZE
+                hashes = itertools.chain(head, hashes)
+                if self.metrics is not None:
+                    hashes = self.metrics.count_lines(hashes)
+                counts = parallel_aggregate(hashes, self.hashcat_db_path, self.engine, workers,
+                                            chunk_size or DEFAULT_CHUNK_SIZE,
+                                            self.result_cache.maxsize, self.metrics)
+                # Workers only send back counters, so results are counted at the end
+                if self.metrics is not None:
+                    self.metrics.observe_aggregate(counts)
+                return counts
+            hashes = iter(head)
+        
+        return HashAggregate().update_all(self.iter_identify(hashes, records=True))
+    
+    def _iter_parallel(self, hashes: Iterable[str], workers: int, chunk_size: Optional[int],
+                       records: bool = False, top: Optional[int] = None) -> Iterator[Dict]:
+        """Identify hashes in a process pool (see lib.parallel)"""
+        from lib.parallel import parallel_identify, DEFAULT_CHUNK_SIZE
+        
+        return parallel_identify(hashes, self.hashcat_db_path, self.engine, workers,
+                                 chunk_size or DEFAULT_CHUNK_SIZE, self.result_cache.maxsize,
+                                 records, self.metrics, top)
     
     def get_mode_details(self, mode_number: int) -> Optional[Dict]:
         """Get detailed information about a specific hashcat mode"""
@@ -205,7 +766,8 @@ class HashAnalyzer:
             'last_updated': metadata.get('last_updated', 'Unknown'),
             'total_modes': total_modes,
             'total_categories': len(categories),
-            'categories': categories
+            'categories': categories,
+            'pattern_join': self.hashcat_mgr.join_report
         }
     
     def analyze_hash_features(self, hash_input: str) -> Dict:
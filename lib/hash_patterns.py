@@ -5,12 +5,26 @@ Created by: MD.SHORIF MIA
 Version: 2.0
 """
 
-import re
+import operator
+import time
+import zlib
+
+from lib.pattern_index import PatternIndex, ENGINES, DEFAULT_ENGINE, is_bytes_safe
+
+
+# (hash_type, confidence) of a PatternEntry
+_TYPE_AND_CONFIDENCE = operator.attrgetter('hash_type', 'confidence')
 
 
 class HashPatterns:
     """Collection of hash type patterns and detection methods"""
     
+    # Compiled dispatch index, built on first use or loaded from a snapshot
+    _index = None
+    _index_loader = None
+    # Seconds spent building or loading the index
+    index_load_seconds = 0.0
+    
     # Pattern definitions for 100+ hash types
     PATTERNS = {
         # ========== BASIC HASHES (32-128 bits) ==========
@@ -463,12 +477,70 @@ class HashPatterns:
     }
     
     @staticmethod
-    def detect_hash_type(hash_value):
+    def get_index():
+        """Get the compiled pattern index, building or loading it on first use"""
+        index = HashPatterns._index
+        if index is None:
+            start = time.perf_counter()
+            loader = HashPatterns._index_loader
+            index = loader() if loader else PatternIndex(HashPatterns.PATTERNS)
+            HashPatterns._index = index
+            HashPatterns._index_loader = None
+            HashPatterns.index_load_seconds = time.perf_counter() - start
+        return index
+    
+    @staticmethod
+    def set_index_loader(loader):
+        """Register a callable producing the index (e.g. from a snapshot) for first use"""
+        HashPatterns._index_loader = loader
+    
+    @staticmethod
+    def set_profiler(profiler):
+        """
+        Profile pattern matching into a PatternProfiler (see lib.profiler)
+        
+        Attempts, hits and nanoseconds are recorded per pattern class until
+        set_profiler(None); without a profiler matching is not instrumented.
+        """
+        HashPatterns.get_index().set_profiler(profiler)
+    
+    @staticmethod
+    def is_index_loaded():
+        """Check whether the pattern index has been built or installed"""
+        return HashPatterns._index is not None
+    
+    @staticmethod
+    def fingerprint():
+        """Get a checksum of PATTERNS, used to validate saved pattern indexes"""
+        return zlib.crc32(repr(list(HashPatterns.PATTERNS.items())).encode('utf-8'))
+    
+    @staticmethod
+    def prepare(hash_value):
+        """
+        Strip a hash for matching
+        
+        Bytes stay bytes (and are matched without decoding) when they are
+        plain ASCII; anything else is decoded, with U+FFFD for invalid UTF-8.
+        
+        Args:
+            hash_value: Hash as str or bytes
+            
+        Returns:
+            Stripped str, or stripped ASCII bytes
+        """
+        hash_value = hash_value.strip()
+        if isinstance(hash_value, bytes) and not is_bytes_safe(hash_value):
+            hash_value = hash_value.decode('utf-8', 'replace').strip()
+        return hash_value
+    
+    @staticmethod
+    def detect_hash_type(hash_value, engine=DEFAULT_ENGINE):
         """
         Detect hash type from hash value
         
         Args:
-            hash_value: The hash string to identify
+            hash_value: The hash string (or bytes) to identify
+            engine: Matching engine, one of ENGINES
             
         Returns:
             Dictionary with detected hash types and confidence scores
@@ -476,35 +548,26 @@ class HashPatterns:
         if not hash_value:
             return {}
         
-        hash_value = hash_value.strip()
-        hash_value_lower = hash_value.lower()
+        hash_value = HashPatterns.prepare(hash_value)
         matches = {}
         
-        for hash_type, info in HashPatterns.PATTERNS.items():
-            pattern = info['pattern']
-            
-            try:
-                # For patterns with special prefixes ($, {, *), use original case
-                # For hex patterns, use lowercase
-                test_value = hash_value if any(c in pattern for c in ['$', '{', '*', ':']) else hash_value_lower
-                
-                if re.match(pattern, test_value):
-                    matches[hash_type] = {
-                        'confidence': info['confidence'],
-                        'length': len(hash_value)
-                    }
-            except re.error:
-                continue
+        for entry in sorted(HashPatterns.get_index().match(hash_value, engine), key=lambda e: e.order):
+            matches[entry.hash_type] = {
+                'confidence': entry.confidence,
+                'length': len(hash_value)
+            }
         
         return matches
     
     @staticmethod
-    def identify_by_pattern(hash_value):
+    def identify_by_pattern(hash_value, engine=DEFAULT_ENGINE):
         """
         Identify hash type by pattern matching with intelligent matching
         
         Args:
-            hash_value: The hash string to identify
+            hash_value: The hash string (or bytes) to identify
+            engine: Matching engine, one of ENGINES ('indexed', 'combined',
+                'linear'); all engines return identical results
             
         Returns:
             List of tuples: (hash_type, description, confidence)
@@ -512,30 +575,93 @@ class HashPatterns:
         if not hash_value:
             return []
         
-        hash_value = hash_value.strip()
-        hash_value_lower = hash_value.lower()
+        hash_value = HashPatterns.prepare(hash_value)
         matches = []
         
-        for hash_type, info in HashPatterns.PATTERNS.items():
-            pattern = info['pattern']
-            
-            try:
-                # For patterns with special characters (prefixes), use original case
-                # For hex-only patterns, use lowercase
-                has_special_chars = any(c in pattern for c in ['$', '{', '*', ':'])
-                test_value = hash_value if has_special_chars else hash_value_lower
-                
-                if re.match(pattern, test_value):
-                    confidence = info['confidence']
-                    description = f"{hash_type} - {len(hash_value)} chars"
-                    matches.append((hash_type, description, confidence))
-            except re.error:
-                continue
-        
-        # Sort by confidence descending
-        matches.sort(key=lambda x: x[2], reverse=True)
+        # Only patterns sharing the input's length or literal prefix are tried,
+        # and entries with identical regexes share a single evaluation.
+        # Entries come back sorted by confidence descending.
+        for entry in HashPatterns.get_index().match(hash_value, engine):
+            description = f"{entry.hash_type} - {len(hash_value)} chars"
+            matches.append((entry.hash_type, description, entry.confidence))
+        
         return matches
     
+    @staticmethod
+    def match_classes(hash_value, engine=DEFAULT_ENGINE):
+        """
+        Get the equivalence classes (distinct regexes) matching a hash
+        
+        Args:
+            hash_value: The stripped hash string, or bytes from prepare()
+            engine: Matching engine, one of ENGINES
+            
+        Returns:
+            Tuple of class ids; equal tuples mean equal identify_by_pattern results
+        """
+        if not hash_value:
+            return ()
+        return HashPatterns.get_index().match_classes(hash_value, engine)
+    
+    @staticmethod
+    def shape_key(hash_value):
+        """
+        Get the shape signature of a raw-hex hash (length and character groups)
+        
+        Hashes with equal shape keys always get identical pattern matches.
+        
+        Args:
+            hash_value: The stripped hash string, or bytes from prepare()
+            
+        Returns:
+            Hashable signature, or None for anything but pure hex
+        """
+        return HashPatterns.get_index().shape_key(hash_value)
+    
+    @staticmethod
+    def hex_shape_safe():
+        """Check whether raw hex can be matched by shape (see shape_key)"""
+        return HashPatterns.get_index().hex_shape_safe
+    
+    @staticmethod
+    def ranked_matches(class_key):
+        """
+        Get the (hash_type, confidence) pairs for a match_classes() result
+        
+        Args:
+            class_key: Tuple returned by match_classes()
+            
+        Returns:
+            List of tuples sorted by confidence descending
+        """
+        return [(e.hash_type, e.confidence) for e in HashPatterns.get_index().ranked_entries(class_key)]
+    
+    @staticmethod
+    def match_hot(hash_value):
+        """
+        Lazily get the (hash_type, confidence) pairs matching a hash, best
+        first, if one of the patterns that won most often so far matches
+        
+        Patterns are only evaluated as far as needed to produce the next pair,
+        so stopping early skips the patterns that could only rank lower.
+        
+        Args:
+            hash_value: The stripped hash string, or bytes from prepare()
+            
+        Returns:
+            Iterator of tuples in ranked_matches() order, or None when no
+            frequent winner matches (use match_classes() then)
+        """
+        if not hash_value:
+            return None
+        ranked = HashPatterns.get_index().match_hot(hash_value)
+        return None if ranked is None else map(_TYPE_AND_CONFIDENCE, ranked)
+    
+    @staticmethod
+    def count_win(class_key):
+        """Count the top pattern of a match_classes() result as a win (see match_hot)"""
+        HashPatterns.get_index().count_win(class_key)
+    
     @staticmethod
     def get_hash_length_category(length):
         """Get hash candidates by length"""
@@ -566,6 +692,11 @@ class HashPatterns:
         """Get all available patterns"""
         return list(HashPatterns.PATTERNS.keys())
     
+    @staticmethod
+    def get_engines():
+        """Get the names of the available matching engines"""
+        return list(ENGINES)
+    
     @staticmethod
     def get_pattern_count():
         """Get total number of patterns"""
@@ -0,0 +1,419 @@
+"""
+Metrics Module
+In-process counters, gauges and latency histograms for long batch runs and
+the daemon, exported in the Prometheus text format: to a file rewritten on
+an interval (for the node exporter's textfile collector) or on a local HTTP
+endpoint. Nothing is counted unless metrics are enabled (--metrics-file,
+--metrics-port or HashAnalyzer.enable_metrics).
+"""
+
+import bisect
+import os
+import sys
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+
+# Histogram bucket upper bounds in seconds: 1 µs to about 8 s, doubling
+LATENCY_BUCKETS = tuple(2 ** power / 1e6 for power in range(24))
+
+# Quantiles estimated from every histogram
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Seconds between rewrites of a --metrics-file
+DEFAULT_EXPORT_INTERVAL = 15.0
+
+# One lookup in this many has its stages timed while metrics are enabled
+DEFAULT_SAMPLE_EVERY = 16
+
+# Content type of the text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    """Label value escaped for the text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    """{name="value",...} for one sample, or '' without labels"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    """Sample value in the text format"""
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+    return str(value)
+
+
+class Counter:
+    """
+    Monotonic count, optionally split by labels
+
+    Updates take no lock: each metric is written by one thread at a time
+    (the caller serializes otherwise), and rendering copies the values.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+
+    def inc(self, amount=1, labels: Tuple = ()):
+        """Add to the count of one label combination"""
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set_total(self, value, labels: Tuple = ()):
+        """Set the count outright, for counts kept elsewhere (e.g. cache hits)"""
+        self._values[labels] = value
+
+    def value(self, labels: Tuple = ()):
+        """Current value of one label combination"""
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        """Sample lines in the text format"""
+        values = dict(self._values)
+        if not values and not self.labels:
+            values[()] = 0
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}"
+                for key, value in sorted(values.items(), key=lambda item: str(item[0]))]
+
+
+class Gauge(Counter):
+    """Value that goes up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value, labels: Tuple = ()):
+        """Set the current value"""
+        self._values[labels] = value
+
+    def dec(self, amount=1, labels: Tuple = ()):
+        """Subtract from the current value"""
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class Histogram:
+    """
+    Distribution of observed values in fixed buckets
+
+    Rendered as a Prometheus histogram (cumulative _bucket, _sum, _count),
+    plus a <name>_quantile gauge with the QUANTILES estimated by linear
+    interpolation inside the bucket each one falls in.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series = {}
+
+    def observe(self, value: float, labels: Tuple = ()):
+        """Record one value"""
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, labels: Tuple = ()) -> int:
+        """Number of values observed for one label combination"""
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def quantile(self, q: float, labels: Tuple = ()) -> Optional[float]:
+        """
+        Estimate a quantile from the buckets
+
+        Returns:
+            Estimated value, the largest finite bound if it falls in the
+            +Inf bucket, or None before the first observation
+        """
+        series = self._series.get(labels)
+        if not series or not series[2]:
+            return None
+        return self._quantile(series[0], series[2], q)
+
+    def _quantile(self, counts: List[int], total: int, q: float) -> float:
+        rank = q * total
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            if not bucket_count:
+                continue
+            if seen + bucket_count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        """Sample lines in the text format, buckets then quantiles"""
+        series = {key: (list(counts), total, count)
+                  for key, (counts, total, count) in list(self._series.items())}
+        lines = []
+        quantiles = []
+        for key in sorted(series, key=str):
+            counts, total, count = series[key]
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                extra = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, extra)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+            if count:
+                for q in QUANTILES:
+                    extra = f'quantile="{q}"'
+                    value = self._quantile(counts, count, q)
+                    quantiles.append(f"{self.name}_quantile{_labels(self.labels, key, extra)} {_number(value)}")
+        if quantiles:
+            lines += [f"# HELP {self.name}_quantile {self.help}, estimated quantiles",
+                      f"# TYPE {self.name}_quantile gauge"] + quantiles
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics, rendered together"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labels != metric.labels:
+                    raise ValueError(f"Metric '{metric.name}' is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def get(self, name: str):
+        """A registered metric, or None"""
+        return self._metrics.get(name)
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Call collector() before every render, to refresh values kept elsewhere"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text format"""
+        with self._lock:
+            for collector in self._collectors:
+                collector()
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class IdentifyMetrics:
+    """
+    The metrics HxMod exports, on one registry
+
+    Doubles as a stage sink for HashAnalyzer.enable_metrics (add_stage and
+    count_input, like lib.profiler.PatternProfiler).
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry = registry or MetricsRegistry()
+        self.lines_read = registry.counter('hxmod_lines_read_total', 'Input lines read')
+        self.identified = registry.counter('hxmod_identified_total',
+                                           'Inputs with at least one candidate hash type')
+        self.unmatched = registry.counter('hxmod_unmatched_total', 'Inputs with no candidate hash type')
+        self.mode_hits = registry.counter('hxmod_mode_hits_total',
+                                          'Inputs whose top match is this hashcat mode', ('mode', 'hash_type'))
+        self.cache_hits = registry.counter('hxmod_cache_hits_total', 'Result cache hits')
+        self.cache_misses = registry.counter('hxmod_cache_misses_total', 'Result cache misses')
+        self.queue_depth = registry.gauge('hxmod_queue_depth',
+                                          'Chunks submitted to worker processes and not yet collected')
+        self.workers_busy = registry.gauge('hxmod_workers_busy', 'Worker processes running a chunk')
+        self.stage_seconds = registry.histogram('hxmod_stage_duration_seconds',
+                                                'Time per identification stage (sampled lookups)', ('stage',))
+        self._cache_source = None
+        registry.add_collector(self._collect_cache)
+
+    def count_lines(self, lines: Iterable) -> Iterator:
+        """Pass lines through, counting each one read"""
+        counter = self.lines_read
+        for line in lines:
+            counter.inc()
+            yield line
+
+    def observe(self, result):
+        """Count one identification result (dictionary or HashResult)"""
+        matches = result['matches']
+        if not matches:
+            self.unmatched.inc()
+            return
+        self.identified.inc()
+        top = matches[0]
+        self.mode_hits.inc(1, (top['hashcat_mode'], top['hash_type']))
+
+    def track(self, results: Iterable) -> Iterator:
+        """Pass results through, counting each one"""
+        observe = self.observe
+        for result in results:
+            observe(result)
+            yield result
+
+    def observe_aggregate(self, counts):
+        """Count the results behind a HashAggregate (see lib.aggregate)"""
+        self.identified.inc(counts.identified)
+        self.unmatched.inc(counts.unmatched)
+        for (hash_type, mode), count in counts.top_matches.items():
+            self.mode_hits.inc(count, (mode, hash_type))
+
+    def watch_cache(self, get_cache: Callable):
+        """Report the hit/miss counters of get_cache()'s ResultCache (the latest one watched wins)"""
+        self._cache_source = get_cache
+
+    def _collect_cache(self):
+        if self._cache_source is None:
+            return
+        cache = self._cache_source()
+        self.cache_hits.set_total(cache.hits)
+        self.cache_misses.set_total(cache.misses)
+
+    def add_stage(self, stage: str, nanoseconds: int):
+        """Record the duration of one identification stage"""
+        self.stage_seconds.observe(nanoseconds / 1e9, (stage,))
+
+    def count_input(self):
+        """Inputs are counted by observe(), not per timed lookup"""
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text format"""
+        return self.registry.render()
+
+
+def write_metrics(registry: MetricsRegistry, path: str):
+    """
+    Write the rendered metrics to path atomically
+
+    The text goes to a temporary file in the same directory which then
+    replaces path, so a collector never reads a half-written file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+class MetricsFileWriter:
+    """Rewrite a metrics file every interval seconds, and once more on stop()"""
+
+    def __init__(self, registry: MetricsRegistry, path: str,
+                 interval: float = DEFAULT_EXPORT_INTERVAL):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self) -> 'MetricsFileWriter':
+        """Write the file now and start the rewriting thread"""
+        write_metrics(self.registry, self.path)
+        self._thread = threading.Thread(target=self._run, name='hxmod-metrics-file', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                write_metrics(self.registry, self.path)
+            except OSError as e:
+                print(f"Warning: Could not write metrics to {self.path}: {e}", file=sys.stderr)
+
+    def stop(self):
+        """Stop the thread and write the final values"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        write_metrics(self.registry, self.path)
+
+
+class MetricsServer:
+    """
+    Serve the metrics at http://host:port/metrics from a background thread
+
+    Binds to localhost unless told otherwise; port 0 picks a free port
+    (see .port).
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = '127.0.0.1'):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host = host
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self) -> 'MetricsServer':
+        """Start answering requests"""
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='hxmod-metrics-http', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server and release its port"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
@@ -0,0 +1,299 @@
+"""
+Mode Search Module
+Inverted token/trigram index over the hashcat modes database, answering
+`--search` queries with ranked, typo-tolerant results
+"""
+
+import bisect
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Fields a token can come from, best first
+NAME, VARIANT, DESCRIPTION = 3, 2, 1
+
+# Score of a query term matching a token exactly, as a prefix, inside it,
+# or within a few typos, per field (NAME, VARIANT, DESCRIPTION)
+TERM_SCORES = {
+    'exact': {NAME: 60, VARIANT: 50, DESCRIPTION: 20},
+    'prefix': {NAME: 45, VARIANT: 40, DESCRIPTION: 15},
+    'infix': {NAME: 35, VARIANT: 30, DESCRIPTION: 10},
+    'fuzzy': {NAME: 25, VARIANT: 20, DESCRIPTION: 5},
+}
+
+# Bonus for the whole query naming a mode; above any sum of term scores
+MODE_NUMBER_SCORE = 1000
+EXACT_NAME_SCORE = 1000
+EXACT_VARIANT_SCORE = 900
+NAME_PREFIX_SCORE = 800
+VARIANT_PREFIX_SCORE = 700
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric runs of a string"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def compact(text: str) -> str:
+    """A name with case and punctuation dropped ('SHA2-256' -> 'sha2256')"""
+    return ''.join(tokenize(text))
+
+
+def trigrams(token: str) -> Set[str]:
+    """Trigrams of a token padded at both ends, so short tokens have some"""
+    padded = f'^{token}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(term: str) -> int:
+    """Edits tolerated in a query term: none under 4 characters or in numbers"""
+    if len(term) < 4 or term.isdigit():
+        return 0
+    return 1 if len(term) < 7 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (adjacent swaps count as one edit)
+
+    Only cells within limit of the diagonal are computed.
+
+    Returns:
+        The distance, or limit + 1 once it is known to exceed limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+        char = a[i - 1]
+        for j in range(low, high + 1):
+            cost = char != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and j > 1
+                    and char == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value if value < over else over
+        if min(current[low - 1:high + 1]) > limit:
+            return over
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class ModeSearchIndex:
+    """
+    Search index over hash modes, built once when the database loads
+
+    Names, variant names and descriptions are tokenized into an inverted
+    index (token -> mode -> best field). Query terms are looked up as exact
+    tokens, token prefixes (bisect over the sorted vocabulary), substrings
+    and, when nothing matches literally, as typos via a trigram index.
+    Every term of a query must match for a mode to be returned, unless the
+    whole query is a typo of the mode's name or a variant (looked for when
+    no name or variant matches it exactly). Queries with no alphanumeric
+    characters are matched as substrings of names and descriptions.
+
+    Ranking: mode number or exact name > exact variant > name prefix >
+    variant prefix > word hits in the name > in variants > in the
+    description > typos; ties go to the shorter name, then the lower mode
+    number.
+    """
+
+    def __init__(self, modes: Iterable[Dict]):
+        self.modes = list(modes)
+        # Token -> {mode position: best field}
+        self.postings = {}
+        # Compact name/variant -> [(mode position, field)]
+        self.names = {}
+        self.by_number = {}
+
+        for position, mode in enumerate(self.modes):
+            self.by_number.setdefault(str(mode['mode']), position)
+            self._add_name(mode['name'], position, NAME)
+            self._add_tokens(mode['name'], position, NAME)
+            for variant in mode.get('variants', []):
+                self._add_name(variant, position, VARIANT)
+                self._add_tokens(variant, position, VARIANT)
+            self._add_tokens(mode.get('description', ''), position, DESCRIPTION)
+
+        self.vocabulary = sorted(self.postings)
+        self.compact_names = sorted(self.names)
+        # Unpadded trigram -> tokens containing it (substring lookups)
+        self.infix_grams = {}
+        # Padded trigram -> tokens, and -> compact names (typo candidates)
+        self.fuzzy_grams = {}
+        self.name_grams = {}
+        for token in self.vocabulary:
+            for i in range(len(token) - 2):
+                self.infix_grams.setdefault(token[i:i + 3], set()).add(token)
+            for gram in trigrams(token):
+                self.fuzzy_grams.setdefault(gram, set()).add(token)
+        for name in self.compact_names:
+            for gram in trigrams(name):
+                self.name_grams.setdefault(gram, set()).add(name)
+
+    def _add_name(self, name: str, position: int, field: int):
+        key = compact(name)
+        if key:
+            self.names.setdefault(key, []).append((position, field))
+
+    def _add_tokens(self, text: str, position: int, field: int):
+        for token in tokenize(text):
+            entry = self.postings.setdefault(token, {})
+            if entry.get(position, 0) < field:
+                entry[position] = field
+
+    def _prefixed(self, keys: List[str], prefix: str) -> List[str]:
+        """Sorted keys starting with prefix"""
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + '\uffff')
+        return keys[start:end]
+
+    def _term_tokens(self, term: str) -> List[Tuple[str, str]]:
+        """Vocabulary tokens a query term matches, with the kind of match"""
+        matched = [(token, 'exact' if token == term else 'prefix')
+                   for token in self._prefixed(self.vocabulary, term)]
+
+        if len(term) >= 3:
+            candidates = None
+            for i in range(len(term) - 2):
+                tokens = self.infix_grams.get(term[i:i + 3], set())
+                candidates = tokens if candidates is None else candidates & tokens
+                if not candidates:
+                    break
+        else:
+            candidates = self.vocabulary
+        matched.extend((token, 'infix') for token in candidates or ()
+                       if term in token and not token.startswith(term))
+        if matched:
+            return matched
+
+        return [(token, 'fuzzy') for token in self._near(term, self.fuzzy_grams)]
+
+    @staticmethod
+    def _near(key: str, grams_index: Dict[str, Set[str]]) -> List[str]:
+        """Indexed keys within max_typos(key) edits of key"""
+        limit = max_typos(key)
+        if not limit:
+            return []
+        grams = trigrams(key)
+        shared = {}
+        for gram in grams:
+            for candidate in grams_index.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        # Each edit (or swap) changes at most four trigrams
+        needed = max(1, len(grams) - 4 * limit)
+        return [candidate for candidate, count in shared.items()
+                if count >= needed and edit_distance(key, candidate, limit) <= limit]
+
+    def _term_scores(self, term: str) -> Dict[int, int]:
+        """Best score of one query term per mode position"""
+        scores = {}
+        number = self.by_number.get(term)
+        if number is not None:
+            scores[number] = MODE_NUMBER_SCORE
+        for token, kind in self._term_tokens(term):
+            weights = TERM_SCORES[kind]
+            for position, field in self.postings[token].items():
+                score = weights[field]
+                if scores.get(position, 0) < score:
+                    scores[position] = score
+        return scores
+
+    def _name_scores(self, query: str) -> Dict[int, int]:
+        """Bonuses for the whole query being or starting a mode's name"""
+        bonus = {}
+        key = compact(query)
+        if not key:
+            return bonus
+        for name in self._prefixed(self.compact_names, key):
+            for position, field in self.names[name]:
+                if name == key:
+                    score = EXACT_NAME_SCORE if field == NAME else EXACT_VARIANT_SCORE
+                else:
+                    score = NAME_PREFIX_SCORE if field == NAME else VARIANT_PREFIX_SCORE
+                if bonus.get(position, 0) < score:
+                    bonus[position] = score
+        return bonus
+
+    def _typo_scores(self, query: str) -> Dict[int, int]:
+        """Modes whose name or a variant the whole query misspells"""
+        scores = {}
+        key = compact(query)
+        if not key or key in self.names:
+            return scores
+        for name in self._near(key, self.name_grams):
+            for position, field in self.names[name]:
+                score = TERM_SCORES['fuzzy'][field]
+                if scores.get(position, 0) < score:
+                    scores[position] = score
+        return scores
+
+    def _substring_scores(self, query: str) -> Dict[int, int]:
+        """Modes whose name or description contains the query, ignoring case"""
+        scores = {}
+        needle = query.lower()
+        for position, mode in enumerate(self.modes):
+            if needle in mode['name'].lower():
+                scores[position] = TERM_SCORES['infix'][NAME]
+            elif needle in mode.get('description', '').lower():
+                scores[position] = TERM_SCORES['infix'][DESCRIPTION]
+        return scores
+
+    def scored(self, query: str, limit: Optional[int] = None) -> List[Tuple[Dict, int]]:
+        """
+        Search modes, with the score of each result
+
+        Args:
+            query: Words, names or mode numbers; all terms must match
+            limit: Maximum number of results
+
+        Returns:
+            (mode, score) pairs, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            # Punctuation only ('$', '= $'): nothing to tokenize, so scan for it
+            totals = self._substring_scores(query) if query.strip() else {}
+            return self._ranked(totals, limit)
+
+        totals = None
+        for term in terms:
+            scores = self._term_scores(term)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {position: total + scores[position]
+                          for position, total in totals.items() if position in scores}
+            if not totals:
+                break
+
+        # Also counts names the query starts without matching their words ('halfmd')
+        for position, score in self._name_scores(query).items():
+            totals[position] = totals.get(position, 0) + score
+        # A misspelt name counts even if its words do not match
+        for position, score in self._typo_scores(query).items():
+            totals.setdefault(position, score)
+
+        return self._ranked(totals, limit)
+
+    def _ranked(self, totals: Dict[int, int], limit: Optional[int]) -> List[Tuple[Dict, int]]:
+        """(mode, score) pairs of scored positions, best first"""
+        modes = self.modes
+        ranked = sorted(totals.items(),
+                        key=lambda item: (-item[1], len(modes[item[0]]['name']), modes[item[0]]['mode']))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(modes[position], score) for position, score in ranked]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """Search modes, best match first (see scored())"""
+        return [mode for mode, _ in self.scored(query, limit)]
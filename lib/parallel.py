@@ -0,0 +1,157 @@
+"""
+Parallel Identification Module
+Process-pool backend for batch identification
+Each worker loads the database and compiled patterns once, in its initializer
+"""
+
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from lib.hash_analyzer import HashAnalyzer, numpy_installed
+from lib.hash_patterns import HashPatterns
+from lib.result_cache import DEFAULT_CACHE_SIZE
+
+
+# Hashes per task sent to a worker
+DEFAULT_CHUNK_SIZE = 1000
+
+# Chunks queued per worker; bounds memory while keeping workers busy
+PREFETCH_PER_WORKER = 2
+
+# Analyzer owned by each worker process
+_worker_analyzer = None
+
+
+def init_worker(db_path: str, engine: str, cache_size: int):
+    """
+    Worker initializer: load the database, the pattern index and NumPy once
+    per process, so that no chunk pays for them
+    
+    Also usable as the initializer of another ProcessPoolExecutor whose
+    tasks call identify_chunk().
+    """
+    global _worker_analyzer
+    _worker_analyzer = HashAnalyzer(db_path, engine=engine, cache_size=cache_size)
+    # All three are otherwise loaded lazily, on the worker's first chunk
+    _worker_analyzer.hashcat_mgr.get_pattern_records('')
+    HashPatterns.get_index()
+    if _worker_analyzer.vectorize and numpy_installed():
+        import lib.vectorized
+
+
+def identify_chunk(chunk: List[str], records: bool = False, top: Optional[int] = None) -> List[Dict]:
+    """Identify one chunk inside a worker set up by init_worker()"""
+    return _worker_analyzer.identify_multiple(chunk, records=records, top=top)
+
+
+def _aggregate_chunk(chunk: List[str]):
+    """Identify one chunk inside a worker and return only its counters"""
+    from lib.aggregate import HashAggregate
+    return HashAggregate().update_all(_worker_analyzer.identify_multiple(chunk, records=True))
+
+
+def iter_chunks(hashes: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Split an iterable into lists of at most chunk_size items"""
+    iterator = iter(hashes)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _report_pool(metrics, pending: deque, workers: int):
+    """Set the queue depth and busy worker gauges of an IdentifyMetrics"""
+    metrics.queue_depth.set(len(pending))
+    metrics.workers_busy.set(min(workers, sum(future.running() for future in pending)))
+
+
+def _iter_chunk_results(function, hashes: Iterable[str], db_path: str, engine: str,
+                        workers: int, chunk_size: int, cache_size: int, *args,
+                        metrics=None) -> Iterator:
+    """
+    Run function(chunk, *args) on every chunk in a process pool, yielding
+    results in input order
+    
+    Only workers * PREFETCH_PER_WORKER chunks are in flight at a time, so
+    arbitrarily long inputs are processed in bounded memory. With metrics
+    (lib.metrics.IdentifyMetrics), the chunks in flight and the workers
+    running one are reported as each chunk is submitted and collected.
+    """
+    if numpy_installed():
+        # Forked workers inherit the import instead of each paying for it
+        import lib.vectorized
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(db_path, engine, cache_size)) as pool:
+        pending = deque()
+        try:
+            for chunk in iter_chunks(hashes, chunk_size):
+                pending.append(pool.submit(function, chunk, *args))
+                if metrics is not None:
+                    _report_pool(metrics, pending, workers)
+                if len(pending) >= workers * PREFETCH_PER_WORKER:
+                    results = pending.popleft().result()
+                    if metrics is not None:
+                        _report_pool(metrics, pending, workers)
+                    yield results
+            while pending:
+                results = pending.popleft().result()
+                if metrics is not None:
+                    _report_pool(metrics, pending, workers)
+                yield results
+        finally:
+            # Abandoned or interrupted runs should not wait for queued work
+            for future in pending:
+                future.cancel()
+            if metrics is not None:
+                metrics.queue_depth.set(0)
+                metrics.workers_busy.set(0)
+
+
+def parallel_identify(hashes: Iterable[str], db_path: str, engine: str, workers: int,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      cache_size: int = DEFAULT_CACHE_SIZE, records: bool = False,
+                      metrics=None, top: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Identify hashes in a process pool, yielding results in input order
+    
+    Args:
+        hashes: Iterable of hash strings
+        db_path: Hashcat modes database each worker loads
+        engine: Pattern matching engine for the workers
+        workers: Number of worker processes
+        chunk_size: Hashes per task
+        records: Yield compact HashResults instead of dictionaries
+        metrics: IdentifyMetrics to report the pool's queue depth to
+        top: Keep only the first top matches of each result
+        
+    Returns:
+        Iterator of identification results
+    """
+    for results in _iter_chunk_results(identify_chunk, hashes, db_path, engine,
+                                       workers, chunk_size, cache_size, records, top,
+                                       metrics=metrics):
+        yield from results
+
+
+def parallel_aggregate(hashes: Iterable[str], db_path: str, engine: str, workers: int,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       cache_size: int = DEFAULT_CACHE_SIZE, metrics=None):
+    """
+    Count hashes into a HashAggregate (see lib.aggregate) in a process pool
+    
+    Workers send back per-chunk counters instead of results, which are
+    merged here as they arrive.
+    
+    Returns:
+        HashAggregate for the whole input
+    """
+    from lib.aggregate import HashAggregate
+    
+    total = HashAggregate()
+    for partial in _iter_chunk_results(_aggregate_chunk, hashes, db_path, engine,
+                                       workers, chunk_size, cache_size, metrics=metrics):
+        total.merge(partial)
+    return total
@@ -0,0 +1,810 @@
+"""
+Pattern Dispatch Index
+Precompiled lookup tables that narrow HashPatterns.PATTERNS down to the
+few patterns that can possibly match a given hash value
+"""
+
+import heapq
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants
+    import sre_parse
+
+
+# Characters that make identify_by_pattern test the original (non-lowercased) value
+SPECIAL_PATTERN_CHARS = ('$', '{', '*', ':')
+
+# Upper bound used for patterns whose match length is not bounded
+UNBOUNDED = float('inf')
+
+# Matching engines; all of them return identical results
+#   indexed  - length/prefix dispatch, one regex call per candidate class
+#   combined - one alternation regex per case partition decides every class
+#   linear   - every class regex on every input (reference implementation)
+ENGINES = ('indexed', 'combined', 'linear')
+DEFAULT_ENGINE = 'indexed'
+
+# Classes match_hot() tries, most frequent winners first
+HOT_CLASSES = 4
+
+# Wins after which the win counts are halved, so the order follows the input
+HOT_DECAY_WINS = 4096
+
+# Neighbour lists kept per class, input length and first character
+NEIGHBOURS_SEEN_SIZE = 4096
+
+# Character groups that make up a raw-hex "shape"
+HEX_DIGITS = frozenset('0123456789')
+HEX_LOWER = frozenset('abcdef')
+HEX_UPPER = frozenset('ABCDEF')
+HEX_CHARS = HEX_DIGITS | HEX_LOWER | HEX_UPPER
+HEX_CHARS_STR = ''.join(sorted(HEX_CHARS))
+HEX_BYTES = HEX_CHARS_STR.encode('ascii')
+
+# Bytes on which a bytes regex behaves exactly like the str regex does on the
+# decoded text: ASCII, minus the separators only str's \s matches (0x1c-0x1f)
+BYTES_SAFE = bytes(range(0x1c)) + bytes(range(0x20, 0x80))
+
+
+class PatternEntry:
+    """A single PATTERNS entry: hash type, confidence and its position"""
+
+    def __init__(self, order: int, hash_type: str, info: Dict):
+        self.order = order
+        self.hash_type = hash_type
+        self.pattern = info['pattern']
+        self.confidence = info['confidence']
+        # Same rule the linear scan used: special characters mean case matters
+        self.use_original = any(c in self.pattern for c in SPECIAL_PATTERN_CHARS)
+
+
+class PatternClass:
+    """
+    Equivalence class of entries sharing a byte-identical regex
+
+    The regex is run once per input and the verdict applies to every member.
+    """
+
+    def __init__(self, class_id: int, pattern: str, use_original: bool):
+        self.class_id = class_id
+        self.pattern = pattern
+        self.use_original = use_original
+        self._regex = None
+        self._bytes_regex = None
+        parsed = sre_parse.parse(pattern)
+        self.prefix, self.min_len, self.max_len = self._analyze(parsed)
+        self.hex_shape_safe = self._is_hex_shape_safe(parsed)
+        self.members = []
+
+    @property
+    def regex(self):
+        """Compiled regex, compiled when the class is first tested"""
+        if self._regex is None:
+            self._regex = re.compile(self.pattern)
+        return self._regex
+
+    @property
+    def bytes_regex(self):
+        """Compiled bytes regex, for inputs passing is_bytes_safe()"""
+        if self._bytes_regex is None:
+            self._bytes_regex = re.compile(self.pattern.encode('ascii'))
+        return self._bytes_regex
+
+    def __getstate__(self) -> Dict:
+        """Pickle without the compiled regexes so loading stays cheap"""
+        state = self.__dict__.copy()
+        state['_regex'] = None
+        state['_bytes_regex'] = None
+        return state
+
+    @staticmethod
+    def _analyze(parsed) -> Tuple[str, int, float]:
+        """
+        Derive the literal prefix and the bounds on the matched input length
+
+        Args:
+            parsed: sre_parse result for the pattern
+
+        Returns:
+            Tuple of (literal_prefix, min_length, max_length)
+        """
+        items = list(parsed)
+
+        prefix = []
+        for op, arg in items:
+            if op is sre_constants.AT and arg is sre_constants.AT_BEGINNING and not prefix:
+                continue
+            if op is sre_constants.LITERAL:
+                prefix.append(chr(arg))
+                continue
+            break
+
+        min_len, max_len = parsed.getwidth()
+        # re.match only needs a prefix of the input to match unless the
+        # pattern is anchored at the end, so only then does max_len bound it
+        end_anchored = bool(items) and items[-1] == (sre_constants.AT, sre_constants.AT_END)
+        if not end_anchored or max_len >= sre_constants.MAXREPEAT:
+            max_len = UNBOUNDED
+
+        return ''.join(prefix), min_len, max_len
+
+    @staticmethod
+    def _is_hex_shape_safe(parsed) -> bool:
+        """
+        Check that, on pure-hex input, the verdict only depends on the shape
+
+        A shape is the input length plus which of digits, a-f and A-F occur.
+        That holds when the pattern can never match pure hex (a mandatory
+        non-hex literal), or when it is anchored at both ends and every
+        element able to consume hex accepts the same digit/a-f/A-F groups.
+        """
+        if parsed.state.flags & re.IGNORECASE:
+            return False
+
+        items = list(parsed)
+        for op, arg in items:
+            if op is sre_constants.LITERAL and chr(arg) not in HEX_CHARS:
+                return True
+
+        if not items or items[0] != (sre_constants.AT, sre_constants.AT_BEGINNING):
+            return False
+        if items[-1] != (sre_constants.AT, sre_constants.AT_END):
+            return False
+
+        subsets = set()
+        if not _collect_hex_subsets(items[1:-1], subsets):
+            return False
+        subsets.discard(frozenset())
+        if len(subsets) > 1:
+            return False
+        for subset in subsets:
+            for group in (HEX_DIGITS, HEX_LOWER, HEX_UPPER):
+                if subset & group and not group <= subset:
+                    return False
+        return True
+
+
+def _char_set_hex_subset(op, arg) -> Optional[frozenset]:
+    """Hex characters accepted by a single-character element, None if unknown"""
+    if op is sre_constants.LITERAL:
+        return frozenset(chr(arg)) & HEX_CHARS
+    if op is sre_constants.NOT_LITERAL:
+        return HEX_CHARS - frozenset(chr(arg))
+    if op is sre_constants.ANY:
+        return HEX_CHARS
+    if op is not sre_constants.IN:
+        return None
+
+    accepted = set()
+    negate = False
+    for item_op, item_arg in arg:
+        if item_op is sre_constants.NEGATE:
+            negate = True
+        elif item_op is sre_constants.LITERAL:
+            accepted.add(chr(item_arg))
+        elif item_op is sre_constants.RANGE:
+            low, high = item_arg
+            accepted.update(c for c in HEX_CHARS if low <= ord(c) <= high)
+        elif item_op is sre_constants.CATEGORY:
+            if item_arg is sre_constants.CATEGORY_DIGIT:
+                accepted.update(HEX_DIGITS)
+            elif item_arg is sre_constants.CATEGORY_NOT_DIGIT:
+                accepted.update(HEX_LOWER | HEX_UPPER)
+            elif item_arg in (sre_constants.CATEGORY_WORD, sre_constants.CATEGORY_NOT_SPACE):
+                accepted.update(HEX_CHARS)
+            elif item_arg not in (sre_constants.CATEGORY_NOT_WORD, sre_constants.CATEGORY_SPACE):
+                return None
+        else:
+            return None
+
+    accepted = frozenset(accepted) & HEX_CHARS
+    return HEX_CHARS - accepted if negate else accepted
+
+
+def _collect_hex_subsets(items, subsets: set) -> bool:
+    """
+    Gather the hex subsets of every consuming element, recursing into groups
+
+    Returns:
+        False when the pattern uses a construct the analysis does not model
+    """
+    for op, arg in items:
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            if not _collect_hex_subsets(arg[2], subsets):
+                return False
+        elif op is sre_constants.SUBPATTERN:
+            if not _collect_hex_subsets(arg[3], subsets):
+                return False
+        elif op is sre_constants.BRANCH:
+            for branch in arg[1]:
+                if not _collect_hex_subsets(branch, subsets):
+                    return False
+        else:
+            subset = _char_set_hex_subset(op, arg)
+            if subset is None:
+                return False
+            subsets.add(subset)
+    return True
+
+
+class PatternIndex:
+    """
+    Length and literal-prefix dispatch tables over a pattern dictionary
+
+    Entries with identical regexes are grouped into PatternClass objects and
+    every class lands in exactly one table:
+      - by_prefix: classes starting with a literal (``$2``, ``{SSHA}``, ``0x0100``...)
+      - by_length: prefix-less classes that only match one input length
+      - unbounded: prefix-less classes with a length range (salted hex, LM)
+
+    Values passed to the match methods must already be stripped.
+    """
+
+    def __init__(self, patterns: Dict[str, Dict]):
+        self.entries = []
+        self.classes = []
+        classes_by_key = {}
+
+        for order, (hash_type, info) in enumerate(patterns.items()):
+            entry = PatternEntry(order, hash_type, info)
+            key = (entry.pattern, entry.use_original)
+            pattern_class = classes_by_key.get(key)
+            if pattern_class is None:
+                try:
+                    pattern_class = PatternClass(len(self.classes), entry.pattern, entry.use_original)
+                except (re.error, UnicodeEncodeError):
+                    # Invalid patterns never matched in the linear scan either
+                    continue
+                classes_by_key[key] = pattern_class
+                self.classes.append(pattern_class)
+            pattern_class.members.append(entry)
+            self.entries.append(entry)
+
+        self.by_prefix = {}
+        self.prefix_lengths = {}
+        self.by_length = {}
+        self.unbounded = []
+
+        for pattern_class in self.classes:
+            # Prefixes are only comparable when the regex sees the original value
+            if pattern_class.prefix and pattern_class.use_original:
+                self.by_prefix.setdefault(pattern_class.prefix, []).append(pattern_class)
+                lengths = self.prefix_lengths.setdefault(pattern_class.prefix[0], set())
+                lengths.add(len(pattern_class.prefix))
+            elif pattern_class.min_len == pattern_class.max_len:
+                self.by_length.setdefault(pattern_class.min_len, []).append(pattern_class)
+            else:
+                self.unbounded.append(pattern_class)
+
+        self.prefix_lengths = {first: sorted(lengths)
+                               for first, lengths in self.prefix_lengths.items()}
+
+        # Ranked member lists, computed once per distinct set of matching classes
+        self._ranked = {}
+
+        # Pure-hex inputs can be keyed by shape only if every class allows it
+        self.hex_shape_safe = all(c.hex_shape_safe for c in self.classes)
+
+        # Combined regexes are only compiled when that engine is first used
+        self._combined = None
+        self._combined_bytes = None
+
+        # PatternProfiler (lib.profiler) while profiling is enabled
+        self._profiler = None
+
+        self._bind_engines()
+        self._build_rank_tables()
+
+    def __getstate__(self) -> Dict:
+        """Pickle the tables only; engines, derived tables and memo caches are rebuilt on load"""
+        state = self.__dict__.copy()
+        for derived in ('_engines', '_bytes_engines', '_by_prefix_bytes', '_prefix_lengths_bytes',
+                        '_class_members', '_class_ranks', '_class_prefixes', '_class_prefixes_bytes',
+                        '_neighbours', '_neighbours_seen', '_hot', '_hot_positions', '_hits', '_wins'):
+            del state[derived]
+        state['_ranked'] = {}
+        state['_combined'] = None
+        state['_combined_bytes'] = None
+        state.pop('_profiler', None)
+        return state
+
+    def __setstate__(self, state: Dict):
+        self._profiler = None
+        self.__dict__.update(state)
+        self._bind_engines()
+        self._build_rank_tables()
+
+    def _bind_engines(self):
+        """Map engine names to their match methods, and derive the bytes tables"""
+        self._engines = {
+            'indexed': self._match_indexed,
+            'combined': self._match_combined,
+            'linear': self._match_linear,
+        }
+        self._bytes_engines = {
+            'indexed': self._match_indexed,
+            'combined': self._match_combined_bytes,
+            'linear': self._match_linear_bytes,
+        }
+        # Bytes inputs index by the first byte's value and by encoded prefix
+        self._by_prefix_bytes = {prefix.encode('ascii'): bucket
+                                 for prefix, bucket in self.by_prefix.items()}
+        self._prefix_lengths_bytes = {ord(first): lengths
+                                      for first, lengths in self.prefix_lengths.items()}
+
+        if self._profiler is not None:
+            # Profiled matchers take str and bytes alike
+            self._engines = self._bytes_engines = {
+                'indexed': self._profile_indexed,
+                'combined': self._profile_combined,
+                'linear': self._profile_linear,
+            }
+
+    def _build_rank_tables(self):
+        """
+        Derive what match_hot() needs: each class's members in rank order,
+        the classes that could match the same inputs, and the win counters
+        """
+        # Members as (rank, class_id, entry), best first; ranks are unique
+        self._class_members = [tuple(sorted(((-e.confidence, e.order), c.class_id, e) for e in c.members))
+                               for c in self.classes]
+        self._class_ranks = [members[0][0] for members in self._class_members]
+        # Literal prefix the input must start with, if the regex sees it unchanged
+        self._class_prefixes = [c.prefix if c.use_original else '' for c in self.classes]
+        self._class_prefixes_bytes = [prefix.encode('ascii') for prefix in self._class_prefixes]
+
+        # Neighbours of a class: itself and every class that could match the
+        # same input, best possible rank first
+        self._neighbours = []
+        for pattern_class in self.classes:
+            neighbours = [c for c in self.classes if self._may_overlap(pattern_class, c)]
+            neighbours.sort(key=lambda c: self._class_ranks[c.class_id])
+            self._neighbours.append(tuple(neighbours))
+        # Neighbours left for an input length and first character, by class id
+        self._neighbours_seen = {}
+
+        # Classes ordered by wins, so a run's usual winners are tried first
+        self._hot = list(self.classes)
+        self._hot_positions = list(range(len(self.classes)))
+        self._hits = [0] * len(self.classes)
+        self._wins = 0
+
+    def _may_overlap(self, first: PatternClass, second: PatternClass) -> bool:
+        """Check whether two classes could ever match the same input"""
+        if max(first.min_len, second.min_len) > min(first.max_len, second.max_len):
+            return False
+        first_prefix = self._class_prefixes[first.class_id]
+        second_prefix = self._class_prefixes[second.class_id]
+        return first_prefix.startswith(second_prefix) or second_prefix.startswith(first_prefix)
+
+    def count_win(self, class_key: Tuple[int, ...]):
+        """Count a win for the class holding the top entry of a match_classes() result"""
+        if class_key:
+            self._count_win(min(class_key, key=self._class_ranks.__getitem__))
+
+    def _count_win(self, class_id: int):
+        """Count a win for a class and move it ahead of the classes with fewer"""
+        hits, hot, positions = self._hits, self._hot, self._hot_positions
+        hits[class_id] += 1
+        self._wins += 1
+        if self._wins == HOT_DECAY_WINS:
+            # Halving keeps the order but lets a change in the input show quickly
+            self._hits = hits = [count // 2 for count in hits]
+            self._wins = 0
+
+        position = positions[class_id]
+        while position and hits[hot[position - 1].class_id] < hits[class_id]:
+            ahead = hot[position - 1]
+            hot[position - 1], hot[position] = hot[position], ahead
+            positions[ahead.class_id] = position
+            position -= 1
+        positions[class_id] = position
+
+
+    def set_profiler(self, profiler):
+        """
+        Route matching through timed matchers that fill in a PatternProfiler
+
+        Passing None restores the plain matchers, which do no bookkeeping.
+        Regexes are compiled up front so compiling is not measured.
+        """
+        if profiler is not None:
+            for pattern_class in self.classes:
+                pattern_class.regex
+                pattern_class.bytes_regex
+        self._profiler = profiler
+        self._bind_engines()
+
+    def candidates(self, hash_value) -> List[PatternClass]:
+        """Get the classes that could match hash_value (str or safe bytes)"""
+        length = len(hash_value)
+        candidates = list(self.by_length.get(length, ()))
+
+        if isinstance(hash_value, bytes):
+            by_prefix, prefix_lengths = self._by_prefix_bytes, self._prefix_lengths_bytes
+        else:
+            by_prefix, prefix_lengths = self.by_prefix, self.prefix_lengths
+
+        if hash_value:
+            for prefix_len in prefix_lengths.get(hash_value[0], ()):
+                # Longer prefixes would slice to hash_value itself and repeat a bucket
+                if prefix_len > length:
+                    break
+                bucket = by_prefix.get(hash_value[:prefix_len])
+                if bucket:
+                    candidates.extend(c for c in bucket
+                                      if c.min_len <= length <= c.max_len)
+
+        candidates.extend(c for c in self.unbounded
+                          if c.min_len <= length <= c.max_len)
+        return candidates
+
+    def match_classes(self, hash_value, engine: str = DEFAULT_ENGINE) -> Tuple[int, ...]:
+        """
+        Get the ids of the classes whose regex matches hash_value
+
+        Args:
+            hash_value: Stripped hash string, or stripped bytes passing
+                is_bytes_safe() (matched without decoding)
+            engine: One of ENGINES
+
+        Returns:
+            Sorted tuple of class ids, usable as a cache key
+        """
+        engines = self._bytes_engines if isinstance(hash_value, bytes) else self._engines
+        try:
+            matcher = engines[engine]
+        except KeyError:
+            raise ValueError(f"Unknown pattern engine '{engine}' (choose from {', '.join(ENGINES)})")
+        return matcher(hash_value)
+
+    @staticmethod
+    def _test_classes(pattern_classes, hash_value) -> Tuple[int, ...]:
+        """Run each class regex against hash_value (or its lowercase form)"""
+        if isinstance(hash_value, bytes):
+            return PatternIndex._test_classes_bytes(pattern_classes, hash_value)
+
+        hash_value_lower = None
+        matched = []
+
+        for pattern_class in pattern_classes:
+            if pattern_class.use_original:
+                test_value = hash_value
+            else:
+                if hash_value_lower is None:
+                    hash_value_lower = hash_value.lower()
+                test_value = hash_value_lower
+
+            if pattern_class.regex.match(test_value):
+                matched.append(pattern_class.class_id)
+
+        matched.sort()
+        return tuple(matched)
+
+    @staticmethod
+    def _test_classes_bytes(pattern_classes, hash_value: bytes) -> Tuple[int, ...]:
+        """_test_classes with the bytes regexes"""
+        hash_value_lower = None
+        matched = []
+
+        for pattern_class in pattern_classes:
+            if pattern_class.use_original:
+                test_value = hash_value
+            else:
+                if hash_value_lower is None:
+                    hash_value_lower = hash_value.lower()
+                test_value = hash_value_lower
+
+            if pattern_class.bytes_regex.match(test_value):
+                matched.append(pattern_class.class_id)
+
+        matched.sort()
+        return tuple(matched)
+
+    def _match_indexed(self, hash_value) -> Tuple[int, ...]:
+        """Only try the classes sharing the input's length or literal prefix"""
+        return self._test_classes(self.candidates(hash_value), hash_value)
+
+    def _match_linear(self, hash_value: str) -> Tuple[int, ...]:
+        """Try every class"""
+        return self._test_classes(self.classes, hash_value)
+
+    def _match_linear_bytes(self, hash_value: bytes) -> Tuple[int, ...]:
+        """Try every class with its bytes regex"""
+        return self._test_classes_bytes(self.classes, hash_value)
+
+    def _build_combined(self, as_bytes: bool = False) -> List[Tuple]:
+        """
+        Compile one regex per case partition
+
+        Each class becomes an optional lookahead holding a named group,
+        ``(?:(?=(?P<c7>...))|)``, so a single match() call at position 0
+        evaluates every class and the set groups name the matching ones.
+
+        Returns:
+            List of (use_original, compiled_regex, [(group_name, class_id)])
+        """
+        combined = []
+        for use_original in (True, False):
+            members = [c for c in self.classes if c.use_original == use_original]
+            if not members:
+                continue
+            parts = [f"(?:(?=(?P<c{c.class_id}>{c.pattern}))|)" for c in members]
+            groups = [(f"c{c.class_id}", c.class_id) for c in members]
+            pattern = ''.join(parts)
+            combined.append((use_original, re.compile(pattern.encode('ascii') if as_bytes else pattern),
+                             groups))
+        return combined
+
+    def _match_combined(self, hash_value: str) -> Tuple[int, ...]:
+        """Decide every class with one scan per case partition"""
+        if self._combined is None:
+            self._combined = self._build_combined()
+        return self._scan_combined(self._combined, hash_value)
+
+    def _match_combined_bytes(self, hash_value: bytes) -> Tuple[int, ...]:
+        """_match_combined with the bytes regexes"""
+        if self._combined_bytes is None:
+            self._combined_bytes = self._build_combined(as_bytes=True)
+        return self._scan_combined(self._combined_bytes, hash_value)
+
+    @staticmethod
+    def _scan_combined(combined: List[Tuple], hash_value) -> Tuple[int, ...]:
+        matched = []
+        for use_original, regex, groups in combined:
+            found = regex.match(hash_value if use_original else hash_value.lower())
+            for group_name, class_id in groups:
+                if found.group(group_name) is not None:
+                    matched.append(class_id)
+
+        matched.sort()
+        return tuple(matched)
+
+    def _profile_classes(self, pattern_classes, hash_value) -> Tuple[int, ...]:
+        """_test_classes, timing each regex call"""
+        stats_of = self._profiler.class_stats
+        clock = time.perf_counter_ns
+        is_bytes = isinstance(hash_value, bytes)
+        hash_value_lower = None
+        matched = []
+
+        for pattern_class in pattern_classes:
+            if pattern_class.use_original:
+                test_value = hash_value
+            else:
+                if hash_value_lower is None:
+                    hash_value_lower = hash_value.lower()
+                test_value = hash_value_lower
+
+            # Compiling on first use is not part of the match time
+            regex = pattern_class.bytes_regex if is_bytes else pattern_class.regex
+            start = clock()
+            found = regex.match(test_value)
+            elapsed = clock() - start
+
+            stats = stats_of(pattern_class.class_id)
+            stats[0] += 1
+            stats[2] += elapsed
+            if found:
+                stats[1] += 1
+                matched.append(pattern_class.class_id)
+
+        matched.sort()
+        return tuple(matched)
+
+    def _profile_indexed(self, hash_value) -> Tuple[int, ...]:
+        """_match_indexed, timing the dispatch and each class"""
+        start = time.perf_counter_ns()
+        candidates = self.candidates(hash_value)
+        stats = self._profiler.class_stats('dispatch')
+        stats[0] += 1
+        stats[1] += bool(candidates)
+        stats[2] += time.perf_counter_ns() - start
+        return self._profile_classes(candidates, hash_value)
+
+    def _profile_linear(self, hash_value) -> Tuple[int, ...]:
+        """_match_linear, timing each class"""
+        return self._profile_classes(self.classes, hash_value)
+
+    def _profile_combined(self, hash_value) -> Tuple[int, ...]:
+        """
+        _match_combined, timing each scan
+
+        A scan decides all of its classes at once, so its time cannot be
+        split between them; classes only get their attempts and hits.
+        """
+        if isinstance(hash_value, bytes):
+            if self._combined_bytes is None:
+                self._combined_bytes = self._build_combined(as_bytes=True)
+            combined = self._combined_bytes
+        else:
+            if self._combined is None:
+                self._combined = self._build_combined()
+            combined = self._combined
+
+        stats_of = self._profiler.class_stats
+        matched = []
+        for use_original, regex, groups in combined:
+            start = time.perf_counter_ns()
+            found = regex.match(hash_value if use_original else hash_value.lower())
+            elapsed = time.perf_counter_ns() - start
+
+            hits = 0
+            for group_name, class_id in groups:
+                stats = stats_of(class_id)
+                stats[0] += 1
+                if found.group(group_name) is not None:
+                    stats[1] += 1
+                    hits += 1
+                    matched.append(class_id)
+
+            scan = stats_of('combined' if use_original else 'combined-lower')
+            scan[0] += 1
+            scan[1] += bool(hits)
+            scan[2] += elapsed
+
+        matched.sort()
+        return tuple(matched)
+
+    def shape_key(self, hash_value) -> Optional[Tuple]:
+        """
+        Compute the shape signature of a pure-hex value
+
+        Two values with the same signature match exactly the same classes.
+        Bytes are checked with a single translate() call and give the same
+        signature as the equivalent string.
+
+        Args:
+            hash_value: Stripped hash string or bytes
+
+        Returns:
+            (length, has_digit, has_lower, has_upper), or None when the value
+            is not pure hex or the patterns do not allow shape keys
+        """
+        if not hash_value or not self.hex_shape_safe:
+            return None
+        if isinstance(hash_value, bytes):
+            if hash_value.translate(None, HEX_BYTES):
+                return None
+        elif hash_value.strip(HEX_CHARS_STR):
+            return None
+        if hash_value.isdigit():
+            return (len(hash_value), True, False, False)
+        is_lower = hash_value.islower()
+        is_upper = hash_value.isupper()
+        return (len(hash_value), not hash_value.isalpha(),
+                is_lower or not is_upper, is_upper or not is_lower)
+
+    def ranked_entries(self, class_key: Tuple[int, ...]) -> Tuple[PatternEntry, ...]:
+        """
+        Fan a set of matching classes out to their member entries
+
+        Args:
+            class_key: Tuple returned by match_classes()
+
+        Returns:
+            Entries sorted by confidence (highest first), ties in PATTERNS order
+        """
+        ranked = self._ranked.get(class_key)
+        if ranked is None:
+            members = [e for class_id in class_key for e in self.classes[class_id].members]
+            members.sort(key=lambda e: (-e.confidence, e.order))
+            ranked = tuple(members)
+            self._ranked[class_key] = ranked
+        return ranked
+
+    def match(self, hash_value, engine: str = DEFAULT_ENGINE) -> Tuple[PatternEntry, ...]:
+        """Get the entries matching hash_value, ranked by confidence"""
+        return self.ranked_entries(self.match_classes(hash_value, engine))
+
+    def match_hot(self, hash_value) -> Optional[Iterator[PatternEntry]]:
+        """
+        Try the classes that won most often so far, without any dispatch
+
+        Every class that could match alongside a hot class is one of its
+        precomputed neighbours, so once a hot class matches, only those are
+        left to rank.
+
+        Args:
+            hash_value: Stripped hash string, or stripped bytes passing
+                is_bytes_safe() (matched without decoding)
+
+        Returns:
+            Lazy iterator over the match() entries, or None when no hot
+            class matches
+        """
+        length = len(hash_value)
+        is_bytes = isinstance(hash_value, bytes)
+        prefixes = self._class_prefixes_bytes if is_bytes else self._class_prefixes
+        hash_value_lower = None
+
+        for pattern_class in self._hot[:HOT_CLASSES]:
+            # Length and prefix rule out most misses without a regex call
+            if not (pattern_class.min_len <= length <= pattern_class.max_len
+                    and hash_value.startswith(prefixes[pattern_class.class_id])):
+                continue
+            if pattern_class.use_original:
+                test_value = hash_value
+            else:
+                if hash_value_lower is None:
+                    hash_value_lower = hash_value.lower()
+                test_value = hash_value_lower
+            regex = pattern_class.bytes_regex if is_bytes else pattern_class.regex
+            if regex.match(test_value):
+                return self._iter_neighbours(pattern_class, hash_value, hash_value_lower)
+        return None
+
+    def _neighbours_of(self, class_id: int, hash_value) -> Tuple[PatternClass, ...]:
+        """Neighbours of a class that fit the input's length and first character"""
+        key = (class_id, len(hash_value), hash_value[:1])
+        neighbours = self._neighbours_seen.get(key)
+        if neighbours is None:
+            if len(self._neighbours_seen) >= NEIGHBOURS_SEEN_SIZE:
+                self._neighbours_seen.clear()
+            length, first = key[1], key[2]
+            prefixes = self._class_prefixes_bytes if isinstance(hash_value, bytes) else self._class_prefixes
+            neighbours = tuple(c for c in self._neighbours[class_id]
+                               if c.min_len <= length <= c.max_len
+                               and prefixes[c.class_id][:1] in (first, first[:0]))
+            self._neighbours_seen[key] = neighbours
+        return neighbours
+
+    def _iter_neighbours(self, hot_class: PatternClass, hash_value,
+                         hash_value_lower=None) -> Iterator[PatternEntry]:
+        """
+        Yield the entries matching hash_value among a matched class's
+        neighbours, in ranked_entries() order
+
+        Neighbours are tested best possible rank first, and an entry is
+        yielded as soon as no untested neighbour could outrank it: a caller
+        that stops after the first few entries skips the regexes that could
+        only have added lower-ranked ones.
+        """
+        is_bytes = isinstance(hash_value, bytes)
+        prefixes = self._class_prefixes_bytes if is_bytes else self._class_prefixes
+        class_ranks = self._class_ranks
+        # Heap of (rank, class_id, entry) for entries not yielded yet
+        matched = []
+        winner = True
+
+        for pattern_class in self._neighbours_of(hot_class.class_id, hash_value):
+            class_id = pattern_class.class_id
+            bound = class_ranks[class_id]
+            while matched and matched[0][0] < bound:
+                _, winner_id, entry = heapq.heappop(matched)
+                if winner:
+                    self._count_win(winner_id)
+                    winner = False
+                yield entry
+
+            if pattern_class is not hot_class:
+                if not hash_value.startswith(prefixes[class_id]):
+                    continue
+                if pattern_class.use_original:
+                    test_value = hash_value
+                else:
+                    if hash_value_lower is None:
+                        hash_value_lower = hash_value.lower()
+                    test_value = hash_value_lower
+                regex = pattern_class.bytes_regex if is_bytes else pattern_class.regex
+                if not regex.match(test_value):
+                    continue
+            for member in self._class_members[class_id]:
+                heapq.heappush(matched, member)
+
+        while matched:
+            _, winner_id, entry = heapq.heappop(matched)
+            if winner:
+                self._count_win(winner_id)
+                winner = False
+            yield entry
+
+
+def is_bytes_safe(hash_value: bytes) -> bool:
+    """Check that bytes can be matched directly (see BYTES_SAFE)"""
+    return not hash_value.translate(None, BYTES_SAFE)
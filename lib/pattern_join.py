@@ -0,0 +1,94 @@
+"""
+Pattern Join Module
+Resolves each HashPatterns.PATTERNS key to the hashcat modes it stands for.
+Most keys are the database name of their mode; the rest are listed in
+PATTERN_ALIASES, which must be kept in step with both tables.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+
+# Pattern key -> database mode names, for keys that are not a mode's name
+PATTERN_ALIASES = {
+    'Half-MD5': ['Half MD5'],
+    'GOST': ['GOST R 34.11-94'],
+    'GOST-512': ['GOST R 34.11-2012 Streebog (512-bit)'],
+    'SM3': ['SM3 (ShangMi 3)'],
+    'BLAKE2b-512 ($BLAKE2$)': ['BLAKE2b-512'],
+    'Argon2id': ['Argon2'],
+    'Argon2i': ['Argon2'],
+    'descrypt': ['descrypt (DES)'],
+    'BSDi-crypt': ['BSDi Crypt (Extended DES)'],
+    'WordPress phpass': ['phpass'],
+    'Drupal-7': ['Drupal7'],
+    'Django-SHA1': ['Django (SHA-1)'],
+    'Django-PBKDF2': ['Django (PBKDF2-SHA256)'],
+    'Apache-apr1': ['Apache $apr1$ MD5'],
+    'MSSQL-2000': ['MSSQL (2000)'],
+    'MSSQL-2005+': ['MSSQL (2005)'],
+    'LDAP-SHA': ['nsldap (SHA-1 Base64)'],
+    'LDAP-SSHA': ['nsldaps (SSHA-1 Base64)'],
+    'HMAC-MD5': ['HMAC-MD5 (key = $pass)', 'HMAC-MD5 (key = $salt)'],
+    'HMAC-SHA1': ['HMAC-SHA1 (key = $pass)', 'HMAC-SHA1 (key = $salt)'],
+    'HMAC-SHA256': ['HMAC-SHA256 (key = $pass)', 'HMAC-SHA256 (key = $salt)'],
+    'HMAC-SHA512': ['HMAC-SHA512 (key = $pass)', 'HMAC-SHA512 (key = $salt)'],
+    'Joomla': ['Joomla < 2.5.18'],
+}
+
+
+def build_pattern_join(pattern_names: Iterable[str], modes: List[Dict],
+                       aliases: Dict[str, List[str]] = None) -> Tuple[Dict[str, Tuple[Dict, ...]], Dict]:
+    """
+    Map every pattern to its modes, and report what does not line up
+
+    A pattern resolves through its alias if it has one, otherwise to the
+    modes whose name equals it case-insensitively (all of them, when
+    several modes share a name).
+
+    Args:
+        pattern_names: PATTERNS keys
+        modes: Database hash modes
+        aliases: Alias map (default PATTERN_ALIASES)
+
+    Returns:
+        (join, report): join maps each pattern to a tuple of mode dicts
+        (empty if it has none); report lists aliased patterns, patterns
+        without a mode, modes without a pattern, names shared by several
+        modes, and alias entries naming unknown patterns or modes
+    """
+    if aliases is None:
+        aliases = PATTERN_ALIASES
+    pattern_names = list(pattern_names)
+
+    by_name = {}
+    for mode in modes:
+        by_name.setdefault(mode['name'].lower(), []).append(mode)
+
+    join = {}
+    stale = {}
+    for pattern in pattern_names:
+        names = aliases.get(pattern, [pattern])
+        resolved = []
+        for name in names:
+            found = by_name.get(name.lower())
+            if found:
+                resolved.extend(found)
+            elif pattern in aliases:
+                stale.setdefault(pattern, []).append(name)
+        join[pattern] = tuple(resolved)
+
+    for pattern in aliases:
+        if pattern not in join:
+            stale[pattern] = list(aliases[pattern])
+
+    joined = {id(mode) for resolved in join.values() for mode in resolved}
+    report = {
+        'patterns': len(pattern_names),
+        'aliased': {pattern: list(aliases[pattern]) for pattern in pattern_names if pattern in aliases},
+        'patterns_without_mode': [pattern for pattern in pattern_names if not join[pattern]],
+        'modes_without_pattern': [[mode['mode'], mode['name']] for mode in modes if id(mode) not in joined],
+        'name_collisions': {name: [mode['mode'] for mode in found]
+                            for name, found in by_name.items() if len(found) > 1},
+        'stale_aliases': stale,
+    }
+    return join, report
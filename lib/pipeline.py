@@ -0,0 +1,70 @@
+"""
+Batch Pipeline Module
+Streaming building blocks for batch runs:
+reader (lib.reader) -> identifier -> formatter -> writer, one hash at a time
+"""
+
+import time
+from typing import IO, Callable, Iterable, List, Optional
+
+
+# Characters buffered before a write call is issued
+WRITE_BUFFER_SIZE = 64 * 1024
+
+# Seconds after which buffered output is written and flushed anyway
+FLUSH_INTERVAL = 1.0
+
+
+def write_chunks(chunks: Iterable[str], streams: List[IO[str]],
+                 buffer_size: int = WRITE_BUFFER_SIZE,
+                 flush_interval: Optional[float] = None,
+                 on_flush: Optional[Callable[[], None]] = None) -> int:
+    """
+    Write output chunks to every stream as they are produced
+    
+    Small chunks are coalesced into writes of about buffer_size characters,
+    so memory stays bounded however long the chunk stream is.
+    
+    Args:
+        chunks: Iterable of output strings
+        streams: Open text streams (e.g. stdout and a --save file)
+        buffer_size: Characters to collect before writing
+        flush_interval: If set, seconds after which pending output is
+            written and the streams flushed even if the buffer is not full,
+            so slow inputs still produce output and a crash loses little
+        on_flush: Called after each of those flushes, when the streams
+            hold every chunk consumed so far (e.g. to save a checkpoint)
+        
+    Returns:
+        Total number of characters written per stream
+    """
+    pending = []
+    pending_size = 0
+    written = 0
+    last_flush = time.monotonic()
+    
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        due = flush_interval is not None and time.monotonic() - last_flush >= flush_interval
+        if pending_size >= buffer_size or due:
+            data = "".join(pending)
+            for stream in streams:
+                stream.write(data)
+                if due:
+                    stream.flush()
+            written += len(data)
+            pending = []
+            pending_size = 0
+            if due:
+                if on_flush is not None:
+                    on_flush()
+                last_flush = time.monotonic()
+    
+    if pending:
+        data = "".join(pending)
+        for stream in streams:
+            stream.write(data)
+        written += len(data)
+    
+    return written
@@ -0,0 +1,155 @@
+"""
+Profiler Module
+Opt-in profiling of identification (`--profile`): attempts, hits and time
+spent per pattern class, and how identify_hash splits its time between its
+stages. Nothing is measured, or even checked, unless a profiler is
+installed (see HashAnalyzer.enable_profiling).
+"""
+
+import time
+from typing import Dict, List
+
+
+# identify_hash stages, in the order they run
+STAGES = ('prepare', 'cache', 'match', 'modes', 'sort', 'build')
+
+STAGE_LABELS = {
+    'prepare': 'strip/decode input',
+    'cache': 'result cache',
+    'match': 'pattern matching',
+    'modes': 'mode lookup',
+    'sort': 'ranking/sorting',
+    'build': 'result building',
+}
+
+# Rows of the pattern report that are not a single pattern class
+SCAN_LABELS = {
+    'dispatch': '(length/prefix dispatch)',
+    'combined': '(combined scan, case-sensitive patterns)',
+    'combined-lower': '(combined scan, lowercased patterns)',
+}
+
+
+class PatternProfiler:
+    """
+    Counters filled in while profiling is enabled
+
+    classes maps a pattern class id (or a SCAN_LABELS key) to
+    [attempts, hits, nanoseconds]; stages maps each STAGES name to
+    [calls, nanoseconds].
+    """
+
+    def __init__(self):
+        self.classes = {}
+        self.stages = {stage: [0, 0] for stage in STAGES}
+        self.inputs = 0
+        self._started = time.perf_counter_ns()
+
+    def class_stats(self, key) -> List[int]:
+        """Counters of one pattern class or scan, created on first use"""
+        stats = self.classes.get(key)
+        if stats is None:
+            stats = self.classes[key] = [0, 0, 0]
+        return stats
+
+    def add_stage(self, stage: str, nanoseconds: int):
+        """Count one call of a stage"""
+        stats = self.stages[stage]
+        stats[0] += 1
+        stats[1] += nanoseconds
+
+    def count_input(self):
+        """Count one profiled identification"""
+        self.inputs += 1
+
+    def report(self, index) -> Dict:
+        """
+        Sorted report, JSON-ready
+
+        Args:
+            index: The PatternIndex that was profiled, to name the classes
+
+        Returns:
+            Dictionary with 'inputs', 'wall_ns', 'patterns' (most time
+            first) and 'stages' (in the order they run)
+        """
+        pattern_ns = sum(stats[2] for stats in self.classes.values()) or 1
+        patterns = []
+        for key, (attempts, hits, nanoseconds) in self.classes.items():
+            if key in SCAN_LABELS:
+                pattern, hash_types = SCAN_LABELS[key], []
+            else:
+                pattern_class = index.classes[key]
+                pattern = pattern_class.pattern
+                hash_types = [entry.hash_type for entry in pattern_class.members]
+            patterns.append({
+                'class': key,
+                'pattern': pattern,
+                'hash_types': hash_types,
+                'attempts': attempts,
+                'hits': hits,
+                'total_ns': nanoseconds,
+                'ns_per_attempt': round(nanoseconds / attempts, 1) if attempts else 0.0,
+                'share': round(nanoseconds / pattern_ns, 4),
+            })
+        patterns.sort(key=lambda row: (-row['total_ns'], -row['attempts'], str(row['class'])))
+
+        stage_ns = sum(nanoseconds for _, nanoseconds in self.stages.values()) or 1
+        stages = [{
+            'stage': stage,
+            'calls': calls,
+            'total_ns': nanoseconds,
+            'ns_per_call': round(nanoseconds / calls, 1) if calls else 0.0,
+            'share': round(nanoseconds / stage_ns, 4),
+        } for stage, (calls, nanoseconds) in self.stages.items()]
+
+        return {
+            'inputs': self.inputs,
+            'wall_ns': time.perf_counter_ns() - self._started,
+            'patterns': patterns,
+            'stages': stages,
+        }
+
+
+class StageTee:
+    """Stage sink forwarding to several others (a profiler and metrics at once)"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def add_stage(self, stage: str, nanoseconds: int):
+        for sink in self.sinks:
+            sink.add_stage(stage, nanoseconds)
+
+    def count_input(self):
+        for sink in self.sinks:
+            sink.count_input()
+
+
+def format_profile(report: Dict, top: int = 20) -> str:
+    """Text tables for a report(): the costliest patterns and the stage split"""
+    lines = [
+        f"Profile: {report['inputs']} inputs in {report['wall_ns'] / 1e6:.1f} ms",
+        "",
+        f"{'Pattern class':<42} {'Attempts':>10} {'Hits':>10} {'Total ms':>10} {'ns/try':>8} {'Share':>7}",
+        "-" * 92,
+    ]
+    for row in report['patterns'][:top]:
+        name = ', '.join(row['hash_types']) or row['pattern']
+        if len(name) > 42:
+            name = name[:39] + '...'
+        lines.append(f"{name:<42} {row['attempts']:>10} {row['hits']:>10} "
+                     f"{row['total_ns'] / 1e6:>10.3f} {row['ns_per_attempt']:>8.0f} {row['share']:>7.1%}")
+    hidden = len(report['patterns']) - top
+    if hidden > 0:
+        lines.append(f"... {hidden} more")
+
+    lines += [
+        "",
+        f"{'Stage':<42} {'Calls':>10} {'Total ms':>10} {'ns/call':>8} {'Share':>7}",
+        "-" * 81,
+    ]
+    for row in report['stages']:
+        lines.append(f"{STAGE_LABELS[row['stage']]:<42} {row['calls']:>10} "
+                     f"{row['total_ns'] / 1e6:>10.3f} {row['ns_per_call']:>8.0f} {row['share']:>7.1%}")
+    return '\n'.join(lines)
@@ -0,0 +1,215 @@
+"""
+Block Reader Module
+Reads hash files in large blocks (memory-mapped where possible) and splits
+them into lines at the bytes level, for multi-gigabyte dumps
+"""
+
+import mmap
+import os
+from typing import BinaryIO, Iterator, List, Tuple, Union
+
+
+# Bytes handed to the line splitter at a time
+BLOCK_SIZE = 1 << 20
+
+# Byte order marks stripped from the start of the input
+BOMS = (b'\xef\xbb\xbf', b'\xff\xfe', b'\xfe\xff')
+BOM_MAX_LEN = max(len(bom) for bom in BOMS)
+
+COMMENT = ord('#')
+
+
+def iter_blocks(source: Union[str, BinaryIO], block_size: int = BLOCK_SIZE,
+                use_mmap: bool = True, start: int = 0) -> Iterator[bytes]:
+    """
+    Read a file as blocks of about block_size bytes
+
+    Regular files are memory-mapped, so each block is a single slice of
+    the mapping; pipes, empty files and unmappable handles fall back to
+    plain block reads.
+
+    Args:
+        source: Path, or a binary file object
+        block_size: Bytes per block
+        use_mmap: Allow memory mapping
+        start: Byte offset to start reading at (needs a seekable file)
+
+    Returns:
+        Iterator of bytes blocks, in file order
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        with open(source, 'rb') as handle:
+            yield from iter_blocks(handle, block_size, use_mmap, start)
+        return
+
+    if use_mmap:
+        try:
+            mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError, AttributeError):
+            mapped = None
+        if mapped is not None:
+            with mapped:
+                for position in range(start, len(mapped), block_size):
+                    yield mapped[position:position + block_size]
+            return
+
+    if start:
+        source.seek(start)
+    # read1 returns what a pipe holds right away instead of waiting for a full block
+    read = getattr(source, 'read1', source.read)
+    while True:
+        block = read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def iter_regions(source: Union[str, BinaryIO], block_size: int = BLOCK_SIZE,
+                 use_mmap: bool = True) -> Iterator[bytes]:
+    """
+    Read a file as blocks that end on a line boundary
+
+    NUL bytes are dropped (which also makes ASCII UTF-16 dumps readable)
+    and a leading BOM is removed.
+
+    Args:
+        source: Path, or a binary file object
+        block_size: Bytes read per block
+        use_mmap: Allow memory mapping
+
+    Returns:
+        Iterator of bytes regions holding whole lines
+    """
+    carry = b''
+    first = True
+
+    for block in iter_blocks(source, block_size, use_mmap):
+        if b'\0' in block:
+            block = block.replace(b'\0', b'')
+        if carry:
+            block = carry + block
+        if first:
+            if len(block) < BOM_MAX_LEN:
+                carry = block
+                continue
+            block = _strip_bom(block)
+            first = False
+
+        # The last partial line continues in the next block
+        cut = block.rfind(b'\n') + 1
+        carry = block[cut:]
+        if cut:
+            yield block[:cut]
+
+    if first:
+        carry = _strip_bom(carry)
+    if carry:
+        yield carry
+
+
+def _strip_bom(data: bytes) -> bytes:
+    for bom in BOMS:
+        if data.startswith(bom):
+            return data[len(bom):]
+    return data
+
+
+def iter_lines(source: Union[str, BinaryIO], block_size: int = BLOCK_SIZE,
+               use_mmap: bool = True) -> Iterator[bytes]:
+    """
+    Split a file into hash lines without decoding it
+
+    Lines are stripped of surrounding whitespace (so CRLF endings work),
+    and blank lines and '#' comments are skipped (see iter_regions for NUL
+    and BOM handling).
+
+    Args:
+        source: Path, or a binary file object
+        block_size: Bytes read per block
+        use_mmap: Allow memory mapping
+
+    Returns:
+        Iterator of non-empty bytes lines
+    """
+    for region in iter_regions(source, block_size, use_mmap):
+        for line in region.split(b'\n'):
+            line = line.strip()
+            if line and line[0] != COMMENT:
+                yield line
+
+
+def iter_line_batches(source: Union[str, BinaryIO], max_lines: int, block_size: int = BLOCK_SIZE,
+                      use_mmap: bool = True) -> Iterator[List[bytes]]:
+    """
+    Split a stream into batches of hash lines as they arrive
+
+    A batch holds the complete lines of one read, at most max_lines of
+    them: a slow producer's lines come out as soon as they end, a fast
+    one's in large batches. Lines are cleaned and filtered like
+    iter_lines(); reads holding no hash line produce no batch.
+
+    Args:
+        source: Path, or a binary file object (e.g. sys.stdin.buffer)
+        max_lines: Largest batch
+        block_size: Bytes read at most per block
+        use_mmap: Allow memory mapping
+
+    Returns:
+        Iterator of lists of non-empty bytes lines
+    """
+    for region in iter_regions(source, block_size, use_mmap):
+        lines = [line for line in (raw.strip() for raw in region.split(b'\n'))
+                 if line and line[0] != COMMENT]
+        for start in range(0, len(lines), max_lines):
+            yield lines[start:start + max_lines]
+
+
+def iter_lines_at(source: Union[str, BinaryIO], start: int = 0, block_size: int = BLOCK_SIZE,
+                  use_mmap: bool = True) -> Iterator[Tuple[bytes, int]]:
+    """
+    Split a file into hash lines, with the byte offset just past each one
+
+    Lines are cleaned and filtered like iter_lines(), but offsets count the
+    raw file bytes, so reading again from a returned offset resumes right
+    after that line (used by checkpointed runs).
+
+    Args:
+        source: Path, or a seekable binary file object
+        start: Byte offset to start at: 0, or an offset returned earlier
+        block_size: Bytes read per block
+        use_mmap: Allow memory mapping
+
+    Returns:
+        Iterator of (line, offset) pairs
+    """
+    offset = start
+    carry = b''
+    first = start == 0
+
+    for block in iter_blocks(source, block_size, use_mmap, start):
+        data = carry + block if carry else block
+        cut = data.rfind(b'\n') + 1
+        carry = data[cut:]
+        if not cut:
+            continue
+        for raw in data[:cut - 1].split(b'\n'):
+            offset += len(raw) + 1
+            line = _clean_line(raw, first)
+            first = False
+            if line:
+                yield line, offset
+
+    if carry:
+        line = _clean_line(carry, first)
+        if line:
+            yield line, offset + len(carry)
+
+
+def _clean_line(raw: bytes, first: bool) -> bytes:
+    """A raw line as iter_lines() yields it, or b'' if it is skipped"""
+    if b'\0' in raw:
+        raw = raw.replace(b'\0', b'')
+    if first:
+        raw = _strip_bom(raw)
+    raw = raw.strip()
+    return raw if raw and raw[0] != COMMENT else b''
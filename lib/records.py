@@ -0,0 +1,169 @@
+"""
+Result Records Module
+Compact, slotted identification results. Mode records are built once per
+database load and shared; a result only stores its own input, length and a
+reference to a shared tuple of matches.
+
+Records read like the result dictionaries (result['matches'][0]['hashcat_mode'])
+and to_dict() returns the dictionary form for JSON and older callers. Shared
+records are immutable and each to_dict() call builds new dictionaries.
+"""
+
+import sys
+from typing import Dict, Tuple
+
+
+class ModeRecord:
+    """Immutable view of one hashcat mode from the database"""
+
+    __slots__ = ('mode', 'name', 'category', 'description', 'salt_type', 'example', 'variants')
+
+    def __init__(self, mode_info: Dict):
+        setattr_ = super().__setattr__
+        setattr_('mode', mode_info['mode'])
+        setattr_('name', mode_info['name'])
+        # Repeated across many modes, so share one string object per value
+        setattr_('category', sys.intern(mode_info['category']))
+        setattr_('description', mode_info['description'])
+        setattr_('salt_type', sys.intern(mode_info.get('salt_type', 'unknown')))
+        setattr_('example', mode_info.get('example', 'N/A'))
+        setattr_('variants', tuple(mode_info.get('variants', ())))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (_mode_record, (self.mode, self.name, self.category, self.description,
+                               self.salt_type, self.example, self.variants))
+
+    def __repr__(self):
+        return f"ModeRecord({self.mode}, {self.name!r})"
+
+
+def _mode_record(mode, name, category, description, salt_type, example, variants) -> ModeRecord:
+    """Unpickle a ModeRecord"""
+    return ModeRecord({'mode': mode, 'name': name, 'category': category,
+                       'description': description, 'salt_type': salt_type,
+                       'example': example, 'variants': variants})
+
+
+# Result dictionary keys of a match, and the ModeRecord attribute each reads
+MATCH_KEYS = {
+    'hash_type': 'name',
+    'hashcat_mode': 'mode',
+    'category': 'category',
+    'description': 'description',
+    'confidence': None,
+    'salt_type': 'salt_type',
+    'example': 'example',
+    'variants': 'variants',
+}
+
+
+class MatchRecord:
+    """
+    Immutable view of one candidate mode with its confidence
+
+    Records are shared by every result with the same set of matching
+    patterns; to_dict() returns a new dictionary each time, so callers may
+    change it freely.
+    """
+
+    __slots__ = ('mode', 'confidence', '_dict')
+
+    def __init__(self, mode: ModeRecord, confidence: int):
+        setattr_ = super().__setattr__
+        setattr_('mode', mode)
+        setattr_('confidence', confidence)
+        # Never handed out; to_dict() copies it
+        setattr_('_dict', {
+            'hash_type': mode.name,
+            'hashcat_mode': mode.mode,
+            'category': mode.category,
+            'description': mode.description,
+            'confidence': confidence,
+            'salt_type': mode.salt_type,
+            'example': mode.example,
+            'variants': mode.variants
+        })
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def to_dict(self) -> Dict:
+        """Match entry in the result dictionary format"""
+        match = self._dict.copy()
+        match['variants'] = list(match['variants'])
+        return match
+
+    def __getitem__(self, key: str):
+        attribute = MATCH_KEYS[key]
+        if attribute is None:
+            return self.confidence
+        value = getattr(self.mode, attribute)
+        return list(value) if key == 'variants' else value
+
+    def __reduce__(self):
+        return (MatchRecord, (self.mode, self.confidence))
+
+    def __repr__(self):
+        return f"MatchRecord({self.mode.mode}, {self.mode.name!r}, {self.confidence})"
+
+
+class HashResult:
+    """Identification result for one input"""
+
+    __slots__ = ('input_hash', 'hash_length', 'matches')
+
+    KEYS = ('input_hash', 'hash_length', 'matches', 'confidence')
+
+    def __init__(self, input_hash: str, hash_length: int, matches: Tuple[MatchRecord, ...]):
+        self.input_hash = input_hash
+        self.hash_length = hash_length
+        self.matches = matches
+
+    @property
+    def confidence(self):
+        """Confidence of the top match, or 'Unknown'"""
+        return self.matches[0].confidence if self.matches else 'Unknown'
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.KEYS
+
+    def to_dict(self) -> Dict:
+        """Result in the dictionary format returned by identify_hash()"""
+        return {
+            'input_hash': self.input_hash,
+            'hash_length': self.hash_length,
+            'matches': [match.to_dict() for match in self.matches],
+            'confidence': self.confidence
+        }
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (HashResult, dict)):
+            return self.to_dict() == as_dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return self.input_hash, self.hash_length, self.matches
+
+    def __setstate__(self, state):
+        self.input_hash, self.hash_length, self.matches = state
+
+    def __repr__(self):
+        return f"HashResult({self.input_hash!r}, {len(self.matches)} matches)"
+
+
+def as_dict(result) -> Dict:
+    """Dictionary form of a result, whether it is a HashResult or already a dict"""
+    return result.to_dict() if isinstance(result, HashResult) else result
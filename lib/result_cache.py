@@ -0,0 +1,64 @@
+"""
+Result Cache Module
+Bounded LRU cache for finished identification match lists
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+# Default number of cached match lists
+DEFAULT_CACHE_SIZE = 100000
+
+
+class ResultCache:
+    """
+    Least-recently-used cache with hit/miss/eviction counters
+    
+    Values are stored as-is and must be treated as immutable by callers.
+    A maxsize of 0 disables caching entirely.
+    """
+    
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = max(0, maxsize)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[object]:
+        """Get a cached value, or None on a miss"""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key: Hashable, value: object):
+        """Store a value, evicting the least recently used entry when full"""
+        if not self.maxsize:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+    
+    def info(self) -> Dict:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
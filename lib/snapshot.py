@@ -0,0 +1,141 @@
+"""
+Database Snapshot Module
+Precompiled snapshot of the hashcat modes database and pattern index,
+stored next to the JSON and loaded with a single mmap-backed read
+
+Snapshots are pickles, so they are only written on request (--rebuild-cache,
+setup.sh) and only loaded when nobody but their owner can have written them.
+"""
+
+import mmap
+import os
+import pickle
+import stat
+import sys
+from typing import Dict, Optional
+
+from lib.hash_patterns import HashPatterns
+
+
+# Bump whenever the snapshot layout or the pickled classes change
+SNAPSHOT_FORMAT = 4
+
+SNAPSHOT_SUFFIX = '.snapshot'
+
+
+def snapshot_path(db_path: str) -> str:
+    """Get the snapshot file that belongs to a database JSON file"""
+    root, _ = os.path.splitext(db_path)
+    return root + SNAPSHOT_SUFFIX
+
+
+def _source_stamp(db_path: str) -> Optional[Dict]:
+    """Identify the current JSON file by size and modification time"""
+    try:
+        file_stat = os.stat(db_path)
+    except OSError:
+        return None
+    return {'size': file_stat.st_size, 'mtime_ns': file_stat.st_mtime_ns}
+
+
+def _header(db_path: str) -> Optional[Dict]:
+    """Everything a snapshot must agree on to be valid"""
+    stamp = _source_stamp(db_path)
+    if stamp is None:
+        return None
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'python': sys.version_info[:2],
+        'source': stamp,
+        'patterns': HashPatterns.fingerprint(),
+    }
+
+
+def _is_trusted(file_stat: os.stat_result) -> bool:
+    """
+    Check that a snapshot is a regular file owned by this user (or root)
+    and not writable by group or others
+    """
+    if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        return False
+    # No ownership to check on platforms without POSIX user ids
+    geteuid = getattr(os, 'geteuid', None)
+    return geteuid is None or file_stat.st_uid in (geteuid(), 0)
+
+
+def load_snapshot(db_path: str) -> Optional[Dict]:
+    """
+    Load the snapshot for db_path if it is still valid
+
+    The file is unpickled straight from a read-only memory mapping, without
+    copying it into a bytes object first. Files that fail _is_trusted() are
+    ignored, since unpickling one could run arbitrary code.
+
+    Args:
+        db_path: Path of the hashcat modes JSON file
+
+    Returns:
+        Snapshot payload, or None when missing, stale, untrusted or
+        unreadable; its 'pattern_index' is a loader returning the PatternIndex
+    """
+    header = _header(db_path)
+    if header is None:
+        return None
+
+    try:
+        with open(snapshot_path(db_path), 'rb') as f:
+            # Checked on the open file, so it cannot be swapped in between
+            if not _is_trusted(os.fstat(f.fileno())):
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                snapshot = pickle.loads(mapped)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('header') != header:
+        return None
+
+    index_blob = snapshot['pattern_index']
+    snapshot['pattern_index'] = lambda: pickle.loads(index_blob)
+    return snapshot
+
+
+def save_snapshot(db_path: str, modes_data: Dict, indexes: Dict) -> Optional[str]:
+    """
+    Write a snapshot for db_path atomically
+
+    Args:
+        db_path: Path of the hashcat modes JSON file the data came from
+        modes_data: Parsed database
+        indexes: Lookup tables built from modes_data
+
+    Returns:
+        Snapshot path, or None if it could not be written
+    """
+    header = _header(db_path)
+    if header is None:
+        return None
+
+    snapshot = {
+        'header': header,
+        'modes_data': modes_data,
+        'indexes': indexes,
+        # Nested pickle so loaders can defer compiling the regexes
+        'pattern_index': pickle.dumps(HashPatterns.get_index(), protocol=pickle.HIGHEST_PROTOCOL),
+    }
+
+    path = snapshot_path(db_path)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Whatever the umask, a group-writable snapshot would not be loaded
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return None
+    return path
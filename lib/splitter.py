@@ -0,0 +1,222 @@
+"""
+Split Writer Module
+Streams input lines into one file per hashcat mode (`--split-dir`), ready
+to hand to `hashcat -m N`. Open files are kept in a bounded LRU pool, so
+inputs spanning thousands of modes never run out of file descriptors.
+"""
+
+import json
+import os
+import re
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Iterable, Tuple, Union
+
+
+# Files kept open at once; the least recently written one is closed first
+DEFAULT_MAX_OPEN = 128
+
+# Write buffer per open file
+SPLIT_BUFFER_SIZE = 64 * 1024
+
+UNMATCHED_FILE = 'unmatched.txt'
+MANIFEST_FILE = 'manifest.json'
+
+# Names of the files a split writes
+SPLIT_FILE_RE = re.compile(r'mode_\d+\.txt|unmatched\.txt')
+
+
+class HandlePool:
+    """
+    Bounded pool of buffered append handles with LRU eviction
+
+    A file is truncated the first time the pool opens it and appended to
+    when it is reopened after an eviction.
+    """
+
+    def __init__(self, directory: str, max_open: int = DEFAULT_MAX_OPEN,
+                 buffer_size: int = SPLIT_BUFFER_SIZE):
+        if max_open < 1:
+            raise ValueError("max_open must be at least 1")
+        self.directory = directory
+        self.max_open = max_open
+        self.buffer_size = buffer_size
+        self._handles = OrderedDict()
+        self._created = set()
+        self.evictions = 0
+
+    def write(self, name: str, data: bytes):
+        """Append data to a file of the pool's directory"""
+        handle = self._handles.get(name)
+        if handle is None:
+            handle = self._open(name)
+        else:
+            self._handles.move_to_end(name)
+        handle.write(data)
+
+    def _open(self, name: str) -> BinaryIO:
+        if len(self._handles) >= self.max_open:
+            _, oldest = self._handles.popitem(last=False)
+            oldest.close()
+            self.evictions += 1
+        mode = 'ab' if name in self._created else 'wb'
+        handle = open(os.path.join(self.directory, name), mode, buffering=self.buffer_size)
+        self._created.add(name)
+        self._handles[name] = handle
+        return handle
+
+    def resume(self, sizes: Dict[str, int]):
+        """
+        Continue files written by an interrupted run
+
+        Each file is cut back to its checkpointed size and is appended to
+        from then on.
+        """
+        for name, size in sizes.items():
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path) or os.path.getsize(path) < size:
+                raise ValueError(f"'{path}' is shorter than when it was checkpointed")
+            with open(path, 'ab') as handle:
+                handle.truncate(size)
+            self._created.add(name)
+
+    def flush(self):
+        """Write out the buffers of every open file"""
+        for handle in self._handles.values():
+            handle.flush()
+
+    def close(self):
+        """Flush and close every open file"""
+        while self._handles:
+            _, handle = self._handles.popitem(last=False)
+            handle.close()
+
+
+class ModeSplitter:
+    """
+    Writes each input line to DIR/mode_<N>.txt for its top match, or for
+    every candidate mode with split_all, and unmatched lines to
+    DIR/unmatched.txt
+    """
+
+    def __init__(self, directory: str, split_all: bool = False,
+                 max_open: int = DEFAULT_MAX_OPEN, state: Dict = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.split_all = split_all
+        self.pool = HandlePool(directory, max_open)
+        self.total = 0
+        self.unmatched = 0
+        # File name -> (hashcat mode, hash type, lines)
+        self.files = {}
+        if state is None:
+            self._remove_previous_split()
+        else:
+            self._resume(state)
+
+    def _remove_previous_split(self):
+        """Delete the files listed by an earlier run's manifest, so none go stale"""
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+            names = [entry['file'] for entry in manifest.get('files', [])]
+            names.append(UNMATCHED_FILE)
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        for name in names + [MANIFEST_FILE]:
+            # Only plain names are ours to delete
+            if name and os.path.basename(name) == name:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def to_state(self) -> Dict:
+        """
+        Counts and file sizes as JSON-ready data, for checkpoints
+
+        Buffers are flushed first, so the sizes cover every line added.
+        """
+        self.pool.flush()
+        names = list(self.files) + ([UNMATCHED_FILE] if self.unmatched else [])
+        return {
+            'total': self.total,
+            'unmatched': self.unmatched,
+            'files': [[name, mode, hash_type, lines] for name, (mode, hash_type, lines) in self.files.items()],
+            'sizes': {name: os.path.getsize(os.path.join(self.directory, name)) for name in names},
+        }
+
+    def _resume(self, state: Dict):
+        """Continue from to_state(): cut files back and drop newer ones"""
+        self.total = state['total']
+        self.unmatched = state['unmatched']
+        self.files = {name: (mode, hash_type, lines) for name, mode, hash_type, lines in state['files']}
+        sizes = state['sizes']
+        for name in os.listdir(self.directory):
+            # Files first written after the checkpoint would otherwise keep lines twice
+            if SPLIT_FILE_RE.fullmatch(name) and name not in sizes:
+                os.remove(os.path.join(self.directory, name))
+        self.pool.resume(sizes)
+
+    def add(self, line: Union[str, bytes], result):
+        """Route one input line by its identification result"""
+        if isinstance(line, str):
+            line = line.encode('utf-8')
+        data = line + b'\n'
+        self.total += 1
+
+        matches = result['matches']
+        if not matches:
+            self.unmatched += 1
+            self.pool.write(UNMATCHED_FILE, data)
+            return
+
+        seen = set()
+        for match in (matches if self.split_all else matches[:1]):
+            mode = match['hashcat_mode']
+            if mode in seen:
+                continue
+            seen.add(mode)
+            name = f"mode_{mode}.txt"
+            entry = self.files.get(name)
+            self.files[name] = (mode, match['hash_type'], entry[2] + 1 if entry else 1)
+            self.pool.write(name, data)
+
+    def add_all(self, pairs: Iterable[Tuple[Union[str, bytes], Dict]]) -> 'ModeSplitter':
+        """Route (line, result) pairs, consuming them lazily"""
+        for line, result in pairs:
+            self.add(line, result)
+        return self
+
+    def manifest(self) -> Dict:
+        """Counts per written file, most lines first"""
+        files = sorted(self.files.items(), key=lambda item: (-item[1][2], item[1][0]))
+        return {
+            'input_lines': self.total,
+            'split_all': self.split_all,
+            'files': [
+                {'file': name, 'hashcat_mode': mode, 'hash_type': hash_type, 'lines': lines}
+                for name, (mode, hash_type, lines) in files
+            ],
+            'unmatched': {'file': UNMATCHED_FILE if self.unmatched else None,
+                          'lines': self.unmatched},
+        }
+
+    def close(self) -> str:
+        """
+        Close every file and write the manifest
+
+        Returns:
+            Path of the manifest
+        """
+        self.pool.close()
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        with open(path, 'w') as f:
+            json.dump(self.manifest(), f, indent=2)
+        return path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
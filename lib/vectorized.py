@@ -0,0 +1,99 @@
+"""
+Vectorized Shape Classifier
+Optional NumPy batch path for raw-hex input: a chunk of lines is loaded into
+a fixed-width array and lengths, hex validity and letter case are computed
+for every row at once. Without NumPy, every function here reports that
+vectorization is unavailable and callers use the per-line path.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+
+NUMPY_AVAILABLE = np is not None
+
+# Rows longer than this are left to the regex path (keeps the array small)
+VECTOR_MAX_WIDTH = 256
+
+# Character classes, as bit flags
+_DIGIT, _LOWER, _UPPER, _OTHER = 1, 2, 4, 8
+
+
+def _class_table():
+    """Map every code point below 256 to its character class flag"""
+    table = np.full(256, _OTHER, dtype=np.uint8)
+    table[np.frombuffer(b'0123456789', dtype=np.uint8)] = _DIGIT
+    table[np.frombuffer(b'abcdef', dtype=np.uint8)] = _LOWER
+    table[np.frombuffer(b'ABCDEF', dtype=np.uint8)] = _UPPER
+    return table
+
+
+_CLASS_TABLE = _class_table() if NUMPY_AVAILABLE else None
+
+
+def bucket_by_shape(values: Sequence) -> Optional[Tuple[Dict[Tuple, List[int]], List[int]]]:
+    """
+    Group the rows of a batch by hex shape (see PatternIndex.shape_key)
+
+    Args:
+        values: Hash strings, or bytes lines (all of one type)
+
+    Returns:
+        (buckets, leftovers): (length, has_digit, has_lower, has_upper) ->
+        row numbers, and the rows that are not pure hex; None when NumPy is
+        missing or the batch cannot be vectorized
+    """
+    if not NUMPY_AVAILABLE or not values:
+        return None
+
+    if isinstance(values[0], bytes):
+        value_type, dtype, code_type, code_size = bytes, bytes, np.uint8, 1
+    else:
+        value_type, dtype, code_type, code_size = str, str, np.uint32, 4
+    if not all(isinstance(v, value_type) for v in values):
+        return None
+
+    # Over-long rows are left to the regex path so the array stays narrow
+    lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values))
+    fits = lengths <= VECTOR_MAX_WIDTH
+    if not fits.all():
+        empty = value_type()
+        values = [v if len(v) <= VECTOR_MAX_WIDTH else empty for v in values]
+
+    array = np.array(values, dtype=dtype)
+    width = array.dtype.itemsize // code_size
+    if not width:
+        return {}, list(range(len(values)))
+    codes = array.view(code_type).reshape(len(values), width)
+    # NumPy drops trailing NULs, which can make a row wider than the array
+    fits &= lengths <= width
+
+    # Fixed-width arrays are padded with NULs, so the real length comes from
+    # the original values and padding positions are masked out
+    classes = _CLASS_TABLE[np.minimum(codes, 255)]
+    classes[np.arange(width) >= lengths[:, None]] = 0
+    flags = np.bitwise_or.reduce(classes, axis=1).astype(np.int64)
+
+    is_hex = ((flags & _OTHER) == 0) & (lengths > 0) & fits
+    hex_rows = np.flatnonzero(is_hex)
+    leftovers = np.flatnonzero(~is_hex).tolist()
+
+    # One signature per (length, flags); group rows sharing it
+    signature = lengths[hex_rows] * 16 + flags[hex_rows]
+    order = np.argsort(signature, kind='stable')
+    sorted_signature = signature[order]
+    boundaries = np.flatnonzero(np.diff(sorted_signature)) + 1
+
+    buckets = {}
+    for start, rows in zip(np.concatenate(([0], boundaries)).tolist(),
+                           np.split(hex_rows[order], boundaries)):
+        if not len(rows):
+            continue
+        length, flag = divmod(int(sorted_signature[start]), 16)
+        key = (length, bool(flag & _DIGIT), bool(flag & _LOWER), bool(flag & _UPPER))
+        buckets[key] = rows.tolist()
+    return buckets, leftovers
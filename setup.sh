@@ -59,6 +59,13 @@ if [ ! -f "$SCRIPT_DIR/database/hashcat_modes.json" ]; then
 fi
 echo "✓ Database verified: database/hashcat_modes.json"
 
+# Precompile the database so every run starts fast
+if (cd "$SCRIPT_DIR" && python3 hash_identifier.py --rebuild-cache --no-banner > /dev/null); then
+    echo "✓ Database snapshot built: database/hashcat_modes.snapshot"
+else
+    echo "  (Database snapshot not built; hxmod will read the JSON database)"
+fi
+
 # Test the installation
 echo ""
 echo "Testing installation..."
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Aggregate Tests
+Streaming histograms must equal counts taken from the full result list,
+serially, merged from partial counters, and from worker processes
+"""
+
+import csv
+import io
+import json
+
+from conftest import DB_PATH, load_samples
+from lib.aggregate import HashAggregate, format_aggregate
+from lib.hash_analyzer import HashAnalyzer
+
+
+def test_counts_match_results(samples):
+    analyzer = HashAnalyzer(DB_PATH)
+    hashes = samples * 5
+    results = analyzer.identify_multiple(hashes)
+    counts = analyzer.aggregate(iter(hashes))
+
+    assert counts.total == len(results)
+    assert counts.unmatched == sum(1 for r in results if not r['matches'])
+    assert sum(counts.top_matches.values()) == counts.identified
+    assert sum(counts.lengths.values()) == counts.total
+    assert sum(counts.modes.values()) == sum(len(r['matches']) for r in results)
+    tops = [(r['matches'][0]['hash_type'], r['matches'][0]['hashcat_mode']) for r in results if r['matches']]
+    assert counts.top_matches == {key: tops.count(key) for key in set(tops)}
+
+
+def test_partial_counts_merge(samples):
+    analyzer = HashAnalyzer(DB_PATH)
+    analyzer.PARALLEL_MIN_HASHES = 10
+    hashes = samples * 5
+    whole = analyzer.aggregate(hashes)
+
+    halves = HashAggregate().update_all(analyzer.iter_identify(hashes[:20]))
+    halves.merge(HashAggregate().update_all(analyzer.iter_identify(hashes[20:])))
+    assert halves == whole
+    assert analyzer.aggregate(iter(hashes), workers=2, chunk_size=7) == whole
+
+
+def test_output_formats(samples):
+    analyzer = HashAnalyzer(DB_PATH)
+    counts = analyzer.aggregate(samples * 5)
+
+    data = json.loads(format_aggregate(counts, 'json'))
+    assert data == json.loads(format_aggregate(counts, 'json_compact')) == counts.to_dict()
+    ndjson = format_aggregate(counts, 'ndjson')
+    assert "\n" not in ndjson and json.loads(ndjson) == data
+    rows = list(csv.reader(io.StringIO(format_aggregate(counts, 'csv'))))
+    assert rows[0] == ['histogram', 'key', 'hashcat_mode', 'count']
+    assert ['summary', 'total', '', str(counts.total)] in rows
+    assert f"Total Hashes Analyzed: {counts.total}" in format_aggregate(counts, 'standard')
+
+
+if __name__ == '__main__':
+    test_counts_match_results(load_samples())
+    test_partial_counts_merge(load_samples())
+    test_output_formats(load_samples())
+    print("[PASSED] aggregate histograms")
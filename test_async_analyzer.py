@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+"""
+Async Analyzer Tests
+AsyncHashAnalyzer must return exactly what HashAnalyzer returns, batching
+concurrent callers without blocking the event loop
+"""
+
+import asyncio
+import threading
+
+from conftest import DB_PATH
+from lib.async_analyzer import AsyncHashAnalyzer
+from lib.hash_analyzer import HashAnalyzer
+
+
+HASHES = [
+    '8846f7eaee8fb117ad06bdd810b7e332',
+    '$2a$12$R9h/cIPz0gi.URNNGHQ1be3DlH.PKZbv5H8KnzzVgXXbVxzy2K7E.',
+    'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855',
+    '356a192b7913b04c54574d18c28d46e6395428ab',
+    'not a hash',
+] * 200
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_identify_batches_concurrent_callers():
+    expected = [HashAnalyzer(DB_PATH).identify_hash(h) for h in HASHES]
+
+    async def scenario():
+        async with AsyncHashAnalyzer(HashAnalyzer(DB_PATH), max_batch_size=64,
+                                     max_queue=100) as analyzer:
+            results = await asyncio.gather(*(analyzer.identify(h) for h in HASHES))
+            return results, analyzer.info()
+
+    results, info = run(scenario())
+    assert results == expected
+    assert info['hashes'] == len(HASHES)
+    assert 1 < info['largest_batch'] <= 64
+
+
+def test_identify_many_and_stream_keep_order():
+    expected = HashAnalyzer(DB_PATH).identify_multiple(HASHES)
+
+    async def lines():
+        for value in HASHES:
+            yield value + '\n'
+            yield '\n'
+
+    async def scenario():
+        async with AsyncHashAnalyzer(HashAnalyzer(DB_PATH), max_batch_size=50,
+                                     max_concurrency=3, max_queue=10) as analyzer:
+            many = await analyzer.identify_many(HASHES)
+            streamed = [result async for result in analyzer.iter_identify(lines())]
+            return many, streamed
+
+    many, streamed = run(scenario())
+    assert many == expected
+    assert streamed == expected
+
+
+def test_event_loop_stays_responsive():
+    async def scenario():
+        ticks = 0
+        stop = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not stop.is_set():
+                ticks += 1
+                await asyncio.sleep(0)
+
+        async with AsyncHashAnalyzer(HashAnalyzer(DB_PATH, cache_size=0), max_batch_size=100) as analyzer:
+            task = asyncio.ensure_future(ticker())
+            await analyzer.identify_many(HASHES * 5)
+            stop.set()
+            await task
+        return ticks
+
+    assert run(scenario()) > 1
+
+
+def test_default_executor_uses_one_thread():
+    analyzer = HashAnalyzer(DB_PATH)
+    identify_hash = analyzer.identify_hash
+    threads = set()
+
+    def identify_recording(value):
+        threads.add(threading.get_ident())
+        return identify_hash(value)
+
+    analyzer.identify_hash = identify_recording
+
+    async def scenario():
+        async with AsyncHashAnalyzer(analyzer, max_batch_size=10, max_concurrency=4) as async_analyzer:
+            return await async_analyzer.identify_many(HASHES * 5)
+
+    assert run(scenario()) == HashAnalyzer(DB_PATH).identify_multiple(HASHES * 5)
+    assert len(threads) == 1
+
+
+def test_process_pool_matches_threads():
+    expected = HashAnalyzer(DB_PATH).identify_multiple(HASHES)
+
+    async def scenario():
+        async with AsyncHashAnalyzer(HashAnalyzer(DB_PATH), processes=2,
+                                     max_batch_size=200) as analyzer:
+            return await analyzer.identify_many(HASHES)
+
+    assert run(scenario()) == expected
+
+
+def test_close_fails_queued_callers():
+    expected = HashAnalyzer(DB_PATH).identify_hash(HASHES[0])
+    gate = threading.Event()
+    analyzer = HashAnalyzer(DB_PATH)
+    identify_hash = analyzer.identify_hash
+    analyzer.identify_hash = lambda value: gate.wait(5) and identify_hash(value)
+
+    async def scenario():
+        async with AsyncHashAnalyzer(analyzer, max_batch_size=1, max_concurrency=1,
+                                     max_queue=2) as async_analyzer:
+            # One batch running, one waiting for its slot, two queued, the rest waiting to queue
+            tasks = [asyncio.ensure_future(async_analyzer.identify(h)) for h in HASHES[:10]]
+            await asyncio.sleep(0.05)
+            await async_analyzer.aclose()
+            gate.set()
+            done, pending = await asyncio.wait(tasks, timeout=5)
+        assert not pending
+        return [task.exception() or task.result() for task in tasks]
+
+    results = run(scenario())
+    assert results[0] == expected
+    assert all(isinstance(result, RuntimeError) for result in results[1:])
+
+
+if __name__ == '__main__':
+    test_identify_batches_concurrent_callers()
+    test_identify_many_and_stream_keep_order()
+    test_event_loop_stays_responsive()
+    test_default_executor_uses_one_thread()
+    test_process_pool_matches_threads()
+    test_close_fails_queued_callers()
+    print("[PASSED] async analyzer")
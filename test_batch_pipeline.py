@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+"""
+Batch Pipeline Tests
+Streaming reader/formatter/writer behaviour for file processing
+"""
+
+import io
+import json
+import select
+import subprocess
+import sys
+import tempfile
+
+from conftest import CLI, DB_PATH, SAMPLES, load_samples
+from lib.hash_analyzer import HashAnalyzer
+from lib.formatter import BatchResultFormatter, BatchSummary, get_formatter, parse_fields
+from lib.pipeline import write_chunks
+
+
+def test_streamed_json_equals_json_dumps(samples):
+    results = HashAnalyzer(DB_PATH).identify_multiple(samples)
+    for batch in (results, results[:1], []):
+        assert "".join(BatchResultFormatter.iter_json_batch(batch)) == json.dumps(batch, indent=2)
+        assert ("".join(BatchResultFormatter.iter_json_batch(batch, compact=True))
+                == json.dumps(batch, separators=(',', ':')))
+
+
+def test_summary_counts_from_running_counters(samples):
+    results = HashAnalyzer(DB_PATH).identify_multiple(samples)
+    summary = BatchSummary()
+    output = "".join(BatchResultFormatter.iter_batch(iter(results), 'standard', summary))
+    assert summary.total == len(results)
+    assert summary.identified == sum(1 for r in results if r['matches'])
+    assert f"Total Hashes Analyzed: {len(results)}" in output
+
+
+def test_ndjson_lines_and_fields(samples):
+    results = HashAnalyzer(DB_PATH).identify_multiple(samples)
+    lines = "".join(BatchResultFormatter.iter_batch(iter(results), 'ndjson')).splitlines()
+    assert [json.loads(line) for line in lines] == results
+    
+    fields = parse_fields('hash, top_mode,confidence')
+    chunks = list(BatchResultFormatter.iter_batch(iter(results), 'ndjson', fields=fields))
+    assert len(chunks) == len(results) and all(c.endswith("\n") for c in chunks)
+    first = json.loads(chunks[0])
+    assert list(first) == ['hash', 'top_mode', 'confidence']
+    assert first['top_mode'] == results[0]['matches'][0]['hashcat_mode']
+    try:
+        parse_fields('hash,example')
+        assert False, "unknown field accepted"
+    except ValueError:
+        pass
+
+
+def test_long_hashes_are_kept_whole():
+    sha512crypt = '$6$rounds=5000$usesomesillystri$D4IrlXatmP7rx3P3InaxBeoomnAihCKRVQP22JZ6EY47Wc6BkroIuUUBOov1i.S5KPgErtP/EN5mcO.ChWQW21'
+    results = [HashAnalyzer(DB_PATH).identify_hash(sha512crypt)]
+    fields = parse_fields('hash')
+    for output_format in ('ndjson', 'json', 'json_compact'):
+        output = "".join(BatchResultFormatter.iter_batch(iter(results), output_format, fields=fields))
+        assert sha512crypt in output and '...' not in output, output_format
+    
+    # Only the text formats shorten it
+    detailed = get_formatter('detailed')(results[0])
+    assert sha512crypt[:50] + '...' in detailed and sha512crypt not in detailed
+
+
+class FlushCounter(io.StringIO):
+    flushes = 0
+    
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+def test_write_chunks_flushes_on_interval():
+    stream = FlushCounter()
+    write_chunks((f"{i}\n" for i in range(10)), [stream], flush_interval=0)
+    # Every chunk is due immediately, so nothing waits for the buffer to fill
+    assert stream.flushes == 10
+    assert stream.getvalue() == "".join(f"{i}\n" for i in range(10))
+
+
+def test_write_chunks_coalesces_and_tees():
+    first, second = io.StringIO(), io.StringIO()
+    chunks = (f"line {i}\n" for i in range(1000))
+    written = write_chunks(chunks, [first, second], buffer_size=100)
+    assert first.getvalue() == second.getvalue() == "".join(f"line {i}\n" for i in range(1000))
+    assert written == len(first.getvalue())
+
+
+def test_parallel_results_keep_input_order(samples):
+    analyzer = HashAnalyzer(DB_PATH)
+    analyzer.PARALLEL_MIN_HASHES = 10
+    hashes = samples * 5
+    expected = [analyzer.identify_hash(h) for h in hashes]
+    assert analyzer.identify_multiple(hashes, workers=2, chunk_size=7) == expected
+    assert list(analyzer.iter_identify(iter(hashes), workers=2, chunk_size=7)) == expected
+
+
+def test_piped_stdin_streams_each_line():
+    # No arguments and a piped stdin: results only, each written once its line is read
+    process = subprocess.Popen([sys.executable, CLI, '-o', 'ndjson'], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for value in ('8846f7eaee8fb117ad06bdd810b7e332', 'not a hash'):
+            process.stdin.write(value.encode() + b'\n')
+            process.stdin.flush()
+            assert select.select([process.stdout], [], [], 30)[0], 'result not flushed'
+            assert json.loads(process.stdout.readline())['input_hash'] == value
+        process.stdin.close()
+        assert process.stdout.read() == b''
+        assert process.wait(30) == 0
+        assert process.stderr.read() == b''
+    finally:
+        process.kill()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def test_closed_pipe_exits_quietly():
+    with open(SAMPLES, 'rb') as f:
+        data = f.read() * 2000
+    with tempfile.TemporaryFile() as source:
+        source.write(data)
+        source.seek(0)
+        # Like `hxmod -f - < hashes.txt | head -1`
+        process = subprocess.Popen([sys.executable, CLI, '-f', '-', '-o', 'csv'], stdin=source,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        process.stdout.readline()
+        process.stdout.close()
+        errors = process.stderr.read()
+        process.stderr.close()
+        assert process.wait(60) == 141
+    assert errors == b''
+
+
+def test_stdin_streaming_rejects_jobs():
+    value = b'8846f7eaee8fb117ad06bdd810b7e332\n'
+    rejected = subprocess.run([sys.executable, CLI, '-f', '-', '-j', '2'], input=value,
+                              capture_output=True, timeout=60)
+    assert rejected.returncode == 2 and b'--flush-every' in rejected.stderr
+    assert subprocess.run([sys.executable, CLI, '-j', '2'], input=value,
+                          capture_output=True, timeout=60).returncode == 2
+    
+    counted = subprocess.run([sys.executable, CLI, '-j', '2', '--aggregate', '-o', 'json'],
+                             input=value, capture_output=True, timeout=60)
+    assert counted.returncode == 0 and json.loads(counted.stdout)['total'] == 1
+
+
+if __name__ == '__main__':
+    test_streamed_json_equals_json_dumps(load_samples())
+    test_summary_counts_from_running_counters(load_samples())
+    test_ndjson_lines_and_fields(load_samples())
+    test_long_hashes_are_kept_whole()
+    test_write_chunks_flushes_on_interval()
+    test_write_chunks_coalesces_and_tees()
+    test_parallel_results_keep_input_order(load_samples())
+    test_piped_stdin_streams_each_line()
+    test_closed_pipe_exits_quietly()
+    test_stdin_streaming_rejects_jobs()
+    print("[PASSED] batch pipeline")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Checkpoint Tests
+A run interrupted and resumed from its checkpoint must produce exactly the
+output of an uninterrupted run
+"""
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+
+
+import lib.checkpoint
+import lib.pipeline
+from hash_identifier import HashIdentifierCLI
+from conftest import DB_PATH
+from lib.aggregate import HashAggregate
+from lib.hash_analyzer import HashAnalyzer
+from lib.reader import iter_lines, iter_lines_at
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FailingAnalyzer(HashAnalyzer):
+    """Analyzer that stops the run after a number of identifications"""
+
+    def __init__(self, fail_after):
+        super().__init__(DB_PATH, vectorize=False)
+        self.remaining = fail_after
+
+    def identify_record(self, hash_input):
+        self.remaining -= 1
+        if self.remaining < 0:
+            raise Interrupted()
+        return super().identify_record(hash_input)
+
+
+def write_input(directory):
+    rng = random.Random(19)
+    lines = []
+    for i in range(600):
+        kind = i % 4
+        if kind == 0:
+            lines.append('$2a$10$' + ''.join(rng.choice('abcdefghijklmnop') for _ in range(53)))
+        elif kind == 1:
+            lines.append(f'not a hash {i}')
+        else:
+            lines.append(''.join(rng.choice('0123456789abcdef') for _ in range(rng.choice([32, 40, 64]))))
+    path = os.path.join(directory, 'hashes.txt')
+    with open(path, 'w') as f:
+        f.write('# dump\n' + '\n'.join(lines) + '\n')
+    return path
+
+
+def run(analyzer, *args):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        HashIdentifierCLI(analyzer)._dispatch(HashIdentifierCLI().parser.parse_args(list(args)))
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def test_offsets_resume_after_each_line():
+    data = b'\xef\xbb\xbfaaa\r\n# comment\n\n  bbb \nccc\x00\nddd'
+    expected = list(iter_lines(io.BytesIO(data)))
+    pairs = list(iter_lines_at(io.BytesIO(data), block_size=3))
+    assert [line for line, _ in pairs] == expected
+    for i, (_, offset) in enumerate(pairs):
+        assert [line for line, _ in iter_lines_at(io.BytesIO(data), offset)] == expected[i + 1:]
+
+
+def test_interrupted_runs_resume_exactly():
+    saved = lib.checkpoint.CHECKPOINT_INTERVAL, lib.pipeline.FLUSH_INTERVAL
+    lib.checkpoint.CHECKPOINT_INTERVAL = lib.pipeline.FLUSH_INTERVAL = 0
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            source = write_input(directory)
+            checkpoint = os.path.join(directory, 'run.ckpt')
+            for output_format in ('ndjson', 'json', 'json_compact', 'csv'):
+                reference = os.path.join(directory, f'reference.{output_format}')
+                output = os.path.join(directory, f'resumed.{output_format}')
+                run(HashAnalyzer(DB_PATH), '-f', source, '-o', output_format, '--save', reference)
+
+                args = ['-f', source, '-o', output_format, '--save', output, '--checkpoint', checkpoint]
+                for fail_after in (150, 200):
+                    try:
+                        run(FailingAnalyzer(fail_after), *args, *(['--resume'] if fail_after == 200 else []))
+                        assert False, "run was not interrupted"
+                    except Interrupted:
+                        assert os.path.exists(checkpoint)
+                run(HashAnalyzer(DB_PATH), *args, '--resume')
+                assert read(output) == read(reference)
+                assert not os.path.exists(checkpoint)
+    finally:
+        lib.checkpoint.CHECKPOINT_INTERVAL, lib.pipeline.FLUSH_INTERVAL = saved
+
+
+def test_resume_needs_the_same_top():
+    saved = lib.checkpoint.CHECKPOINT_INTERVAL, lib.pipeline.FLUSH_INTERVAL
+    lib.checkpoint.CHECKPOINT_INTERVAL = lib.pipeline.FLUSH_INTERVAL = 0
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            source = write_input(directory)
+            checkpoint = os.path.join(directory, 'run.ckpt')
+            args = ['-f', source, '-o', 'ndjson', '--save', os.path.join(directory, 'out.ndjson'),
+                    '--checkpoint', checkpoint]
+            try:
+                run(FailingAnalyzer(150), *args)
+                assert False, "run was not interrupted"
+            except Interrupted:
+                pass
+            try:
+                run(HashAnalyzer(DB_PATH), *args, '--top', '1', '--resume')
+                assert False, "resumed with a different --top"
+            except lib.checkpoint.CheckpointError as e:
+                assert 'top' in str(e)
+    finally:
+        lib.checkpoint.CHECKPOINT_INTERVAL, lib.pipeline.FLUSH_INTERVAL = saved
+
+
+def test_aggregate_state_round_trip():
+    analyzer = HashAnalyzer(DB_PATH)
+    counts = analyzer.aggregate(['8846f7eaee8fb117ad06bdd810b7e332', 'not a hash',
+                                 '$2a$12$R9h/cIPz0gi.URNNGHQ1be3DlH.PKZbv5H8KnzzVgXXbVxzy2K7E.'])
+    assert HashAggregate.from_state(counts.to_state()) == counts
+
+
+if __name__ == '__main__':
+    test_offsets_resume_after_each_line()
+    test_interrupted_runs_resume_exactly()
+    test_resume_needs_the_same_top()
+    test_aggregate_state_round_trip()
+    print("[PASSED] checkpointed runs")
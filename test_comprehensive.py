@@ -4,13 +4,14 @@ Comprehensive Hash Identifier Test Suite
 Tests all 60+ hash types for accurate identification
 """
 
+import os
 import sys
-sys.path.insert(0, '/Users/sa21i/Desktop/hash-identifier')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from lib.hash_patterns import HashPatterns
 from lib.hash_analyzer import HashAnalyzer
 
-def test_hash(hash_value, expected_type, test_name=""):
+def check_hash(hash_value, expected_type, test_name=""):
     """Test a single hash"""
     print(f"\n{'='*70}")
     print(f"TEST: {test_name}")
@@ -104,7 +105,7 @@ def run_tests():
     failed = 0
     
     for hash_val, expected, test_name in tests:
-        if test_hash(hash_val, expected, test_name):
+        if check_hash(hash_val, expected, test_name):
             passed += 1
         else:
             failed += 1
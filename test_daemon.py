@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Daemon Tests
+JSON-lines protocol, concurrent clients and hot reload of the database
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from conftest import DB_PATH
+from lib.hash_analyzer import HashAnalyzer
+from lib.daemon import HashDaemon
+from lib.daemon_client import DaemonClient, DaemonError, RemoteAnalyzer, connect_from_env
+
+
+HASHES = [
+    '8846f7eaee8fb117ad06bdd810b7e332',
+    '$2a$12$R9h/cIPz0gi.URNNGHQ1be3DlH.PKZbv5H8KnzzVgXXbVxzy2K7E.',
+    'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855',
+    'not a hash',
+]
+
+
+class RunningDaemon:
+    """Serve a HashDaemon from a background thread in a temporary directory"""
+
+    def __init__(self, reload_interval=0):
+        self.directory = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.directory, 'hashcat_modes.json')
+        shutil.copy(DB_PATH, self.db_path)
+        self.socket_path = os.path.join(self.directory, 'hxmod.sock')
+        self.daemon = HashDaemon(self.socket_path, self.db_path, reload_interval=reload_interval)
+
+    def __enter__(self):
+        self.daemon.start()
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.daemon.shutdown()
+        self.thread.join()
+        shutil.rmtree(self.directory)
+
+
+def test_protocol_matches_local_analyzer():
+    local = HashAnalyzer(DB_PATH)
+    with RunningDaemon() as running, DaemonClient(running.socket_path) as client:
+        for value in HASHES:
+            assert client.identify(value) == json.loads(json.dumps(local.identify_hash(value)))
+        assert client.batch(HASHES) == json.loads(json.dumps(local.identify_multiple(HASHES)))
+        assert client.batch(HASHES, top=2) == json.loads(json.dumps(local.identify_multiple(HASHES, top=2)))
+        assert client.identify(HASHES[0], top=1) == json.loads(json.dumps(local.identify_best(HASHES[0])))
+        assert client.search('bcrypt') == local.search_by_name('bcrypt')
+        assert client.mode(3200) == local.get_mode_details(3200)
+        assert client.mode(999999) is None
+        assert client.info() == local.get_database_info()
+
+        for op, params in (('nope', {}), ('mode', {'mode': '3200'}),
+                           ('identify', {'hash': HASHES[0], 'top': 0}),
+                           ('batch', {'hashes': HASHES, 'top': '1'})):
+            try:
+                client.request(op, **params)
+            except DaemonError:
+                continue
+            assert False, f"bad request accepted: {op} {params}"
+        # The connection survives errors
+        assert client.request('ping')['reloads'] == 0
+
+
+def test_concurrent_clients():
+    errors = []
+
+    def worker(socket_path):
+        try:
+            with DaemonClient(socket_path) as client:
+                for _ in range(50):
+                    assert [r['hash_length'] for r in client.batch(HASHES)] == [len(h) for h in HASHES]
+        except Exception as e:
+            errors.append(e)
+
+    with RunningDaemon() as running:
+        threads = [threading.Thread(target=worker, args=(running.socket_path,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert not errors
+
+
+def test_reload_keeps_connections():
+    with RunningDaemon() as running, DaemonClient(running.socket_path) as client:
+        assert client.mode(3200)['name'] == 'bcrypt'
+
+        with open(running.db_path) as f:
+            data = json.load(f)
+        data['hash_modes'] = [m for m in data['hash_modes'] if m['mode'] != 3200]
+        with open(running.db_path, 'w') as f:
+            json.dump(data, f)
+
+        assert client.request('reload') == {'reloaded': True}
+        assert client.mode(3200) is None
+        assert client.request('reload') == {'reloaded': False}
+
+
+def test_remote_analyzer_from_env():
+    with RunningDaemon() as running:
+        remote = connect_from_env({'HXMOD_SOCKET': running.socket_path})
+        assert isinstance(remote, RemoteAnalyzer)
+        assert list(remote.iter_identify(HASHES, chunk_size=3))[1]['matches'][0]['hash_type'] == 'bcrypt'
+        remote.client.close()
+    assert connect_from_env({}) is None
+    assert connect_from_env({'HXMOD_SOCKET': running.socket_path}) is None
+
+
+if __name__ == '__main__':
+    test_protocol_matches_local_analyzer()
+    test_concurrent_clients()
+    test_reload_keeps_connections()
+    test_remote_analyzer_from_env()
+    print("[PASSED] daemon protocol, concurrency and reload")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Hashcat Modes Database Tests
+Loading, snapshotting and lookups in HashcatModeManager
+"""
+
+import os
+import shutil
+import tempfile
+
+from conftest import DB_PATH
+from lib.hash_analyzer import HashAnalyzer, HashcatModeManager
+from lib.pattern_join import build_pattern_join
+from lib.snapshot import snapshot_path
+
+
+def copy_database(directory):
+    path = os.path.join(directory, 'hashcat_modes.json')
+    shutil.copy(DB_PATH, path)
+    return path
+
+
+def test_snapshot_written_and_reused():
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = copy_database(directory)
+        first = HashcatModeManager(db_path)
+        assert not first.loaded_from_snapshot
+        assert not os.path.exists(snapshot_path(db_path))
+        assert first.save_snapshot() == snapshot_path(db_path)
+
+        second = HashcatModeManager(db_path)
+        assert second.loaded_from_snapshot
+        assert second.modes_data == first.modes_data
+        assert second.get_mode_by_number(3200)['name'] == 'bcrypt'
+        assert second.get_mode_by_name('ntlm') is second.get_mode_by_number(1000)
+
+
+def test_snapshot_invalidated_by_json_change():
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = copy_database(directory)
+        HashcatModeManager(db_path).save_snapshot()
+        stat = os.stat(db_path)
+        os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        manager = HashcatModeManager(db_path)
+        assert not manager.loaded_from_snapshot
+        assert not HashcatModeManager(db_path).loaded_from_snapshot
+        manager.rebuild_snapshot()
+        assert HashcatModeManager(db_path).loaded_from_snapshot
+
+
+def test_writable_snapshot_not_loaded():
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = copy_database(directory)
+        path = HashcatModeManager(db_path).save_snapshot()
+        assert os.stat(path).st_mode & 0o777 == 0o644
+        for mode in (0o664, 0o646):
+            os.chmod(path, mode)
+            assert not HashcatModeManager(db_path).loaded_from_snapshot
+        os.chmod(path, 0o600)
+        assert HashcatModeManager(db_path).loaded_from_snapshot
+        if hasattr(os, 'chown') and os.geteuid() == 0:
+            os.chown(path, 12345, -1)
+            assert not HashcatModeManager(db_path).loaded_from_snapshot
+
+
+def test_corrupt_snapshot_ignored():
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = copy_database(directory)
+        with open(snapshot_path(db_path), 'wb') as f:
+            f.write(b'not a pickle')
+        manager = HashcatModeManager(db_path)
+        assert not manager.loaded_from_snapshot
+        assert manager.get_mode_by_number(0)['name'] == 'MD5'
+
+
+def names(results):
+    return [mode['name'] for mode in results]
+
+
+def test_search_ranking():
+    manager = HashcatModeManager(DB_PATH, use_snapshot=False)
+    # Exact name first, then names it starts, then names containing it
+    assert names(manager.search_modes('sha2-256'))[0] == 'SHA2-256'
+    assert names(manager.search_modes('crypt'))[0] == 'BSDi Crypt (Extended DES)'
+    assert manager.search_modes('3200')[0]['mode'] == 3200
+    assert names(manager.search_modes('RIPEMD-160'))[:2] == ['RIPEMD-160', 'SHA1']
+    assert names(manager.search_modes('hmac sha512 salt')) == ['HMAC-SHA512 (key = $salt)']
+    assert names(manager.search_modes('sha', limit=3)) == ['SHA1', 'SHA2-224', 'SHA2-256']
+
+
+def test_search_tolerates_typos():
+    manager = HashcatModeManager(DB_PATH, use_snapshot=False)
+    assert names(manager.search_modes('bcyrpt')) == ['bcrypt']
+    assert names(manager.search_modes('ntml')) == ['NTLM']
+    assert 'SHA2-256' in names(manager.search_modes('sha256'))
+    # An exact hit suppresses typo matches
+    assert names(manager.search_modes('bcrypt')) == ['bcrypt']
+    assert manager.search_modes('nothing like this') == []
+
+
+def test_search_finds_every_substring_match():
+    manager = HashcatModeManager(DB_PATH, use_snapshot=False)
+    for query in ('sha', 'md5', 'crypt', 'hmac', '256', 'unix', 'salt', '$', '(', '= $'):
+        expected = [mode for mode in manager.modes_data['hash_modes']
+                    if query in mode['name'].lower() or query in mode['description'].lower()]
+        found = manager.search_modes(query)
+        assert all(mode in found for mode in expected), query
+
+
+def test_search_index_from_snapshot():
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = copy_database(directory)
+        first = HashcatModeManager(db_path)
+        first.save_snapshot()
+        second = HashcatModeManager(db_path)
+        assert second.loaded_from_snapshot
+        assert second.search_modes('bcyrpt') == first.search_modes('bcyrpt')
+        assert second.search_modes('md5')[0] is second.get_mode_by_number(0)
+
+
+def test_every_alias_resolves():
+    manager = HashcatModeManager(DB_PATH, use_snapshot=False)
+    report = manager.join_report
+    assert report['stale_aliases'] == {} and report['name_collisions'] == {}
+    assert [mode.mode for mode in manager.get_pattern_records('HMAC-SHA1')] == [150, 160]
+    assert manager.get_pattern_records('Drupal-7')[0].name == 'Drupal7'
+
+    analyzer = HashAnalyzer(DB_PATH)
+    modes = lambda value: [m['hashcat_mode'] for m in analyzer.identify_hash(value)['matches']]
+    assert 5100 in modes('8846f7eaee8fb117')
+    assert modes('_J9..saltXXhash12345') == [12400]
+    assert modes('{SSHA}hMAGRjvj5HjHm3Y+0paNQVDDxnGYlAu5') == [111]
+
+
+def test_join_reports_mismatches():
+    modes = [{'mode': 1, 'name': 'Alpha'}, {'mode': 2, 'name': 'alpha'},
+             {'mode': 3, 'name': 'Beta (long)'}, {'mode': 4, 'name': 'Gamma'}]
+    join, report = build_pattern_join(['ALPHA', 'Beta', 'Delta'], modes,
+                                      {'Beta': ['Beta (long)'], 'Delta': ['Nope'], 'Gone': ['Gamma']})
+    assert [mode['mode'] for mode in join['ALPHA']] == [1, 2]
+    assert [mode['mode'] for mode in join['Beta']] == [3]
+    assert join['Delta'] == ()
+    assert report['aliased'] == {'Beta': ['Beta (long)'], 'Delta': ['Nope']}
+    assert report['patterns_without_mode'] == ['Delta']
+    assert report['modes_without_pattern'] == [[4, 'Gamma']]
+    assert report['name_collisions'] == {'alpha': [1, 2]}
+    assert report['stale_aliases'] == {'Delta': ['Nope'], 'Gone': ['Gamma']}
+
+
+if __name__ == '__main__':
+    test_snapshot_written_and_reused()
+    test_snapshot_invalidated_by_json_change()
+    test_corrupt_snapshot_ignored()
+    test_writable_snapshot_not_loaded()
+    test_search_ranking()
+    test_search_tolerates_typos()
+    test_search_finds_every_substring_match()
+    test_search_index_from_snapshot()
+    test_every_alias_resolves()
+    test_join_reports_mismatches()
+    print("[PASSED] database")
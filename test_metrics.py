@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Metrics Tests
+Metrics must not change any result, must account for every line, and must
+export valid Prometheus text to a file and over HTTP
+"""
+
+import json
+import os
+import tempfile
+import urllib.request
+
+from conftest import DB_PATH, load_samples
+from lib.daemon import HashDaemon
+from lib.hash_analyzer import HashAnalyzer
+from lib.metrics import IdentifyMetrics, MetricsFileWriter, MetricsRegistry, MetricsServer
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry()
+    counter = registry.counter('test_total', 'A counter', ('kind',))
+    counter.inc(2, ('a"b',))
+    registry.gauge('test_depth', 'A gauge').set(3)
+    histogram = registry.histogram('test_seconds', 'A histogram', buckets=(0.01, 0.1, 1.0))
+    for value in [0.005] * 50 + [0.05] * 45 + [0.5] * 5:
+        histogram.observe(value)
+    assert registry.counter('test_total', 'A counter', ('kind',)) is counter
+
+    lines = registry.render().splitlines()
+    assert '# TYPE test_total counter' in lines
+    assert 'test_total{kind="a\\"b"} 2' in lines
+    assert 'test_depth 3' in lines
+    assert 'test_seconds_bucket{le="0.01"} 50' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 100' in lines
+    assert 'test_seconds_count 100' in lines
+    assert 0 < histogram.quantile(0.5) <= 0.01
+    assert 0.01 < histogram.quantile(0.95) <= 0.1
+    assert 0.1 < histogram.quantile(0.99) <= 1.0
+    assert any(line.startswith('test_seconds_quantile{quantile="0.99"}') for line in lines)
+
+
+def test_metrics_count_every_result(samples):
+    hashes = (samples + ['', 'not a hash']) * 50
+    expected = HashAnalyzer(DB_PATH).identify_multiple(hashes)
+
+    analyzer = HashAnalyzer(DB_PATH)
+    metrics = IdentifyMetrics()
+    analyzer.enable_metrics(metrics, sample_every=4)
+    assert list(analyzer.iter_identify(hashes)) == expected
+    assert [r.to_dict() for r in analyzer.iter_identify(hashes, records=True)] == expected
+
+    unmatched = 2 * sum(not result['matches'] for result in expected)
+    assert metrics.lines_read.value() == 2 * len(hashes)
+    assert metrics.unmatched.value() == unmatched
+    assert metrics.identified.value() == 2 * len(hashes) - unmatched
+    assert sum(metrics.mode_hits._values.values()) == metrics.identified.value()
+    assert metrics.stage_seconds.count(('prepare',)) > 0
+
+    metrics.render()
+    info = analyzer.cache_info()
+    assert (metrics.cache_hits.value(), metrics.cache_misses.value()) == (info['hits'], info['misses'])
+
+    # Profiling alongside metrics times every identification
+    profiler = analyzer.enable_profiling()
+    analyzer.identify_multiple(hashes[:10])
+    assert profiler.inputs == 10
+    analyzer.disable_profiling()
+    analyzer.disable_metrics()
+    assert not {'_lookup', 'identify_hash', 'identify_record', 'identify_best',
+                'identify_best_record'} & set(vars(analyzer))
+
+
+def test_metrics_time_top_matches(samples):
+    hashes = samples * 5
+    expected = HashAnalyzer(DB_PATH).identify_multiple(hashes, top=1)
+
+    analyzer = HashAnalyzer(DB_PATH)
+    metrics = IdentifyMetrics()
+    analyzer.enable_metrics(metrics, sample_every=1)
+    assert list(analyzer.iter_identify(hashes, top=1)) == expected
+    assert metrics.lines_read.value() == len(hashes)
+    assert metrics.stage_seconds.count(('build',)) == metrics.stage_seconds.count(('prepare',)) > 0
+
+
+def test_file_and_http_export():
+    registry = IdentifyMetrics().registry
+    registry.get('hxmod_lines_read_total').inc(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'hxmod.prom')
+        writer = MetricsFileWriter(registry, path, interval=60).start()
+        registry.get('hxmod_lines_read_total').inc(1)
+        writer.stop()
+        with open(path) as f:
+            assert 'hxmod_lines_read_total 8' in f.read().splitlines()
+        assert os.listdir(tmp) == ['hxmod.prom']
+
+    server = MetricsServer(registry, 0).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert 'hxmod_lines_read_total 8' in response.read().decode().splitlines()
+    finally:
+        server.stop()
+
+
+def test_daemon_requests_are_counted():
+    metrics = IdentifyMetrics()
+    daemon = HashDaemon(os.path.join(tempfile.gettempdir(), 'unused.sock'), DB_PATH,
+                        reload_interval=0, metrics=metrics)
+    daemon.handle_line(json.dumps({'id': 1, 'op': 'batch', 'hashes': ['0' * 32, 'x']}).encode())
+    daemon.handle_line(b'{"id": 2, "op": "nope"}')
+
+    lines = metrics.render().splitlines()
+    assert 'hxmod_requests_total{op="batch",ok="true"} 1' in lines
+    assert 'hxmod_requests_total{op="invalid",ok="false"} 1' in lines
+    assert 'hxmod_requests_in_flight 0' in lines
+    assert metrics.lines_read.value() == 2 and metrics.unmatched.value() == 1
+
+
+if __name__ == '__main__':
+    test_prometheus_text_format()
+    test_metrics_count_every_result(load_samples())
+    test_metrics_time_top_matches(load_samples())
+    test_file_and_http_export()
+    test_daemon_requests_are_counted()
+    print("[PASSED] metrics")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""
+Pattern Engine Equivalence Tests
+Checks that the indexed pattern lookup returns exactly what the original
+linear scan over HashPatterns.PATTERNS returned
+"""
+
+import json
+import random
+import re
+
+from conftest import DB_PATH, SAMPLES
+from lib.hash_patterns import HashPatterns
+from lib.hash_analyzer import HashAnalyzer
+from lib.pattern_index import ENGINES, PatternIndex
+from lib.result_cache import ResultCache
+
+
+# Inputs shorter than one or more registered literal prefixes
+SHORT_PREFIXES = ['$6$', '$5$', '$2', '$2y', '$argon2', '{SSHA', '{SHA', 'sha256$', '$ml$']
+
+
+def linear_identify(hash_value):
+    """Reference implementation: the original per-pattern scan"""
+    if not hash_value:
+        return []
+    hash_value = hash_value.strip()
+    hash_value_lower = hash_value.lower()
+    matches = []
+    for hash_type, info in HashPatterns.PATTERNS.items():
+        pattern = info['pattern']
+        has_special_chars = any(c in pattern for c in ['$', '{', '*', ':'])
+        test_value = hash_value if has_special_chars else hash_value_lower
+        if re.match(pattern, test_value):
+            matches.append((hash_type, f"{hash_type} - {len(hash_value)} chars", info['confidence']))
+    matches.sort(key=lambda x: x[2], reverse=True)
+    return matches
+
+
+def linear_identify_hash(analyzer, hash_input):
+    """Reference implementation: the original identify_hash"""
+    hash_input = hash_input.strip()
+    results = {
+        'input_hash': hash_input,
+        'hash_length': len(hash_input),
+        'matches': [],
+        'confidence': 'Unknown'
+    }
+    seen_modes = set()
+    for hash_type, _, confidence in linear_identify(hash_input):
+        for mode_info in analyzer.hashcat_mgr.pattern_modes.get(hash_type, ()):
+            mode_key = (mode_info['mode'], mode_info['name'])
+            if mode_key not in seen_modes:
+                results['matches'].append({
+                    'hash_type': mode_info['name'],
+                    'hashcat_mode': mode_info['mode'],
+                    'category': mode_info['category'],
+                    'description': mode_info['description'],
+                    'confidence': confidence,
+                    'salt_type': mode_info.get('salt_type', 'unknown'),
+                    'example': mode_info.get('example', 'N/A'),
+                    'variants': mode_info.get('variants', [])
+                })
+                seen_modes.add(mode_key)
+    results['matches'].sort(key=lambda x: x['confidence'], reverse=True)
+    if results['matches']:
+        results['confidence'] = results['matches'][0]['confidence']
+    return results
+
+
+def build_corpus():
+    """Known examples plus random hex and near-miss mutations"""
+    rng = random.Random(1337)
+    corpus = []
+
+    with open(DB_PATH) as f:
+        corpus.extend(m['example'] for m in json.load(f)['hash_modes'] if m.get('example'))
+    with open(SAMPLES) as f:
+        corpus.extend(line.strip() for line in f if line.strip())
+
+    for length in (8, 13, 16, 20, 32, 34, 35, 40, 41, 56, 64, 65, 80, 84, 96, 128, 129):
+        digits = ''.join(rng.choice('0123456789abcdef') for _ in range(length))
+        corpus.extend([digits, digits.upper(), digits + ':salt', 'md5' + digits,
+                       '0x0100' + digits, '*' + digits.upper(), '$BLAKE2$' + digits])
+
+    mutations = []
+    for value in corpus:
+        mutations.extend([value[:-1], value + 'a', value + '$', ' ' + value + '\n',
+                          value.swapcase(), value.replace('$', '', 1)])
+    corpus.extend(mutations)
+    corpus.extend(['', '   ', '$', '*', '{SSHA}', '_', 'sha1$', 'pbkdf2_sha256$1$a$b',
+                   '$1$', '$5$', '$6$', '$S$', '$2a$', '$P$'])
+    corpus.extend(SHORT_PREFIXES)
+    return corpus
+
+
+def test_short_inputs_have_unique_candidates():
+    # Values shorter than a registered prefix once matched one class per prefix length
+    index = HashPatterns.get_index()
+    for value in SHORT_PREFIXES:
+        for text in (value, value.encode()):
+            candidates = index.candidates(text)
+            assert len(candidates) == len(set(candidates)), value
+        assert HashPatterns.identify_by_pattern(value) == linear_identify(value), value
+
+
+def test_engines_match_linear_scan():
+    corpus = build_corpus()
+    for engine in ENGINES:
+        for value in corpus:
+            assert HashPatterns.identify_by_pattern(value, engine) == linear_identify(value), (engine, value)
+
+
+def test_detect_hash_type_matches_linear_scan():
+    for engine in ENGINES:
+        for value in build_corpus():
+            expected = {t: {'confidence': c, 'length': len(value.strip())}
+                        for t, _, c in linear_identify(value)}
+            assert HashPatterns.detect_hash_type(value, engine) == expected, (engine, value)
+
+
+def test_identify_hash_matches_linear_scan():
+    for engine in ENGINES:
+        analyzer = HashAnalyzer(DB_PATH, engine=engine)
+        for value in build_corpus():
+            assert analyzer.identify_hash(value) == linear_identify_hash(analyzer, value), (engine, value)
+
+
+def test_bytes_input_matches_str_input():
+    corpus = build_corpus() + ['caf\u00e9', '8846f7eaee8fb117ad06bdd810b7e33\u00e9', 'a\x1cb', '\x1f8846f7eaee8fb117ad06bdd810b7e332']
+    raw = [v.encode('utf-8') for v in corpus] + [b'\xff\xfe8846f7eaee8fb117ad06bdd810b7e332', b'$2a$\x80']
+    texts = corpus + [v.decode('utf-8', 'replace') for v in raw[len(corpus):]]
+    analyzer = HashAnalyzer(DB_PATH)
+    for engine in ENGINES:
+        analyzer.engine = engine
+        for value, text in zip(raw, texts):
+            assert HashPatterns.identify_by_pattern(value, engine) == linear_identify(text), (engine, value)
+            assert analyzer.identify_hash(value) == linear_identify_hash(analyzer, text), (engine, value)
+
+
+def test_shape_cache_matches_uncached():
+    cached = HashAnalyzer(DB_PATH)
+    uncached = HashAnalyzer(DB_PATH, cache_size=0)
+    rng = random.Random(7)
+    corpus = build_corpus()
+    for length in range(1, 140):
+        for alphabet in ('0123456789', 'abcdef', 'ABCDEF', '0123456789abcdef', '0123456789abcdefABCDEF'):
+            corpus.append(''.join(rng.choice(alphabet) for _ in range(length)))
+    for value in corpus + corpus:
+        assert cached.identify_hash(value) == uncached.identify_hash(value), value
+    info = cached.cache_info()
+    assert info['hits'] > 0 and info['size'] <= info['maxsize']
+    assert uncached.cache_info()['size'] == 0
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(2)
+    cache.put('a', (1,))
+    cache.put('b', (2,))
+    assert cache.get('a') == (1,)
+    cache.put('c', (3,))
+    assert cache.get('b') is None
+    assert cache.info()['evictions'] == 1 and cache.info()['hits'] == 1
+
+
+def test_identify_best_matches_identify_hash():
+    corpus = build_corpus()
+    expected = {value: HashAnalyzer(DB_PATH).identify_hash(value) for value in corpus}
+    rng = random.Random(11)
+    for cache_size in (0, 1000):
+        analyzer = HashAnalyzer(DB_PATH, cache_size=cache_size)
+        # Runs of one type make it a hot pattern, shuffling makes the others win
+        values = corpus * 2 + rng.sample(corpus, len(corpus))
+        for value in values:
+            for top in (1, 2, 3, 100):
+                full = expected[value]
+                best = dict(full, matches=full['matches'][:top])
+                assert analyzer.identify_best(value, top) == best, (cache_size, value, top)
+                assert analyzer.identify_best_record(value.encode('utf-8'), top).to_dict() == best
+    assert analyzer.identify_multiple(corpus, top=2) == [
+        dict(expected[v], matches=expected[v]['matches'][:2]) for v in corpus]
+
+
+def test_hot_patterns_rank_without_dispatch():
+    index = PatternIndex(HashPatterns.PATTERNS)
+    bcrypt = '$2a$12$R9h/cIPz0gi.URNNX3kh2OPST9/PgBkqquzi.Ss7KIUgO2t0jWMUW'
+    assert index.match_hot(bcrypt) is None
+    for _ in range(3):
+        index.count_win(index.match_classes(bcrypt))
+    assert index.match_hot('$2a$') is None
+
+    # A hot match ranks its rivals directly, without consulting the dispatch tables
+    expected = list(index.match(bcrypt))
+    index.candidates = None
+    assert list(index.match_hot(bcrypt)) == expected
+    del index.candidates
+
+
+def test_unknown_engine_rejected():
+    try:
+        HashPatterns.identify_by_pattern('8846f7eaee8fb117ad06bdd810b7e332', 'nope')
+    except ValueError:
+        return
+    assert False, "unknown engine accepted"
+
+
+if __name__ == '__main__':
+    test_engines_match_linear_scan()
+    test_short_inputs_have_unique_candidates()
+    test_detect_hash_type_matches_linear_scan()
+    test_identify_hash_matches_linear_scan()
+    test_bytes_input_matches_str_input()
+    test_shape_cache_matches_uncached()
+    test_result_cache_evicts_least_recently_used()
+    test_identify_best_matches_identify_hash()
+    test_hot_patterns_rank_without_dispatch()
+    test_unknown_engine_rejected()
+    print("[PASSED] all engines match the linear scan")
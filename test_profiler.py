@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Profiler Tests
+Profiling must not change any result, must count every attempt, and must
+leave no instrumentation behind once disabled
+"""
+
+from conftest import DB_PATH, load_samples
+from lib.hash_analyzer import HashAnalyzer
+from lib.hash_patterns import HashPatterns
+from lib.pattern_index import ENGINES
+from lib.profiler import STAGES, format_profile
+
+
+def test_profiled_results_are_unchanged(samples):
+    hashes = samples + [h.encode('ascii') for h in samples] + ['', 'not a hash', '8846F7EAEE8FB117']
+    expected = HashAnalyzer(DB_PATH).identify_multiple(hashes)
+    expected_best = HashAnalyzer(DB_PATH).identify_multiple(hashes, top=1)
+    index = HashPatterns.get_index()
+
+    class_keys = [HashPatterns.match_classes(HashPatterns.prepare(h)) for h in hashes]
+
+    for engine in ENGINES:
+        analyzer = HashAnalyzer(DB_PATH, engine=engine, cache_size=0)
+        profiler = analyzer.enable_profiling()
+        try:
+            assert analyzer.identify_multiple(hashes) == expected
+            assert [r.to_dict() for r in analyzer.identify_multiple(hashes, records=True)] == expected
+            assert analyzer.identify_multiple(hashes, top=1) == expected_best
+            report = profiler.report(index)
+        finally:
+            analyzer.disable_profiling()
+
+        assert report['inputs'] == 3 * len(hashes)
+        for row in report['patterns']:
+            if isinstance(row['class'], int):
+                hits = sum(row['class'] in key for key in class_keys)
+                assert row['hits'] == 3 * hits, (engine, row)
+                assert row['attempts'] >= row['hits']
+        totals = [row['total_ns'] for row in report['patterns']]
+        assert totals == sorted(totals, reverse=True)
+
+        stages = {row['stage']: row for row in report['stages']}
+        assert list(stages) == list(STAGES)
+        assert stages['prepare']['calls'] == stages['build']['calls'] == report['inputs']
+        assert 'pattern matching' in format_profile(report)
+
+
+def test_disabling_removes_instrumentation():
+    analyzer = HashAnalyzer(DB_PATH)
+    plain_engines = dict(HashPatterns.get_index()._engines)
+    analyzer.enable_profiling()
+    assert HashPatterns.get_index()._engines != plain_engines
+    analyzer.disable_profiling()
+
+    assert HashPatterns.get_index()._engines == plain_engines
+    assert not {'_lookup', 'identify_hash', 'identify_record', 'identify_best',
+                'identify_best_record'} & set(vars(analyzer))
+    assert analyzer.vectorize and analyzer.profiler is None
+
+
+if __name__ == '__main__':
+    test_profiled_results_are_unchanged(load_samples())
+    test_disabling_removes_instrumentation()
+    print("[PASSED] profiler")
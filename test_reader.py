@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Block Reader Tests
+Line splitting across block boundaries and tolerance of messy input
+"""
+
+import io
+import os
+import tempfile
+
+from conftest import SAMPLES
+from lib.reader import iter_line_batches, iter_lines
+
+
+MESSY = (b'\xef\xbb\xbf# comment\r\n'
+         b'8846f7eaee8fb117ad06bdd810b7e332\r\n'
+         b'\r\n'
+         b'   $2a$12$R9h/cIPz0gi.URNNGHQ1be3DlH.PKZbv5H8KnzzVgXXbVxzy2K7E.  \n'
+         b'  # indented comment\n'
+         b'356a\x00192b\n'
+         b'junk\xff\xfe\xc3\n'
+         b'no-trailing-newline')
+
+EXPECTED = [b'8846f7eaee8fb117ad06bdd810b7e332',
+            b'$2a$12$R9h/cIPz0gi.URNNGHQ1be3DlH.PKZbv5H8KnzzVgXXbVxzy2K7E.',
+            b'356a192b',
+            b'junk\xff\xfe\xc3',
+            b'no-trailing-newline']
+
+
+def test_messy_input_at_every_block_size():
+    for block_size in (1, 2, 3, 5, 16, 1 << 20):
+        assert list(iter_lines(io.BytesIO(MESSY), block_size)) == EXPECTED, block_size
+
+
+def test_line_batches_follow_reads():
+    for block_size in (1, 7, 1 << 20):
+        for max_lines in (1, 2, 100):
+            batches = list(iter_line_batches(io.BytesIO(MESSY), max_lines, block_size))
+            assert [line for batch in batches for line in batch] == list(iter_lines(io.BytesIO(MESSY)))
+            assert all(0 < len(batch) <= max_lines for batch in batches)
+    # One read holds every line, so only max_lines splits it
+    assert [len(batch) for batch in iter_line_batches(io.BytesIO(MESSY), 2)] == [2, 2, 1]
+
+
+def test_mmap_and_block_reads_agree_with_text_reader():
+    with open(SAMPLES) as f:
+        expected = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    assert expected and not any(h.startswith('#') for h in expected)
+    expected = [h.encode() for h in expected]
+    assert list(iter_lines(SAMPLES)) == expected
+    assert list(iter_lines(SAMPLES, block_size=7, use_mmap=False)) == expected
+
+
+def test_utf16_and_empty_files():
+    with tempfile.TemporaryDirectory() as directory:
+        utf16 = os.path.join(directory, 'utf16.txt')
+        with open(utf16, 'w', encoding='utf-16') as f:
+            f.write('8846f7eaee8fb117ad06bdd810b7e332\r\n# x\r\nabc\r\n')
+        assert list(iter_lines(utf16)) == [b'8846f7eaee8fb117ad06bdd810b7e332', b'abc']
+
+        empty = os.path.join(directory, 'empty.txt')
+        open(empty, 'wb').close()
+        assert list(iter_lines(empty)) == []
+
+
+if __name__ == '__main__':
+    test_messy_input_at_every_block_size()
+    test_line_batches_follow_reads()
+    test_mmap_and_block_reads_agree_with_text_reader()
+    test_utf16_and_empty_files()
+    print("[PASSED] block reader")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Result Record Tests
+HashResult records must read and serialize exactly like the result
+dictionaries, while sharing their mode records
+"""
+
+import json
+import pickle
+
+from conftest import DB_PATH, load_samples
+from lib.formatter import BatchResultFormatter, get_formatter
+from lib.hash_analyzer import HashAnalyzer
+
+
+def test_records_equal_dicts(samples):
+    analyzer = HashAnalyzer(DB_PATH)
+    analyzer.PARALLEL_MIN_HASHES = 10
+    hashes = samples * 10
+    expected = [analyzer.identify_hash(h) for h in hashes]
+
+    for records in (analyzer.identify_multiple(hashes, records=True),
+                    list(analyzer.iter_identify(iter(hashes), records=True)),
+                    analyzer.identify_multiple(hashes, workers=2, chunk_size=7, records=True)):
+        assert [r.to_dict() for r in records] == expected
+        assert records == expected
+
+    record = analyzer.identify_record(hashes[0])
+    assert record['matches'][0]['hashcat_mode'] == expected[0]['matches'][0]['hashcat_mode']
+    assert record['confidence'] == expected[0]['confidence']
+    assert pickle.loads(pickle.dumps(record)) == expected[0]
+
+
+def test_mode_records_are_shared_and_immutable():
+    analyzer = HashAnalyzer(DB_PATH)
+    first = analyzer.identify_record('8846f7eaee8fb117ad06bdd810b7e332')
+    second = analyzer.identify_record('0123456789abcdef0123456789abcdef')
+    assert first.matches is second.matches
+    mode = first.matches[0].mode
+    assert mode is analyzer.hashcat_mgr.get_pattern_records('NTLM')[0]
+    try:
+        mode.name = 'changed'
+        assert False, "mode record was modified"
+    except AttributeError:
+        pass
+
+
+def test_returned_results_can_be_changed():
+    analyzer = HashAnalyzer(DB_PATH)
+    analyzer.VECTOR_MIN_BATCH = 1
+    ntlm = '8846f7eaee8fb117ad06bdd810b7e332'
+    expected = HashAnalyzer(DB_PATH, cache_size=0).identify_hash(ntlm)
+
+    for results in ([analyzer.identify_hash(ntlm)], [analyzer.identify_best(ntlm, 3)],
+                    analyzer.identify_multiple([ntlm] * 3), list(analyzer.iter_identify([ntlm] * 3))):
+        for result in results:
+            result['matches'][0]['variants'].append('changed')
+            result['matches'][0]['confidence'] = 0
+            result['matches'].pop()
+    assert analyzer.identify_hash('0123456789abcdef0123456789abcdef')['matches'] == expected['matches']
+    assert analyzer.identify_record(ntlm) == expected
+
+    try:
+        analyzer.identify_record(ntlm).matches[0].confidence = 0
+        assert False, "match record was modified"
+    except AttributeError:
+        pass
+
+
+def test_formatters_accept_records(samples):
+    analyzer = HashAnalyzer(DB_PATH)
+    hashes = samples * 10
+    records = analyzer.identify_multiple(hashes, records=True)
+    dicts = analyzer.identify_multiple(hashes)
+
+    for output_format in ('standard', 'table', 'detailed', 'json', 'csv', 'compact', 'hashcat', 'brief'):
+        formatter = get_formatter(output_format)
+        assert [formatter(r) for r in records] == [formatter(r) for r in dicts]
+    for output_format in ('json', 'ndjson', 'csv'):
+        assert (list(BatchResultFormatter.iter_batch(iter(records), output_format))
+                == list(BatchResultFormatter.iter_batch(iter(dicts), output_format)))
+    assert json.loads(get_formatter('json_compact')(records[0])) == dicts[0]
+
+
+if __name__ == '__main__':
+    test_records_equal_dicts(load_samples())
+    test_mode_records_are_shared_and_immutable()
+    test_returned_results_can_be_changed()
+    test_formatters_accept_records(load_samples())
+    print("[PASSED] result records")
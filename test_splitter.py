@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Split Writer Tests
+Every input line must land in the file of its mode(s), whatever number of
+files the handle pool keeps open
+"""
+
+import json
+import os
+import tempfile
+
+from conftest import DB_PATH, load_samples
+from lib.hash_analyzer import HashAnalyzer
+from lib.splitter import HandlePool, ModeSplitter
+
+
+def read_split(directory):
+    files = {}
+    for name in os.listdir(directory):
+        if name.endswith('.txt'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                files[name] = f.read().splitlines()
+    return files
+
+
+def expected_split(hashes, results, split_all):
+    files = {}
+    for line, result in zip(hashes, results):
+        modes = [m['hashcat_mode'] for m in result['matches']]
+        names = [f"mode_{m}.txt" for m in dict.fromkeys(modes if split_all else modes[:1])]
+        for name in names or ['unmatched.txt']:
+            files.setdefault(name, []).append(line.encode('utf-8'))
+    return files
+
+
+def test_lines_follow_their_modes_with_evictions(samples):
+    analyzer = HashAnalyzer(DB_PATH)
+    hashes = samples * 3
+    results = analyzer.identify_multiple(hashes, records=True)
+
+    for split_all in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            # Two open files for a dozen outputs forces constant eviction
+            with ModeSplitter(directory, split_all, max_open=2) as splitter:
+                splitter.add_all(zip(hashes, results))
+            assert splitter.pool.evictions > 0
+            expected = expected_split(hashes, results, split_all)
+            assert read_split(directory) == expected
+
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                manifest = json.load(f)
+            assert manifest['input_lines'] == len(hashes)
+            counts = {entry['file']: entry['lines'] for entry in manifest['files']}
+            counts['unmatched.txt'] = manifest['unmatched']['lines']
+            assert counts == {name: len(lines) for name, lines in expected.items()}
+
+
+def test_rerun_replaces_previous_split():
+    analyzer = HashAnalyzer(DB_PATH)
+    with tempfile.TemporaryDirectory() as directory:
+        with ModeSplitter(directory) as splitter:
+            splitter.add('not a hash', analyzer.identify_hash('not a hash'))
+            splitter.add('8846f7eaee8fb117ad06bdd810b7e332',
+                         analyzer.identify_hash('8846f7eaee8fb117ad06bdd810b7e332'))
+        with ModeSplitter(directory) as splitter:
+            splitter.add('$2a$12$R9h/cIPz0gi.URNNGHQ1be3DlH.PKZbv5H8KnzzVgXXbVxzy2K7E.',
+                         analyzer.identify_hash('$2a$12$R9h/cIPz0gi.URNNGHQ1be3DlH.PKZbv5H8KnzzVgXXbVxzy2K7E.'))
+        assert sorted(os.listdir(directory)) == ['manifest.json', 'mode_3200.txt']
+
+
+def test_pool_appends_after_eviction():
+    with tempfile.TemporaryDirectory() as directory:
+        pool = HandlePool(directory, max_open=1)
+        for i in range(6):
+            pool.write(f"{i % 3}.txt", b"%d\n" % i)
+        pool.close()
+        assert read_split(directory) == {'0.txt': [b'0', b'3'], '1.txt': [b'1', b'4'],
+                                         '2.txt': [b'2', b'5']}
+
+
+if __name__ == '__main__':
+    test_lines_follow_their_modes_with_evictions(load_samples())
+    test_rerun_replaces_previous_split()
+    test_pool_appends_after_eviction()
+    print("[PASSED] split writer")
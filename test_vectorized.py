@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Vectorized Batch Tests
+Shape-bucketed batch identification must equal per-line identification,
+with or without NumPy installed
+"""
+
+import random
+
+from conftest import DB_PATH
+from lib.hash_analyzer import HashAnalyzer
+from lib.hash_patterns import HashPatterns
+from lib.vectorized import NUMPY_AVAILABLE, bucket_by_shape
+
+
+def hex_corpus():
+    rng = random.Random(14)
+    corpus = []
+    for length in (8, 13, 16, 20, 32, 40, 56, 64, 96, 128, 129, 300):
+        for alphabet in ('0123456789', 'abcdef', 'ABCDEF', '0123456789abcdef', '0123456789ABCDEF',
+                         '0123456789abcdefABCDEF'):
+            corpus.extend(''.join(rng.choice(alphabet) for _ in range(length)) for _ in range(5))
+    corpus.extend(['', ' 8846f7eaee8fb117ad06bdd810b7e332', '8846f7eaee8fb117ad06bdd810b7e332\x00',
+                   'café', '$2a$12$R9h/cIPz0gi.URNNGHQ1be3DlH.PKZbv5H8KnzzVgXXbVxzy2K7E.',
+                   '8846f7eaee8fb117ad06bdd810b7e33g', 'aad3b435b51404eeaad3b435b51404ee:' + 'a' * 32])
+    rng.shuffle(corpus)
+    return corpus
+
+
+def test_batches_match_per_line_identification():
+    corpus = hex_corpus()
+    reference = HashAnalyzer(DB_PATH, cache_size=0, vectorize=False)
+    analyzer = HashAnalyzer(DB_PATH, cache_size=0)
+    for values in (corpus, [v.encode('utf-8') for v in corpus]):
+        expected = [reference.identify_hash(v) for v in values]
+        assert analyzer.identify_multiple(values) == expected
+        assert list(analyzer.iter_identify(iter(values))) == expected
+
+
+def test_buckets_agree_with_shape_key():
+    if not NUMPY_AVAILABLE:
+        assert bucket_by_shape(['abc']) is None
+        return
+    corpus = hex_corpus()
+    buckets, leftovers = bucket_by_shape(corpus)
+    assert sorted(leftovers + [r for rows in buckets.values() for r in rows]) == list(range(len(corpus)))
+    for key, rows in buckets.items():
+        assert all(HashPatterns.shape_key(corpus[row]) == key for row in rows)
+    for row in leftovers:
+        assert HashPatterns.shape_key(corpus[row]) is None or len(corpus[row]) > 256
+
+    # Trailing NULs on the widest row are dropped by NumPy's fixed-width arrays
+    for values in (['abc', 'abcdef\x00'], [b'abc', b'abcdef\x00\x00']):
+        assert bucket_by_shape(values) == ({(3, False, True, False): [0]}, [1])
+
+
+if __name__ == '__main__':
+    test_batches_match_per_line_identification()
+    test_buckets_agree_with_shape_key()
+    print(f"[PASSED] vectorized batches (NumPy {'available' if NUMPY_AVAILABLE else 'not installed'})")